@@ -0,0 +1,290 @@
+import asyncio
+import httpx
+import ujson
+import logging
+from typing import Dict, Any, Optional, List, AsyncGenerator, Tuple, TYPE_CHECKING
+from app.models.enums.pokeapi import EndPoint
+from app.api.ingestion.client import PokeApiClient, LISTING_PAGE_SIZE
+from app.api.ingestion.cache import ResponseCache
+from app.api.ingestion.rate_limiter import RateLimiter, rate_limiter as shared_rate_limiter
+from app.api.ingestion.snapshot import SnapshotBackend
+
+if TYPE_CHECKING:
+    from app.api.ingestion.checkpoint import Checkpoint
+
+
+class AsyncPokeApiClient:
+    """ Asynchronous client to interact with the PokeAPI over a pool of keep-alive connections. """
+
+    BASE_URL = PokeApiClient.BASE_URL
+
+    def __init__(self, base_url: str = None, timeout: int = 30, max_concurrency: int = 10,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 backend: Optional[SnapshotBackend] = None):
+        """ Initialize the async PokeAPI client.
+        Args:
+            base_url: Optional base URL, uses BASE_URL by default
+            timeout: Request timeout in seconds
+            max_concurrency: Maximum number of requests in flight at the same time
+            transport: Optional httpx transport (used for tests or custom adapters)
+            cache: Optional persistent response cache
+            rate_limiter: Optional rate limiter, uses the process-wide shared limiter by default
+            backend: Optional local backend (e.g. SnapshotBackend) serving calls instead of HTTP """
+        self.base_url = base_url or self.BASE_URL
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.transport = transport
+        self.cache = cache
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.backend = backend
+        self.logger = logging.getLogger(__name__)
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncPokeApiClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """ Open the underlying connection pool (called lazily by call). """
+        if self._http is not None:
+            return
+
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency
+        )
+        self._http = httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self.transport)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # one pool and one in-flight limit per client
+
+    async def close(self) -> None:
+        """ Close the underlying connection pool. """
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._semaphore = None
+
+    async def call(self, endpoint: EndPoint, resource_id: Optional[str] = None,
+                   limit: Optional[int] = None, offset: Optional[int] = None,
+                   params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """ Generic method to call the API
+        Args:
+            endpoint: The API endpoint (type, pokemon, etc.)
+            resource_id: Optional specific resource identifier
+            limit: Maximum number of items to retrieve
+            offset: Pagination offset
+            params: Additional request parameters
+
+        Returns:
+            The API response data as dict """
+        if self.backend is not None:
+            return self.backend.call(endpoint, resource_id, limit=limit, offset=offset, params=params)
+        # local backend: no cache, throttling or network needed
+
+        await self.open()
+
+        url = f"{self.base_url}{endpoint.value}"
+        if resource_id:
+            url = f"{url}/{resource_id}"
+
+        request_params = dict(params or {})
+        if limit is not None:
+            request_params["limit"] = limit
+        if offset is not None:
+            request_params["offset"] = offset
+        # build request params
+
+        cache_key = None
+        cached = None
+        headers = {}
+        if self.cache is not None:
+            cache_key = self.cache.make_key(endpoint, resource_id, request_params)
+            cached = self.cache.get(cache_key)
+            if cached and cached.is_fresh(self.cache.ttl):
+                self.logger.debug(f"Cache hit: {cache_key}")
+                return ujson.loads(cached.body)
+            if cached:
+                headers = cached.revalidation_headers()
+        # serve fresh entries from cache, revalidate stale ones
+
+        self.logger.info(f"API call: {url} with params: {request_params}")
+
+        try:
+            for attempt in range(self.rate_limiter.max_retries + 1):
+                await self.rate_limiter.acquire_async(url)
+                async with self._semaphore:
+                    response = await self._http.get(url, params=request_params, headers=headers)
+                if not self.rate_limiter.should_retry(response.status_code, attempt):
+                    break
+                self.rate_limiter.backoff(url, attempt, response.headers.get("Retry-After"))
+            # throttle per host, back off and retry on 429/5xx
+
+            if cached and response.status_code == 304:
+                self.cache.touch(cache_key)
+                return ujson.loads(cached.body)
+            response.raise_for_status()
+            if cache_key is not None:
+                self.cache.set(cache_key, response.text,
+                               response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return ujson.loads(response.text)
+        # fetch API data, bounded by the in-flight limit and the rate limiter
+
+        except httpx.HTTPStatusError as e:
+            self.logger.error(f"HTTP error: {e}")
+            raise
+        except httpx.TimeoutException as e:
+            self.logger.error(f"Timeout: {e}")
+            raise
+        except httpx.TransportError as e:
+            self.logger.error(f"Connection error: {e}")
+            raise
+        except httpx.HTTPError as e:
+            self.logger.error(f"Request error: {e}")
+            raise
+        # handle request errors
+
+    async def iter_pages(self, endpoint: EndPoint, page_size: int = LISTING_PAGE_SIZE, offset: int = 0,
+                         limit: Optional[int] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """ Generate the pages of an endpoint listing, the next page loading while the current one is consumed
+        Args:
+            endpoint: The API endpoint to list
+            page_size: Number of items requested per page
+            offset: Listing position of the first item
+            limit: Optional maximum number of items to list
+
+        Returns:
+            Async generator yielding the pages as returned by the API """
+        start = offset
+
+        def request(page_offset: int) -> "asyncio.Future":
+            size = page_size if limit is None else min(page_size, limit - (page_offset - start))
+            return asyncio.ensure_future(self.call(endpoint, limit=size, offset=page_offset))
+
+        pending = request(offset)
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                results = page.get("results", [])
+
+                if not results:
+                    break
+                if offset == start:
+                    self.logger.info(f"Listing {page.get('count', 0)} items from {endpoint.value}")
+
+                offset += len(results)
+                if offset < page.get("count", 0) and (limit is None or offset - start < limit):
+                    pending = request(offset)
+                # prefetch the next page before handing this one out
+
+                yield page
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_listing(self, endpoint: EndPoint, page_size: int = LISTING_PAGE_SIZE, offset: int = 0,
+                           limit: Optional[int] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """ Generate the entries (name and url) of an endpoint listing, page after page
+        Args:
+            endpoint: The API endpoint to list
+            page_size: Number of items requested per page
+            offset: Listing position of the first entry
+            limit: Optional maximum number of items to list
+
+        Returns:
+            Async generator yielding the listing entries """
+        async for page in self.iter_pages(endpoint, page_size, offset=offset, limit=limit):
+            for item_info in page.get("results", []):
+                yield item_info
+
+    async def get_all_items(self, endpoint: EndPoint) -> List[Dict[str, Any]]:
+        """ Get all items from an endpoint with pagination
+        Args:
+            endpoint: The API endpoint to retrieve items from
+
+        Returns:
+            List of all items from the endpoint """
+        return [item_info async for item_info in self.iter_listing(endpoint)]
+
+    def extract_id_from_url(self, url: str) -> Optional[int]:
+        """ Extract the ID from a PokeAPI URL.
+        Args:
+            url: The URL to extract ID from
+        Returns:
+            The extracted ID or None if not found
+        """
+        if not url:
+            return None
+
+        # URL format is usually like: https://pokeapi.co/api/v2/pokemon/1/
+        try:
+            return int(url.rstrip("/").split("/")[-1])
+        except (ValueError, IndexError):
+            return None
+
+    async def _fetch_item(self, endpoint: EndPoint, item_id: int) -> Optional[Dict[str, Any]]:
+        """ Fetch the details of one item, logging failures instead of raising.
+        Args:
+            endpoint: The API endpoint
+            item_id: The item ID
+        Returns:
+            The item data or None if the fetch failed
+        """
+        try:
+            self.logger.info(f"Fetching details for {endpoint.value} {item_id}")
+            return await self.call(endpoint, resource_id=str(item_id))
+        except Exception as e:
+            self.logger.error(f"Error fetching {endpoint.value} {item_id}: {e}")
+            return None
+
+    async def get_items_generator(self, endpoint: EndPoint, batch_size: int = 50,
+                                  checkpoint: Optional["Checkpoint"] = None) -> AsyncGenerator[Tuple[int, int, Dict[str, Any]], None]:
+        """ Generate items one by one with their listing position, fetching each page's details concurrently
+        Args:
+            endpoint: The API endpoint to retrieve items from
+            batch_size: Number of items to request in each batch
+            checkpoint: Optional checkpoint to resume from, the consumer moves its offset once items are written
+
+        Returns:
+            Async generator yielding (position, item_id, item_data) tuples, in listing order """
+        # Retrieve items in batches, starting at the checkpoint if any
+        offset = checkpoint.offset if checkpoint else 0
+        pages = self.iter_pages(endpoint, batch_size, offset=offset)
+        try:
+            async for batch in pages:
+                results = batch.get("results", [])
+
+                item_ids = []
+                positions = []
+                for position, item_info in enumerate(results, offset + 1):
+                    # Extract ID from URL instead of using index
+                    url = item_info.get("url", "")
+                    item_id = self.extract_id_from_url(url)
+
+                    if not item_id:
+                        self.logger.warning(f"Could not extract ID from URL: {url}")
+                        continue
+                    item_ids.append(item_id)
+                    positions.append(position)
+
+                # Fan out the detail fetches of the page, the semaphore bounds concurrency
+                tasks = [asyncio.ensure_future(self._fetch_item(endpoint, item_id)) for item_id in item_ids]
+                try:
+                    for item_id, position, task in zip(item_ids, positions, tasks):
+                        item_data = await task
+                        if item_data is not None:
+                            yield position, item_id, item_data
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                # cancel pending fetches if the consumer stops early
+
+                offset += len(results)
+        finally:
+            await pages.aclose()
@@ -0,0 +1,106 @@
+import logging
+from typing import Dict, Any, Iterable, List, Set, Tuple, Type
+from sqlalchemy import Table, delete, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel
+
+logger = logging.getLogger(__name__)
+
+# Dialects supporting INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+class BulkWriter:
+    """ Buffers rows per table and writes each table with one set-based statement.
+
+    Rows with a primary key are upserted with INSERT ... ON CONFLICT DO UPDATE, rows owned
+    by a parent (abilities, learnsets) replace the rows of that parent. Tables are flushed in
+    the order their first row was buffered, so parents are buffered before their children. """
+
+    def __init__(self, keep_existing: Iterable[Type[SQLModel]] = ()):
+        """ Initialize the writer.
+        Args:
+            keep_existing: Models whose None values do not overwrite the stored ones """
+        self.keep_existing = {model.__table__ for model in keep_existing}
+        self._upserts: Dict[Table, Dict[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self._replaced: Dict[Table, Tuple[str, Set[Any], List[Dict[str, Any]]]] = {}
+
+    @staticmethod
+    def _values(row: SQLModel, table: Table) -> Dict[str, Any]:
+        return {column.name: getattr(row, column.name) for column in table.columns}
+
+    def upsert(self, row: SQLModel) -> None:
+        """ Buffer a row, a later row with the same primary key replaces it. """
+        table = row.__table__
+        values = self._values(row, table)
+        key = tuple(values[column.name] for column in table.primary_key.columns)
+        self._upserts.setdefault(table, {})[key] = values
+
+    def replace(self, model: Type[SQLModel], key: str, key_value: Any, rows: Iterable[SQLModel]) -> None:
+        """ Buffer the rows of a parent, replacing every stored row of that parent.
+        Args:
+            model: Model of the rows
+            key: Column referencing the parent
+            key_value: Value of that column for the parent
+            rows: New rows of the parent, possibly none
+        """
+        table = model.__table__
+        _, keys, values = self._replaced.setdefault(table, (key, set(), []))
+        keys.add(key_value)
+        for row in rows:
+            row_values = self._values(row, table)
+            # let the database assign autoincrement keys
+            values.append({k: v for k, v in row_values.items() if v is not None or k not in table.primary_key.columns})
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._upserts.values()) + \
+            sum(len(rows) for _, _, rows in self._replaced.values())
+
+    def _upsert_statement(self, session: Session, table: Table):
+        dialect = session.get_bind().dialect.name
+        if dialect not in UPSERT_DIALECTS:
+            raise ValueError(f"Bulk upserts are not supported on {dialect}")
+
+        statement = UPSERT_DIALECTS[dialect](table)
+        updated = {}
+        for column in table.columns:
+            if column.primary_key:
+                continue
+            new_value = statement.excluded[column.name]
+            updated[column.name] = func.coalesce(new_value, column) if table in self.keep_existing else new_value
+        # keep_existing tables only overwrite the values known by the source
+
+        primary_key = [column.name for column in table.primary_key.columns]
+        if not updated:
+            return statement.on_conflict_do_nothing(index_elements=primary_key)
+        return statement.on_conflict_do_update(index_elements=primary_key, set_=updated)
+
+    def flush(self, session: Session) -> Dict[str, int]:
+        """ Write the buffered rows in the session transaction and empty the buffers.
+        Args:
+            session: Database session, committed by the caller
+        Returns:
+            Number of rows written per table
+        """
+        written = {}
+        for table, rows in self._upserts.items():
+            if rows:
+                session.execute(self._upsert_statement(session, table), list(rows.values()))
+                written[table.name] = len(rows)
+
+        for table, (key, keys, rows) in self._replaced.items():
+            session.execute(delete(table).where(table.c[key].in_(keys)))
+            if rows:
+                session.execute(insert(table), rows)
+            written[table.name] = len(rows)
+
+        self.clear()
+        return written
+
+    def clear(self) -> None:
+        """ Drop the buffered rows, e.g. after a failed flush. """
+        self._upserts.clear()
+        self._replaced.clear()
@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode
+from app.models.enums.pokeapi import EndPoint
+
+# Default location of the on-disk cache, next to the databases
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / "db" / "pokeapi_cache.db"
+# One week: PokeAPI data only changes with new game releases
+DEFAULT_TTL = 7 * 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """ A cached API response with its HTTP validators. """
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def is_fresh(self, ttl: Optional[float]) -> bool:
+        """ Tell whether the entry can be served without revalidation.
+        Args:
+            ttl: Time to live in seconds, None means entries never expire
+        """
+        return ttl is None or time.time() - self.stored_at < ttl
+
+    def revalidation_headers(self) -> Dict[str, str]:
+        """ Build the conditional request headers for this entry. """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache(ABC):
+    """ Interface of the response caches pluggable under PokeApiClient.call. """
+
+    ttl: Optional[float] = DEFAULT_TTL
+
+    @staticmethod
+    def make_key(endpoint: EndPoint, resource_id: Optional[str] = None,
+                 params: Optional[Dict[str, Any]] = None) -> str:
+        """ Build the cache key of a request.
+        Args:
+            endpoint: The API endpoint
+            resource_id: Optional specific resource identifier
+            params: Request parameters (limit, offset, ...)
+        Returns:
+            A stable string key
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return f"{endpoint.value}/{resource_id or ''}?{query}"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """ Get the cached response of a key, None when it is not cached. """
+
+    @abstractmethod
+    def set(self, key: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """ Store a response body with its HTTP validators. """
+
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """ Mark an entry as fresh again after a successful revalidation. """
+
+
+class SQLiteResponseCache(ResponseCache):
+    """ Response cache stored as zlib-compressed blobs in a single SQLite file. """
+
+    def __init__(self, path: Optional[Path] = None, ttl: Optional[float] = DEFAULT_TTL,
+                 compression_level: int = 6):
+        """ Initialize the SQLite response cache.
+        Args:
+            path: Path to the cache file, uses DEFAULT_CACHE_PATH by default
+            ttl: Time to live of an entry in seconds before revalidation, None to never expire
+            compression_level: zlib compression level (0-9) """
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.ttl = ttl
+        self.compression_level = compression_level
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL
+            )
+        """)
+        # shared by the threads of a build, writes are serialized by the lock
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(zlib.decompress(body).decode("utf-8"), etag, last_modified, stored_at)
+
+    def set(self, key: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        blob = zlib.compress(body.encode("utf-8"), self.compression_level)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, blob, etag, last_modified, time.time())
+            )
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def clear(self) -> None:
+        """ Remove every cached response. """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+        logger.info(f"Cleared response cache {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,64 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import Session
+from app.models.enums.pokeapi import EndPoint
+from app.models.tables.import_checkpoint import ImportCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """ Progress of an importer through an endpoint listing, persisted in the target database.
+
+    The items generators yield the listing position of each item, the importer moves offset
+    to the position of the items it has written and saves the checkpoint in the same
+    transaction as their rows. """
+
+    def __init__(self, importer: str, endpoint: EndPoint, offset: int = 0, last_id: Optional[int] = None):
+        """ Initialize a checkpoint.
+        Args:
+            importer: Name of the importer owning the checkpoint
+            endpoint: The API endpoint being imported
+            offset: Listing position of the next item to import
+            last_id: ID of the last imported item """
+        self.importer = importer
+        self.endpoint = endpoint
+        self.offset = offset
+        self.last_id = last_id
+
+    @classmethod
+    def load(cls, session: Session, importer: str, endpoint: EndPoint) -> "Checkpoint":
+        """ Load the saved checkpoint of an importer, or start from the beginning.
+        Args:
+            session: Session of the target database
+            importer: Name of the importer
+            endpoint: The API endpoint being imported
+        Returns:
+            The saved checkpoint, or a new one at offset 0
+        """
+        saved = session.get(ImportCheckpoint, importer)
+        if saved is None or saved.endpoint != endpoint.value:
+            return cls(importer, endpoint)
+
+        logger.info(f"Resuming {importer} at offset {saved.offset} (after {endpoint.value} {saved.last_id})")
+        return cls(importer, endpoint, saved.offset, saved.last_id)
+
+    def save(self, session: Session, last_id: int) -> None:
+        """ Record the current offset in the session, committed with the imported rows. """
+        self.last_id = last_id
+        session.merge(ImportCheckpoint(
+            importer=self.importer,
+            endpoint=self.endpoint.value,
+            offset=self.offset,
+            last_id=last_id,
+            updated_at=datetime.now(timezone.utc),
+        ))
+
+    def clear(self, session: Session) -> None:
+        """ Forget the progress once the listing is fully imported. """
+        saved = session.get(ImportCheckpoint, self.importer)
+        if saved is not None:
+            session.delete(saved)
+        self.offset = 0
+        self.last_id = None
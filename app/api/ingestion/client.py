@@ -1,11 +1,20 @@
+import os
 import requests
 import ujson
-import time
 import logging
-from typing import Dict, Any, Optional, List, Callable, Generator, Tuple
+from typing import Dict, Any, Optional, List, Callable, Generator, Tuple, TYPE_CHECKING
 from app.models.enums.pokeapi import EndPoint
-from functools import partial
 from app.db.engine import Engine
+from app.api.ingestion.cache import ResponseCache, SQLiteResponseCache
+from app.api.ingestion.group_commit import GroupCommit, GROUP_COMMIT_INTERVAL
+from app.api.ingestion.rate_limiter import RateLimiter, rate_limiter as shared_rate_limiter
+from app.api.ingestion.snapshot import SnapshotBackend
+
+if TYPE_CHECKING:
+    from app.api.ingestion.checkpoint import Checkpoint
+
+# Number of listing entries requested per page
+LISTING_PAGE_SIZE = 100
 
 
 class PokeApiClient:
@@ -13,15 +22,26 @@ class PokeApiClient:
     
     BASE_URL = "https://pokeapi.co/api/v2/"
     
-    def __init__(self, base_url: str = None, timeout: int = 30, rate_limit_delay: float = 1.0):
+    def __init__(self, base_url: str = None, timeout: int = 30, rate_limit_delay: Optional[float] = None,
+                 cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 backend: Optional[SnapshotBackend] = None):
         """ Initialize the PokeAPI client.
         Args:
             base_url: Optional base URL, uses BASE_URL by default
             timeout: Request timeout in seconds
-            rate_limit_delay: Delay between API calls in seconds """
+            rate_limit_delay: Optional fixed delay between API calls in seconds,
+                turned into a dedicated limiter of 1 / rate_limit_delay requests per second
+            cache: Optional persistent response cache
+            rate_limiter: Optional rate limiter, uses the process-wide shared limiter by default
+            backend: Optional local backend (e.g. SnapshotBackend) serving calls instead of HTTP """
         self.base_url = base_url or self.BASE_URL
         self.timeout = timeout
         self.rate_limit_delay = rate_limit_delay
+        self.cache = cache
+        if rate_limiter is None and rate_limit_delay:
+            rate_limiter = RateLimiter(rate=1.0 / rate_limit_delay, burst=1)
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.backend = backend
         self.logger = logging.getLogger(__name__)
     
     def call(self, endpoint: EndPoint, resource_id: Optional[str] = None, 
@@ -37,6 +57,10 @@ class PokeApiClient:
             
         Returns:
             The API response data as dict """
+        if self.backend is not None:
+            return self.backend.call(endpoint, resource_id, limit=limit, offset=offset, params=params)
+        # local backend: no cache, throttling or network needed
+        
         url = f"{self.base_url}{endpoint.value}"
         if resource_id:
             url = f"{url}/{resource_id}"
@@ -48,11 +72,37 @@ class PokeApiClient:
             request_params["offset"] = offset
         # build request params
         
+        cache_key = None
+        cached = None
+        headers = {}
+        if self.cache is not None:
+            cache_key = self.cache.make_key(endpoint, resource_id, request_params)
+            cached = self.cache.get(cache_key)
+            if cached and cached.is_fresh(self.cache.ttl):
+                self.logger.debug(f"Cache hit: {cache_key}")
+                return ujson.loads(cached.body)
+            if cached:
+                headers = cached.revalidation_headers()
+        # serve fresh entries from cache, revalidate stale ones
+        
         self.logger.info(f"API call: {url} with params: {request_params}")
         
         try:
-            response = requests.get(url, params=request_params, timeout=self.timeout)
+            for attempt in range(self.rate_limiter.max_retries + 1):
+                self.rate_limiter.acquire(url)
+                response = requests.get(url, params=request_params, headers=headers, timeout=self.timeout)
+                if not self.rate_limiter.should_retry(response.status_code, attempt):
+                    break
+                self.rate_limiter.backoff(url, attempt, response.headers.get("Retry-After"))
+            # throttle per host, back off and retry on 429/5xx
+            
+            if cached and response.status_code == 304:
+                self.cache.touch(cache_key)
+                return ujson.loads(cached.body)
             response.raise_for_status()
+            if cache_key is not None:
+                self.cache.set(cache_key, response.text,
+                               response.headers.get("ETag"), response.headers.get("Last-Modified"))
             return ujson.loads(response.text)
         # fetch API data
         
@@ -70,6 +120,48 @@ class PokeApiClient:
             raise
         # handle request errors
     
+    def iter_pages(self, endpoint: EndPoint, page_size: int = LISTING_PAGE_SIZE, offset: int = 0,
+                   limit: Optional[int] = None) -> Generator[Dict[str, Any], None, None]:
+        """ Generate the pages of an endpoint listing, each page being requested once the previous one is consumed
+        Args:
+            endpoint: The API endpoint to list
+            page_size: Number of items requested per page
+            offset: Listing position of the first item
+            limit: Optional maximum number of items to list
+            
+        Returns:
+            Generator yielding the pages as returned by the API """
+        start = offset
+        while limit is None or offset - start < limit:
+            size = page_size if limit is None else min(page_size, limit - (offset - start))
+            page = self.call(endpoint, limit=size, offset=offset)
+            results = page.get("results", [])
+            
+            if not results:
+                break
+            if offset == start:
+                self.logger.info(f"Listing {page.get('count', 0)} items from {endpoint.value}")
+            
+            yield page
+            
+            offset += len(results)
+            if offset >= page.get("count", 0):
+                break
+    
+    def iter_listing(self, endpoint: EndPoint, page_size: int = LISTING_PAGE_SIZE, offset: int = 0,
+                     limit: Optional[int] = None) -> Generator[Dict[str, Any], None, None]:
+        """ Generate the entries (name and url) of an endpoint listing, page after page
+        Args:
+            endpoint: The API endpoint to list
+            page_size: Number of items requested per page
+            offset: Listing position of the first entry
+            limit: Optional maximum number of items to list
+            
+        Returns:
+            Generator yielding the listing entries """
+        for page in self.iter_pages(endpoint, page_size, offset=offset, limit=limit):
+            yield from page.get("results", [])
+    
     def get_all_items(self, endpoint: EndPoint) -> List[Dict[str, Any]]:
         """ Get all items from an endpoint with pagination
         Args:
@@ -77,12 +169,7 @@ class PokeApiClient:
             
         Returns:
             List of all items from the endpoint """
-        response = self.call(endpoint, limit=1)
-        total_count = response.get("count", 0)
-        
-        self.logger.info(f"Retrieving all {total_count} items from {endpoint.value}")
-        return self.call(endpoint, limit=total_count).get("results", [])
-        # fetch all items at once
+        return list(self.iter_listing(endpoint))
     
     def extract_id_from_url(self, url: str) -> Optional[int]:
         """ Extract the ID from a PokeAPI URL.
@@ -100,29 +187,22 @@ class PokeApiClient:
         except (ValueError, IndexError):
             return None
     
-    def get_items_generator(self, endpoint: EndPoint, batch_size: int = 50) -> Generator[Tuple[int, Dict[str, Any]], None, None]:
-        """ Generate items one by one with their index, handling rate limiting
+    def get_items_generator(self, endpoint: EndPoint, batch_size: int = 50,
+                            checkpoint: Optional["Checkpoint"] = None) -> Generator[Tuple[int, int, Dict[str, Any]], None, None]:
+        """ Generate items one by one with their listing position, rate limited by the client's limiter
         Args:
             endpoint: The API endpoint to retrieve items from
             batch_size: Number of items to request in each batch
+            checkpoint: Optional checkpoint to resume from, the consumer moves its offset once items are written
             
         Returns:
-            Generator yielding (index, item_data) tuples """
-        # Get total count first
-        response = self.call(endpoint, limit=1)
-        total_count = response.get("count", 0)
-        self.logger.info(f"Found {total_count} items from {endpoint.value}")
-        
-        # Retrieve items in batches
-        offset = 0
-        while offset < total_count:
-            batch = self.call(endpoint, limit=batch_size, offset=offset)
+            Generator yielding (position, item_id, item_data) tuples """
+        # Retrieve items in batches, starting at the checkpoint if any
+        offset = checkpoint.offset if checkpoint else 0
+        for batch in self.iter_pages(endpoint, batch_size, offset=offset):
             results = batch.get("results", [])
             
-            if not results:
-                break
-                
-            for item_info in results:
+            for position, item_info in enumerate(results, offset + 1):
                 # Extract ID from URL instead of using index
                 url = item_info.get("url", "")
                 item_id = self.extract_id_from_url(url)
@@ -134,56 +214,72 @@ class PokeApiClient:
                 try:
                     self.logger.info(f"Fetching details for {endpoint.value} {item_id}")
                     item_data = self.call(endpoint, resource_id=str(item_id))
-                    yield item_id, item_data
-                    
-                    time.sleep(self.rate_limit_delay)
                 except Exception as e:
                     self.logger.error(f"Error fetching {endpoint.value} {item_id}: {e}")
                     # Continue with next item instead of breaking completely
                     continue
+                yield position, item_id, item_data
             
-            offset += batch_size
+            offset += len(results)
     
     @staticmethod
-    def batch_ingest(items_generator: Generator[Tuple[int, Dict[str, Any]], None, None], 
+    def batch_ingest(items_generator: Generator[Tuple[int, int, Dict[str, Any]], None, None], 
                     engine: Engine, process_function: Callable, 
-                    batch_size: int = 100, db_name: str = "test.db"):
+                    batch_size: int = 100, db_name: str = "test.db",
+                    checkpoint: Optional["Checkpoint"] = None,
+                    commit_interval: Optional[float] = GROUP_COMMIT_INTERVAL):
         """ Static utility method to ingest items in batches
+        
+        Each item is written in its own savepoint, so a failing item is rolled back alone
+        while the rest of its batch is committed. The checkpoint is moved to the position of
+        the last written item when its group is committed, and never past a rolled back item:
+        resuming writes that item and merges the items after it again.
         Args:
-            items_generator: Generator providing (index, item_data) tuples
+            items_generator: Generator providing (position, item_id, item_data) tuples
             engine: Database engine
             process_function: Function to process each item before ingestion
-            batch_size: Size of batches for committing to database
-            db_name: Database name """
+            batch_size: Maximum number of items per commit
+            db_name: Database name
+            checkpoint: Optional checkpoint given to the items generator, saved with every batch and
+                cleared once every item is written
+            commit_interval: Maximum number of seconds between two commits, None for no limit """
         logger = logging.getLogger(__name__)
         logger.info(f"Starting batch ingestion with batch size {batch_size}")
         
         with engine.connect(db_name=db_name) as session:
-            batch_count = 0
-            item_count = 0
-            
-            for i, item_data in items_generator:
-                try:
-                    db_object = process_function(item_data)
-                    session.add(db_object)
-                    # process item 
-                    
-                    item_count += 1
-                    batch_count += 1
-                    
-                    if batch_count >= batch_size:
-                        session.commit()
-                        logger.info(f"Committed batch of {batch_count} items")
-                        batch_count = 0
-                    # batch commit
-                        
-                except Exception as e:
-                    logger.error(f"Error processing item {i}: {e}")
+            first_failed: Optional[int] = None
+
+            def save_checkpoint(key: Optional[Tuple[int, int]]) -> None:
+                # key of the last written item, None until one is written
+                if checkpoint is None or key is None:
+                    return
+                position, item_id = key
+                checkpoint.offset = position if first_failed is None else min(position, first_failed - 1)
+                checkpoint.save(session, item_id)
+
+            with GroupCommit(session, size=batch_size, interval=commit_interval,
+                             before_commit=save_checkpoint) as group:
+                for position, item_id, item_data in items_generator:
+                    with group.item((position, item_id)):
+                        session.merge(process_function(item_data))
+                    if not group.last_written and first_failed is None:
+                        first_failed = position
+            # the last group is committed on exit
             
-            if batch_count > 0:
-                session.commit()
-                logger.info(f"Committed final batch of {batch_count} items")
-            # commit remaining items
+            if checkpoint is not None and not group.failed:
+                # The generator is exhausted, the checkpoint is done (committed with the session)
+                checkpoint.clear(session)
                 
-            logger.info(f"Ingestion completed. {item_count} items processed.")
-        # process in batches, periodic commits
\ No newline at end of file
+            logger.info(f"Ingestion completed. {group.stats()}.")
+        # process in groups, each item in a savepoint
+
+
+def build_client() -> PokeApiClient:
+    """ Build the client used by command-line builds.
+
+    Calls are served from the local snapshot given by the POKEAPI_SNAPSHOT environment
+    variable when it is set, otherwise from the live API through the persistent cache. """
+    snapshot_path = os.getenv("POKEAPI_SNAPSHOT")
+    if snapshot_path:
+        return PokeApiClient(backend=SnapshotBackend(snapshot_path))
+    return PokeApiClient(cache=SQLiteResponseCache())
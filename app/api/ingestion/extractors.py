@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+_MISSING = object()
+
+
+def get_path(data: Any, path: Path, default: Any = None) -> Any:
+    """ Follow a path of keys through nested dicts, returning default when a key is missing or null. """
+    for key in path:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key)
+        if data is None:
+            return default
+    return data
+
+
+def url_id(url: Optional[str]) -> Optional[int]:
+    """ Extract the trailing ID of a PokeAPI URL, None when there is none. """
+    try:
+        return int(url.rstrip("/").split("/")[-1])
+    except (AttributeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class Lookup:
+    """ Value picked from the entries of a payload list whose selector equals match.
+
+    The first matching entry wins, or the one with the highest latest_by value (e.g. the
+    version group ID of flavor texts) when latest_by is set. """
+    source: str
+    selector: Path
+    match: Any
+    value: Path
+    default: Any = None
+    convert: Optional[Callable[[Any], Any]] = None
+    latest_by: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+
+def localized(source: str, language: str, value: str = "name", **options: Any) -> Lookup:
+    """ Lookup of the text of a language in a localized list (names, effect_entries, ...). """
+    return Lookup(source, ("language", "name"), language, (value,), **options)
+
+
+def version_group_id(entry: Dict[str, Any]) -> int:
+    """ Ordering key of version-group entries, the most recent version group has the highest ID. """
+    return url_id(get_path(entry, ("version_group", "url"))) or 0
+
+
+class Extractor:
+    """ Extracts declared fields from a payload, scanning each of its lists once.
+
+    Lookups are compiled into one table per list: {selector path: {match value: fields}}, so an
+    entry is matched against every field of its list with a dict access per selector instead of
+    a scan of the list per field. """
+
+    def __init__(self, **fields: Lookup):
+        """ Compile the field lookups.
+        Args:
+            fields: Lookup of each field of the extracted record, by field name """
+        self.fields = fields
+        self._plan: Dict[str, Dict[Path, Dict[Any, List[Tuple[str, Lookup]]]]] = {}
+        for name, lookup in fields.items():
+            selectors = self._plan.setdefault(lookup.source, {})
+            selectors.setdefault(lookup.selector, {}).setdefault(lookup.match, []).append((name, lookup))
+        self._sizes = {
+            source: sum(len(lookups) for by_match in selectors.values() for lookups in by_match.values())
+            for source, selectors in self._plan.items()
+        }
+        self._complete_early = {
+            source: not any(lookup.latest_by for lookup in fields.values() if lookup.source == source)
+            for source in self._plan
+        }
+
+    def extract(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """ Extract every declared field in a single pass over each list of the payload.
+        Args:
+            payload: API payload
+        Returns:
+            A flat record with a value, or the lookup default, for every field
+        """
+        record = {name: lookup.default for name, lookup in self.fields.items()}
+        for source, selectors in self._plan.items():
+            found: Dict[str, Any] = {}
+            for entry in payload.get(source) or ():
+                for selector, by_match in selectors.items():
+                    lookups = by_match.get(get_path(entry, selector, _MISSING))
+                    if not lookups:
+                        continue
+                    for name, lookup in lookups:
+                        if lookup.latest_by is None:
+                            if name in found:
+                                continue
+                            found[name] = None
+                        else:
+                            rank = lookup.latest_by(entry)
+                            if name in found and found[name] >= rank:
+                                continue
+                            found[name] = rank
+                        value = get_path(entry, lookup.value, lookup.default)
+                        record[name] = lookup.convert(value) if lookup.convert and value is not None else value
+                if self._complete_early[source] and len(found) == self._sizes[source]:
+                    break
+            # stop scanning a list once all of its first-match fields are found
+        return record
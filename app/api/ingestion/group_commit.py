@@ -0,0 +1,105 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+# Default group limits: a commit every GROUP_COMMIT_SIZE items or GROUP_COMMIT_INTERVAL seconds
+GROUP_COMMIT_SIZE = 100
+GROUP_COMMIT_INTERVAL = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommit:
+    """ Commits items in groups, each item isolated in its own SAVEPOINT.
+
+    A failing item rolls back to its savepoint only: the items before it in the group are
+    kept and committed with the next ones, so failures stay isolated at the cost of one
+    commit per group instead of one per item. Errors of the database itself (locked, disk
+    full) are not caused by the item: they abort the group, and so does a failed commit.
+
+    The engine must open its transactions explicitly, as the registry engines of app.db.engine
+    do: with the default pysqlite behaviour a SAVEPOINT opened outside a transaction is
+    committed by its own RELEASE, i.e. once per item. """
+
+    def __init__(self, session: Session, size: int = GROUP_COMMIT_SIZE, interval: Optional[float] = GROUP_COMMIT_INTERVAL,
+                 before_commit: Optional[Callable[[Any], None]] = None):
+        """ Initialize the group commit.
+        Args:
+            session: Database session, committed by the group commit
+            size: Maximum number of items per commit
+            interval: Maximum number of seconds between two commits, None for no limit
+            before_commit: Called before each commit with the key of the last written item (None when
+                none was written yet), e.g. to save a checkpoint """
+        self.session = session
+        self.size = size
+        self.interval = interval
+        self.before_commit = before_commit
+        self.pending = 0
+        self.committed = 0
+        self.failed = 0
+        self.commits = 0
+        self.last_written = False  # whether the last item was written or rolled back
+        self._last_key: Any = None
+        self._started = time.monotonic()
+
+    def __enter__(self) -> "GroupCommit":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.session.rollback()
+            logger.error(f"Group commit aborted, {self.pending} uncommitted items rolled back")
+
+    @contextmanager
+    def item(self, key: Any):
+        """ Context manager writing one item in a savepoint.
+
+        Errors raised in the block are logged and rolled back to the savepoint, they do not
+        propagate, except OperationalError. The group is committed once it is full or old enough.
+        Args:
+            key: Identifier of the item, used in logs and given to before_commit
+        """
+        if self.pending == 0 and self.session.in_transaction():
+            # Ends the transaction opened by reads since the last commit (e.g. while fetching): in WAL,
+            # its snapshot could not be upgraded to a write once another connection has committed
+            self.session.commit()
+        savepoint = self.session.begin_nested()
+        try:
+            yield
+            self.session.flush()
+        except OperationalError:
+            savepoint.rollback()
+            raise
+        except Exception as e:
+            savepoint.rollback()
+            self.failed += 1
+            logger.error(f"Error writing item {key}, rolled back alone: {e}")
+            self.last_written = False
+            return
+        savepoint.commit()
+        self.last_written = True
+        self.pending += 1
+        self._last_key = key
+
+        if self.pending >= self.size or (self.interval is not None and time.monotonic() - self._started >= self.interval):
+            self.commit()
+
+    def commit(self) -> None:
+        """ Commit the pending items, and the before_commit changes. """
+        if self.before_commit is not None:
+            self.before_commit(self._last_key)
+        self.session.commit()
+        if self.pending:
+            self.commits += 1
+            logger.debug(f"Committed group of {self.pending} items")
+        self.committed += self.pending
+        self.pending = 0
+        self._started = time.monotonic()
+
+    def stats(self) -> str:
+        return f"{self.committed} items in {self.commits} commits, {self.failed} failed"
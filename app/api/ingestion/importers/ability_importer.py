@@ -1,5 +1,10 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.api.ingestion.group_commit import GroupCommit
+from app.db.engine import engine as db_engine, bulk_loading
+from app.api.ingestion.extractors import Extractor, localized, version_group_id
+from app.api.ingestion.manifest import ResourceManifest, parse_arguments
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.ability import Ability
 from pathlib import Path
@@ -7,8 +12,8 @@ from typing import Dict, Any, List, Optional
 from functools import partial
 import ujson
 import roman
-import time
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
+from sqlalchemy.engine import Engine
 
 # Configuration variables
 LIMIT_IMPORT = False
@@ -18,78 +23,88 @@ logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = db_engine.get_engine(DB_PATH.name, DB_PATH.parent)
+
+# Localized texts of an ability, read in a single pass per list
+ABILITY_FIELDS = Extractor(
+    name_fr=localized("names", "fr"),
+    effect_en=localized("effect_entries", "en", "effect"),
+    effect_fr=localized("effect_entries", "fr", "effect"),
+    # the flavor text of the most recent version group
+    flavor_text_fr=localized("flavor_text_entries", "fr", "flavor_text", latest_by=version_group_id),
+)
 
 class AbilityImporter:
     """ Importer for Pokemon ability data. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the ability importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
+        self.engine = engine
         self.get_abilities = partial(self.client.call, EndPoint.ABILITY)
+        self.store = store or resource_store
         
-    def import_all(self, limit: Optional[int] = None) -> List[Ability]:
+    def import_all(self, limit: Optional[int] = None, incremental: bool = False) -> List[Ability]:
         """ Import all abilities from the API and store them in the database.
         Args:
             limit: Optional maximum number of abilities to import
+            incremental: Skip abilities unchanged since the last import and upsert the others
         Returns:
             List of imported Ability objects """
         # Ensure tables exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         # create tables if they don't exist
         
-        abilities_list = self.get_abilities(limit=1)
-        total_count = abilities_list.get("count", 0)
-        
         if limit is not None:
-            total_count = min(limit, total_count)
-            logger.info(f"Limiting import to {total_count} abilities")
+            logger.info(f"Limiting import to {limit} abilities")
         
-        logger.info(f"Starting import of {total_count} abilities...")
+        logger.info("Starting import of abilities...")
         
-        all_abilities = self.get_abilities(limit=total_count).get("results", [])
         imported_abilities = []
-        # get abilities list
         
-        with Session(engine) as session:
-            for i, ability_info in enumerate(all_abilities, 1):
-                if limit is not None and i > limit:
-                    break
-                    
-                try:
-                    # Extract URL and get resource_id from the last segment
-                    url = ability_info.get("url", "")
-                    resource_id = url.rstrip("/").split("/")[-1]
-                    
-                    ability_data = self.get_abilities(resource_id=resource_id)
-                    
-                    # Small delay to be respectful to the API
-                    time.sleep(0.5)
+        with Session(self.engine) as session:
+            manifest = ResourceManifest(session, EndPoint.ABILITY)
+            with GroupCommit(session, interval=None) as group:
+                for page in self.client.iter_pages(EndPoint.ABILITY, limit=limit):
+                    fetched = []
+                    for ability_info in page.get("results", []):
+                        # Extract URL and get resource_id from the last segment
+                        url = ability_info.get("url", "")
+                        resource_id = url.rstrip("/").split("/")[-1]
+                        try:
+                            ability_data = self.store.fetch(self.client, EndPoint.ABILITY, resource_id)
+                            content_hash = manifest.content_hash(ability_data)
+                            if incremental and manifest.is_unchanged(resource_id, content_hash):
+                                continue
+                            # skip abilities unchanged since the last import
+                            
+                            ability_obj = self._process_ability_data(ability_data)
+                        except Exception as e:
+                            logger.error(f"Error importing ability {resource_id}: {e}")
+                            continue  # Skip to next ability on error
+                        fetched.append((resource_id, ability_obj, content_hash))
                     
-                    ability_obj = self._process_ability_data(ability_data)
-                    
-                    session.add(ability_obj)
-                    imported_abilities.append(ability_obj)
-                    
-                    logger.info(f"Imported ability: {ability_obj.name} (ID: {ability_obj.id})")
-                except Exception as e:
-                    logger.error(f"Error importing ability {i}: {e}")
-                    continue  # Skip to next ability on error
+                    for resource_id, ability_obj, content_hash in fetched:
+                        with group.item(f"ability {resource_id}"):
+                            if incremental:
+                                session.merge(ability_obj)
+                            else:
+                                session.add(ability_obj)
+                            manifest.record(resource_id, content_hash)
+                        if group.last_written:
+                            imported_abilities.append(ability_obj)
+                            logger.info(f"Imported ability: {ability_obj.name} (ID: {ability_obj.id})")
+                    group.commit()
             
-            # Commit successful imports even if some failed
-            try:
-                session.commit()
-                logger.info(f"Committed {len(imported_abilities)} abilities to database")
-            except Exception as e:
-                logger.error(f"Failed to commit changes: {e}")
-                session.rollback()
-                return []
-            # process and save each ability, continue on errors
+            logger.info(f"Committed {len(imported_abilities)} abilities to database ({group.stats()})")
+            if manifest.skipped:
+                logger.info(f"Skipped {manifest.skipped} unchanged abilities")
         
         logger.info(f"Import completed. {len(imported_abilities)} abilities imported.")
         return imported_abilities
@@ -103,44 +118,17 @@ class AbilityImporter:
             The created Ability object """
         ability_id = data.get("id")
         name = data.get("name")
+        fields = ABILITY_FIELDS.extract(data)
         
-        # Extract French name
-        name_fr = None
-        for name_entry in data.get("names", []):
-            if name_entry.get("language", {}).get("name") == "fr":
-                name_fr = name_entry.get("name")
-                break
-        # extract french name
-        
-        # Extract effect text (English)
-        effect = None
-        for effect_entry in data.get("effect_entries", []):
-            if effect_entry.get("language", {}).get("name") == "en":
-                effect = effect_entry.get("effect")
-                break
-        # extract english effect
+        # Extract French name and effect texts
+        name_fr = fields["name_fr"]
+        effect = fields["effect_en"]
+        effect_fr = fields["effect_fr"]
         
-        # Extract effect text (French)
-        effect_fr = None
-        for effect_entry in data.get("effect_entries", []):
-            if effect_entry.get("language", {}).get("name") == "fr":
-                effect_fr = effect_entry.get("effect")
-                break
-        
-        # If no French effect found, try to get French flavor text as fallback
-        if not effect_fr:
-            # Sort by version_group ID (descending) to get the most recent entry first
-            flavor_entries = sorted(
-                data.get("flavor_text_entries", []),
-                key=lambda x: int(x.get("version_group", {}).get("url", "0").split("/")[-2] or 0),
-                reverse=True
-            )
-            
-            for flavor_entry in flavor_entries:
-                if flavor_entry.get("language", {}).get("name") == "fr":
-                    effect_fr = flavor_entry.get("flavor_text")
-                    logger.info(f"Using flavor text for French effect of {name}")
-                    break
+        # If no French effect found, use the most recent French flavor text as fallback
+        if not effect_fr and fields["flavor_text_fr"]:
+            effect_fr = fields["flavor_text_fr"]
+            logger.info(f"Using flavor text for French effect of {name}")
         # extract french effect or flavor text
         
         # Extract generation
@@ -174,10 +162,13 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create and run importer
-    importer = AbilityImporter()
+    args = parse_arguments("Import abilities from the PokeAPI")
+    
+    # Create and run importer on the snapshot or the cached live API
+    importer = AbilityImporter(build_client())
     # Use the configuration variables
-    abilities = importer.import_all()
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        abilities = importer.import_all(incremental=args.incremental)
     
     # Print summary
     print(f"Successfully imported {len(abilities)} abilities.")
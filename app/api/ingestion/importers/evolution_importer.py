@@ -1,13 +1,17 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.api.ingestion.group_commit import GroupCommit
+from app.db.engine import engine as db_engine, bulk_loading
+from app.api.ingestion.manifest import parse_arguments
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.evolution import Evolution
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from functools import partial
 import ujson
-import time
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
+from sqlalchemy.engine import Engine
 
 # Configuration variables
 LIMIT_IMPORT = False
@@ -17,23 +21,28 @@ logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = db_engine.get_engine(DB_PATH.name, DB_PATH.parent)
 
 class EvolutionImporter:
     """ Importer for Pokemon evolution data. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the evolution importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
+        self.engine = engine
         self.get_evolution_chains = partial(self.client.call, EndPoint.EVOLUTION_CHAIN)
         self.get_pokemon_species = partial(self.client.call, EndPoint.POKEMON_SPECIES)
         self.get_pokemon = partial(self.client.call, EndPoint.POKEMON)
         
+        # Shared store: species are usually already fetched by the Pokemon importer
+        self.store = store or resource_store
+        
     def import_all(self, limit: Optional[int] = None) -> List[Evolution]:
         """ Import all evolution chains from the API and store them in the database.
         Args:
@@ -41,59 +50,45 @@ class EvolutionImporter:
         Returns:
             List of imported Evolution objects """
         # Ensure tables exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         # create tables if they don't exist
         
-        chains_list = self.get_evolution_chains(limit=1)
-        total_count = chains_list.get("count", 0)
-        
         if limit is not None:
-            total_count = min(limit, total_count)
-            logger.info(f"Limiting import to {total_count} evolution chains")
+            logger.info(f"Limiting import to {limit} evolution chains")
         
-        logger.info(f"Starting import of {total_count} evolution chains...")
+        logger.info("Starting import of evolution chains...")
         
-        all_chains = self.get_evolution_chains(limit=total_count).get("results", [])
         imported_evolutions = []
-        # get evolution chains list
         
-        with Session(engine) as session:
-            for i, chain_info in enumerate(all_chains, 1):
-                if limit is not None and i > limit:
-                    break
-                    
-                try:
-                    # Extract URL and get resource_id from the last segment
-                    url = chain_info.get("url", "")
-                    resource_id = url.rstrip("/").split("/")[-1]
-                    
-                    chain_data = self.get_evolution_chains(resource_id=resource_id)
+        with Session(self.engine) as session:
+            with GroupCommit(session, interval=None) as group:
+                for page in self.client.iter_pages(EndPoint.EVOLUTION_CHAIN, limit=limit):
+                    fetched = []
+                    for chain_info in page.get("results", []):
+                        # Extract URL and get resource_id from the last segment
+                        url = chain_info.get("url", "")
+                        resource_id = url.rstrip("/").split("/")[-1]
+                        try:
+                            chain_data = self.get_evolution_chains(resource_id=resource_id)
+                            
+                            # Process the evolution chain recursively
+                            fetched.append((resource_id, self._process_chain(chain_data)))
+                        except Exception as e:
+                            logger.error(f"Error importing evolution chain {resource_id}: {e}")
+                            continue  # Skip to next chain on error
                     
-                    # Process the evolution chain recursively
-                    evolution_records = self._process_chain(chain_data)
-                    for evolution in evolution_records:
-                        session.add(evolution)
-                        imported_evolutions.append(evolution)
-                    
-                    logger.info(f"Imported evolution chain: {resource_id} (Records: {len(evolution_records)})")
-                    
-                    # Small delay to be respectful to the API
-                    time.sleep(1.0)
-                except Exception as e:
-                    logger.error(f"Error importing evolution chain {i}: {e}")
-                    continue  # Skip to next chain on error
+                    for resource_id, evolution_records in fetched:
+                        with group.item(f"evolution chain {resource_id}"):
+                            session.add_all(evolution_records)
+                        if group.last_written:
+                            imported_evolutions.extend(evolution_records)
+                            logger.info(f"Imported evolution chain: {resource_id} (Records: {len(evolution_records)})")
+                    group.commit()
             
-            # Commit successful imports even if some failed
-            try:
-                session.commit()
-                logger.info(f"Committed {len(imported_evolutions)} evolution records to database")
-            except Exception as e:
-                logger.error(f"Failed to commit changes: {e}")
-                session.rollback()
-                return []
-            # process and save each evolution chain, continue on errors
+            logger.info(f"Committed {len(imported_evolutions)} evolution records to database ({group.stats()})")
         
         logger.info(f"Import completed. {len(imported_evolutions)} evolution records imported.")
+        logger.info(f"Resource store: {self.store.stats()}")
         return imported_evolutions
     
     def _process_chain(self, chain_data: Dict[str, Any]) -> List[Evolution]:
@@ -162,7 +157,7 @@ class EvolutionImporter:
             return None
     
     def _get_pokemon_id_from_species(self, species_id: int) -> Optional[int]:
-        """ Get the Pokemon ID from a species ID by making an API call.
+        """ Get the Pokemon ID from a species ID, through the shared store.
         Args:
             species_id: The species ID
             
@@ -170,7 +165,7 @@ class EvolutionImporter:
             Pokemon ID or None if not found
         """
         try:
-            species_data = self.get_pokemon_species(resource_id=str(species_id))
+            species_data = self.store.fetch(self.client, EndPoint.POKEMON_SPECIES, species_id)
             default_variety = next(
                 (v for v in species_data.get("varieties", []) 
                  if v.get("is_default", False)), 
@@ -225,10 +220,13 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create and run importer
-    importer = EvolutionImporter()
+    args = parse_arguments("Import evolution chains from the PokeAPI")
+    
+    # Create and run importer on the snapshot or the cached live API
+    importer = EvolutionImporter(build_client())
     # Use the configuration variables
-    evolutions = importer.import_all()
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        evolutions = importer.import_all()
     
     # Print summary
     print(f"Successfully imported {len(evolutions)} evolution records.")
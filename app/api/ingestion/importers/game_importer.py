@@ -1,5 +1,10 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.api.ingestion.group_commit import GroupCommit
+from app.db.engine import engine as db_engine, bulk_loading
+from app.api.ingestion.extractors import Extractor, localized
+from app.api.ingestion.manifest import ResourceManifest, parse_arguments
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.game import Game
 from pathlib import Path
@@ -7,8 +12,8 @@ from typing import Dict, Any, List, Optional
 from functools import partial
 import ujson
 import roman
-import time
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
+from sqlalchemy.engine import Engine
 
 # Configuration variables
 LIMIT_IMPORT = False
@@ -18,85 +23,88 @@ logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = db_engine.get_engine(DB_PATH.name, DB_PATH.parent)
+
+# Localized names of a generation
+GENERATION_FIELDS = Extractor(name_fr=localized("names", "fr"), name_en=localized("names", "en"))
 
 class GameImporter:
     """ Importer for Pokemon game data. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the game importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
+        self.engine = engine
         self.get_versions = partial(self.client.call, EndPoint.GAME)
         self.get_version_groups = partial(self.client.call, EndPoint.VERSION_GROUP)
         self.get_generations = partial(self.client.call, EndPoint.GENERATION)
         self.get_regions = partial(self.client.call, EndPoint.REGION)
         
-        # Cache to avoid repeated API calls
-        self.version_group_cache = {}
-        self.generation_cache = {}
-        self.region_cache = {}
+        # Shared store to avoid repeated API calls across importers
+        self.store = store or resource_store
         
-    def import_all(self, limit: Optional[int] = None) -> List[Game]:
+    def import_all(self, limit: Optional[int] = None, incremental: bool = False) -> List[Game]:
         """ Import all game versions from the API and store them in the database.
         Args:
             limit: Optional maximum number of game versions to import
+            incremental: Skip game versions unchanged since the last import and upsert the others
         Returns:
             List of imported Game objects """
         # Ensure tables exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         # create tables if they don't exist
         
-        versions_list = self.get_versions(limit=1)
-        total_count = versions_list.get("count", 0)
-        
         if limit is not None:
-            total_count = min(limit, total_count)
-            logger.info(f"Limiting import to {total_count} game versions")
+            logger.info(f"Limiting import to {limit} game versions")
         
-        logger.info(f"Starting import of {total_count} game versions...")
+        logger.info("Starting import of game versions...")
         
-        all_versions = self.get_versions(limit=total_count).get("results", [])
         imported_games = []
-        # get versions list
         
-        with Session(engine) as session:
-            for i, version_info in enumerate(all_versions, 1):
-                if limit is not None and i > limit:
-                    break
-                    
-                try:
-                    # Extract URL and get resource_id from the last segment
-                    url = version_info.get("url", "")
-                    resource_id = url.rstrip("/").split("/")[-1]
+        with Session(self.engine) as session:
+            manifest = ResourceManifest(session, EndPoint.GAME)
+            with GroupCommit(session, interval=None) as group:
+                for page in self.client.iter_pages(EndPoint.GAME, limit=limit):
+                    fetched = []
+                    for version_info in page.get("results", []):
+                        # Extract URL and get resource_id from the last segment
+                        url = version_info.get("url", "")
+                        resource_id = url.rstrip("/").split("/")[-1]
+                        try:
+                            version_data = self.get_versions(resource_id=resource_id)
+                            content_hash = manifest.content_hash(version_data)
+                            if incremental and manifest.is_unchanged(resource_id, content_hash):
+                                continue
+                            # skip game versions unchanged since the last import
+                            
+                            game_obj = self._process_version_data(version_data)
+                        except Exception as e:
+                            logger.error(f"Error importing game version {resource_id}: {e}")
+                            continue  # Skip to next version on error
+                        if game_obj:
+                            fetched.append((resource_id, game_obj, content_hash))
                     
-                    version_data = self.get_versions(resource_id=resource_id)
-                    
-                    game_obj = self._process_version_data(version_data)
-                    if game_obj:
-                        session.add(game_obj)
-                        imported_games.append(game_obj)
-                        logger.info(f"Imported game version: {game_obj.name} (Group: {game_obj.version_group})")
-                    
-                    # Small delay to be respectful to the API
-                    time.sleep(0.5)
-                except Exception as e:
-                    logger.error(f"Error importing game version {i}: {e}")
-                    continue  # Skip to next version on error
-            
-            # Commit successful imports even if some failed
-            try:
-                session.commit()
-                logger.info(f"Committed {len(imported_games)} game versions to database")
-            except Exception as e:
-                logger.error(f"Failed to commit changes: {e}")
-                session.rollback()
-                return []
-            # process and save each game version, continue on errors
+                    for resource_id, game_obj, content_hash in fetched:
+                        with group.item(f"game version {resource_id}"):
+                            if incremental:
+                                session.merge(game_obj)
+                            else:
+                                session.add(game_obj)
+                            manifest.record(resource_id, content_hash)
+                        if group.last_written:
+                            imported_games.append(game_obj)
+                            logger.info(f"Imported game version: {game_obj.name} (Group: {game_obj.version_group})")
+                    group.commit()
+            
+            logger.info(f"Committed {len(imported_games)} game versions to database ({group.stats()})")
+            if manifest.skipped:
+                logger.info(f"Skipped {manifest.skipped} unchanged game versions")
         
         logger.info(f"Import completed. {len(imported_games)} game versions imported.")
         return imported_games
@@ -117,13 +125,8 @@ class GameImporter:
             version_group_url = version_data.get("version_group", {}).get("url", "")
             version_group_id = version_group_url.rstrip("/").split("/")[-1]
             
-            # Get version group info from cache or API
-            if version_group_id in self.version_group_cache:
-                version_group_data = self.version_group_cache[version_group_id]
-            else:
-                version_group_data = self.get_version_groups(resource_id=version_group_id)
-                self.version_group_cache[version_group_id] = version_group_data
-                time.sleep(0.5)  # Small delay to be respectful to the API
+            # Get version group info from the shared store or API
+            version_group_data = self.store.fetch(self.client, EndPoint.VERSION_GROUP, version_group_id)
             
             version_group_name = version_group_data.get("name")
             
@@ -131,13 +134,8 @@ class GameImporter:
             generation_url = version_group_data.get("generation", {}).get("url", "")
             generation_id = generation_url.rstrip("/").split("/")[-1]
             
-            # Get generation info from cache or API
-            if generation_id in self.generation_cache:
-                generation_data = self.generation_cache[generation_id]
-            else:
-                generation_data = self.get_generations(resource_id=generation_id)
-                self.generation_cache[generation_id] = generation_data
-                time.sleep(0.5)  # Small delay to be respectful to the API
+            # Get generation info from the shared store or API
+            generation_data = self.store.fetch(self.client, EndPoint.GENERATION, generation_id)
             
             # Convert generation name (e.g., "generation-i") to number
             generation_name = generation_data.get("name", "")
@@ -145,14 +143,9 @@ class GameImporter:
             generation_number = int(generation_id)  # Default to ID
             
             # Get localized generation name (English or French)
-            formatted_generation_name = None
-            for name_entry in generation_data.get("names", []):
-                language = name_entry.get("language", {}).get("name", "")
-                if language == "fr":  # Prioritize French
-                    formatted_generation_name = name_entry.get("name")
-                    break
-                elif language == "en":
-                    formatted_generation_name = name_entry.get("name")
+            generation_names = GENERATION_FIELDS.extract(generation_data)
+            # Prioritize French
+            formatted_generation_name = generation_names["name_fr"] or generation_names["name_en"]
             
             # Try to extract roman numeral from name if no localized name found
             if not formatted_generation_name and generation_name.startswith("generation-"):
@@ -166,13 +159,8 @@ class GameImporter:
             region_url = generation_data.get("main_region", {}).get("url", "")
             region_id = region_url.rstrip("/").split("/")[-1]
             
-            # Get region info from cache or API
-            if region_id in self.region_cache:
-                region_data = self.region_cache[region_id]
-            else:
-                region_data = self.get_regions(resource_id=region_id)
-                self.region_cache[region_id] = region_data
-                time.sleep(0.5)  # Small delay to be respectful to the API
+            # Get region info from the shared store or API
+            region_data = self.store.fetch(self.client, EndPoint.REGION, region_id)
             
             region_name = region_data.get("name")
             
@@ -201,10 +189,13 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create and run importer
-    importer = GameImporter()
+    args = parse_arguments("Import game versions from the PokeAPI")
+    
+    # Create and run importer on the snapshot or the cached live API
+    importer = GameImporter(build_client())
     # Use the configuration variables
-    games = importer.import_all()
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        games = importer.import_all(incremental=args.incremental)
     
     # Print summary
     print(f"Successfully imported {len(games)} game versions.")
@@ -1,13 +1,16 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.api.ingestion.group_commit import GroupCommit
+from app.db.engine import engine as db_engine, bulk_loading
+from app.api.ingestion.manifest import ResourceManifest, parse_arguments
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.machine import Machine
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from functools import partial
 import ujson
-import time
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
+from sqlalchemy.engine import Engine
 
 # Configuration variables
 LIMIT_IMPORT = False
@@ -17,84 +20,81 @@ logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = db_engine.get_engine(DB_PATH.name, DB_PATH.parent)
 
 class MachineImporter:
     """ Importer for Pokemon machines (TM/HM) data. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the machine importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
-        self.get_machines = partial(self.client.call, EndPoint.MACHINE)
-        self.get_moves = partial(self.client.call, EndPoint.MOVE)
-        self.get_items = partial(self.client.call, EndPoint.ITEM)
+        self.engine = engine
         
-        # Cache to avoid repeated API calls
-        self.move_cache = {}
+        # Shared store to avoid repeated API calls across importers
+        self.store = store or resource_store
         
-    def import_all(self, limit: Optional[int] = None) -> List[Machine]:
+    def import_all(self, limit: Optional[int] = None, incremental: bool = False) -> List[Machine]:
         """ Import all machines from the API and store them in the database.
         Args:
             limit: Optional maximum number of machines to import
+            incremental: Skip machines unchanged since the last import and upsert the others
         Returns:
             List of imported Machine objects """
         # Ensure tables exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         # create tables if they don't exist
         
-        machines_list = self.get_machines(limit=1)
-        total_count = machines_list.get("count", 0)
-        
         if limit is not None:
-            total_count = min(limit, total_count)
-            logger.info(f"Limiting import to {total_count} machines")
-        
-        logger.info(f"Starting import of {total_count} machines...")
+            logger.info(f"Limiting import to {limit} machines")
         
-        all_machines = []
-        for i in range(1, total_count + 1):
-            try:
-                # Machine IDs are sequential
-                machine_data = self.get_machines(resource_id=str(i))
-                all_machines.append(machine_data)
-            except Exception as e:
-                logger.error(f"Error fetching machine {i}: {e}")
-                break
-            # Sleep to be respectful to the API
-            time.sleep(0.5)
+        logger.info("Starting import of machines...")
         
         imported_machines = []
-        # get machines list
         
-        with Session(engine) as session:
-            for i, machine_data in enumerate(all_machines, 1):
-                if limit is not None and i > limit:
-                    break
+        with Session(self.engine) as session:
+            manifest = ResourceManifest(session, EndPoint.MACHINE)
+            with GroupCommit(session, interval=None) as group:
+                for page in self.client.iter_pages(EndPoint.MACHINE, limit=limit):
+                    fetched = []
+                    for machine_info in page.get("results", []):
+                        # Extract URL and get resource_id from the last segment
+                        url = machine_info.get("url", "")
+                        resource_id = url.rstrip("/").split("/")[-1]
+                        try:
+                            machine_data = self.store.fetch(self.client, EndPoint.MACHINE, resource_id)
+                            content_hash = manifest.content_hash(machine_data)
+                            if incremental and manifest.is_unchanged(resource_id, content_hash):
+                                continue
+                            # skip machines unchanged since the last import
+                            
+                            machine_obj = self._process_machine_data(machine_data)
+                        except Exception as e:
+                            logger.error(f"Error importing machine {resource_id}: {e}")
+                            continue  # Skip to next machine on error
+                        if machine_obj:
+                            fetched.append((resource_id, machine_obj, content_hash))
                     
-                try:
-                    machine_obj = self._process_machine_data(machine_data)
-                    if machine_obj:
-                        session.add(machine_obj)
-                        imported_machines.append(machine_obj)
-                        logger.info(f"Imported machine: {machine_obj.machine_number} - {machine_obj.move_name} (Version: {machine_obj.version_group})")
-                except Exception as e:
-                    logger.error(f"Error importing machine {i}: {e}")
-                    continue  # Skip to next machine on error
+                    for resource_id, machine_obj, content_hash in fetched:
+                        with group.item(f"machine {resource_id}"):
+                            if incremental:
+                                session.merge(machine_obj)
+                            else:
+                                session.add(machine_obj)
+                            manifest.record(machine_obj.id, content_hash)
+                        if group.last_written:
+                            imported_machines.append(machine_obj)
+                            logger.info(f"Imported machine: {machine_obj.machine_number} - {machine_obj.move_name} (Version: {machine_obj.version_group})")
+                    group.commit()
             
-            # Commit successful imports even if some failed
-            try:
-                session.commit()
-                logger.info(f"Committed {len(imported_machines)} machines to database")
-            except Exception as e:
-                logger.error(f"Failed to commit changes: {e}")
-                session.rollback()
-                return []
-            # process and save each machine, continue on errors
+            logger.info(f"Committed {len(imported_machines)} machines to database ({group.stats()})")
+            if manifest.skipped:
+                logger.info(f"Skipped {manifest.skipped} unchanged machines")
         
         logger.info(f"Import completed. {len(imported_machines)} machines imported.")
         return imported_machines
@@ -147,10 +147,13 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create and run importer
-    importer = MachineImporter()
+    args = parse_arguments("Import machines from the PokeAPI")
+    
+    # Create and run importer on the snapshot or the cached live API
+    importer = MachineImporter(build_client())
     # Use the configuration variables
-    machines = importer.import_all()
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        machines = importer.import_all(incremental=args.incremental)
     
     # Print summary
     print(f"Successfully imported {len(machines)} machines.")
@@ -1,13 +1,18 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.api.ingestion.group_commit import GroupCommit
+from app.db.engine import engine as db_engine, bulk_loading
+from app.api.ingestion.extractors import Extractor, localized
+from app.api.ingestion.manifest import ResourceManifest, parse_arguments
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.move import Move
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from functools import partial
 import roman
-import time
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
+from sqlalchemy.engine import Engine
 import ujson
 
 # Configuration variables
@@ -18,77 +23,89 @@ logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = db_engine.get_engine(DB_PATH.name, DB_PATH.parent)
+
+# Localized texts of a move, read in a single pass per list
+MOVE_FIELDS = Extractor(
+    name_fr=localized("names", "fr"),
+    flavor_text_en=localized("flavor_text_entries", "en", "flavor_text"),
+    flavor_text_fr=localized("flavor_text_entries", "fr", "flavor_text"),
+    effect_en=localized("effect_entries", "en", "effect"),
+    effect_fr=localized("effect_entries", "fr", "effect"),
+)
 
 class MoveImporter:
     """ Importer for Pokemon move data. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the move importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
+        self.engine = engine
         self.get_moves = partial(self.client.call, EndPoint.MOVE)
+        self.store = store or resource_store
         
-    def import_all(self, limit: Optional[int] = None) -> List[Move]:
+    def import_all(self, limit: Optional[int] = None, incremental: bool = False) -> List[Move]:
         """ Import all moves from the API and store them in the database.
         Args:
             limit: Optional maximum number of moves to import
+            incremental: Skip moves unchanged since the last import and upsert the others
         Returns:
             List of imported Move objects """
         # Ensure tables exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         # create tables if they don't exist
         
-        moves_list = self.get_moves(limit=1)
-        total_count = moves_list.get("count", 0)
-        
         if limit is not None:
-            total_count = min(limit, total_count)
-            logger.info(f"Limiting import to {total_count} moves")
+            logger.info(f"Limiting import to {limit} moves")
         
-        logger.info(f"Starting import of {total_count} moves...")
+        logger.info("Starting import of moves...")
         
-        all_moves = self.get_moves(limit=total_count).get("results", [])
         imported_moves = []
-        # get moves list
         
-        with Session(engine) as session:
-            for i, move_info in enumerate(all_moves, 1):
-                if limit is not None and i > limit:
-                    break
-                    
-                try:
-                    # Extract URL and get resource_id from the last segment
-                    url = move_info.get("url", "")
-                    resource_id = url.rstrip("/").split("/")[-1]
-                    
-                    move_data = self.get_moves(resource_id=resource_id)
+        with Session(self.engine) as session:
+            manifest = ResourceManifest(session, EndPoint.MOVE)
+            with GroupCommit(session, interval=None) as group:
+                for page in self.client.iter_pages(EndPoint.MOVE, limit=limit):
+                    fetched = []
+                    for move_info in page.get("results", []):
+                        # Extract URL and get resource_id from the last segment
+                        url = move_info.get("url", "")
+                        resource_id = url.rstrip("/").split("/")[-1]
+                        try:
+                            move_data = self.store.fetch(self.client, EndPoint.MOVE, resource_id)
+                            content_hash = manifest.content_hash(move_data)
+                            if incremental and manifest.is_unchanged(resource_id, content_hash):
+                                continue
+                            # skip moves unchanged since the last import
+                            
+                            move_obj = self._process_move_data(move_data)
+                        except Exception as e:
+                            logger.error(f"Error importing move {resource_id}: {e}")
+                            continue  # Skip to next move on error
+                        if move_obj:
+                            fetched.append((resource_id, move_obj, content_hash))
                     
-                    move_obj = self._process_move_data(move_data)
-                    if move_obj:
-                        session.add(move_obj)
-                        imported_moves.append(move_obj)
-                        logger.info(f"Imported move: {move_obj.name} (ID: {move_obj.id})")
-                    
-                    # Small delay to be respectful to the API
-                    time.sleep(0.5)
-                except Exception as e:
-                    logger.error(f"Error importing move {i}: {e}")
-                    continue  # Skip to next move on error
+                    for resource_id, move_obj, content_hash in fetched:
+                        with group.item(f"move {resource_id}"):
+                            if incremental:
+                                session.merge(move_obj)
+                            else:
+                                session.add(move_obj)
+                            manifest.record(resource_id, content_hash)
+                        if group.last_written:
+                            imported_moves.append(move_obj)
+                            logger.info(f"Imported move: {move_obj.name} (ID: {move_obj.id})")
+                    group.commit()
             
-            # Commit successful imports even if some failed
-            try:
-                session.commit()
-                logger.info(f"Committed {len(imported_moves)} moves to database")
-            except Exception as e:
-                logger.error(f"Failed to commit changes: {e}")
-                session.rollback()
-                return []
-            # process and save each move, continue on errors
+            logger.info(f"Committed {len(imported_moves)} moves to database ({group.stats()})")
+            if manifest.skipped:
+                logger.info(f"Skipped {manifest.skipped} unchanged moves")
         
         logger.info(f"Import completed. {len(imported_moves)} moves imported.")
         return imported_moves
@@ -104,13 +121,10 @@ class MoveImporter:
         try:
             move_id = data.get("id")
             name = data.get("name")
+            fields = MOVE_FIELDS.extract(data)
             
             # Extract French name
-            name_fr = None
-            for name_entry in data.get("names", []):
-                if name_entry.get("language", {}).get("name") == "fr":
-                    name_fr = name_entry.get("name")
-                    break
+            name_fr = fields["name_fr"]
             
             # Extract damage, precision
             damage = data.get("power")
@@ -123,42 +137,26 @@ class MoveImporter:
                 damage_class = damage_class_data.get("name")
             
             # Extract flavor text (English) - plus conviviale pour l'utilisateur
-            effect = None
-            flavor_entries_en = [entry for entry in data.get("flavor_text_entries", []) 
-                                if entry.get("language", {}).get("name") == "en"]
-            
-            if flavor_entries_en:
-                # Prendre le flavor text le plus récent
-                effect = flavor_entries_en[0].get("flavor_text")
+            # Prendre le premier flavor text anglais
+            effect = fields["flavor_text_en"]
             
             # Si aucun flavor text anglais, essayons d'utiliser l'effect technique
             if not effect:
-                for effect_entry in data.get("effect_entries", []):
-                    if effect_entry.get("language", {}).get("name") == "en":
-                        effect = effect_entry.get("effect")
-                        if effect and "$effect_chance" in effect:
-                            effect_chance = data.get("effect_chance", 0)
-                            effect = effect.replace("$effect_chance", str(effect_chance))
-                        break
+                effect = fields["effect_en"]
+                if effect and "$effect_chance" in effect:
+                    effect_chance = data.get("effect_chance", 0)
+                    effect = effect.replace("$effect_chance", str(effect_chance))
             
             # Extract flavor text (French)
-            effect_fr = None
-            flavor_entries_fr = [entry for entry in data.get("flavor_text_entries", []) 
-                                if entry.get("language", {}).get("name") == "fr"]
-            
-            if flavor_entries_fr:
-                # Prendre le flavor text le plus récent
-                effect_fr = flavor_entries_fr[0].get("flavor_text")
+            # Prendre le premier flavor text français
+            effect_fr = fields["flavor_text_fr"]
             
             # Si aucun flavor text français, essayons d'utiliser l'effect technique
             if not effect_fr:
-                for effect_entry in data.get("effect_entries", []):
-                    if effect_entry.get("language", {}).get("name") == "fr":
-                        effect_fr = effect_entry.get("effect")
-                        if effect_fr and "$effect_chance" in effect_fr:
-                            effect_chance = data.get("effect_chance", 0)
-                            effect_fr = effect_fr.replace("$effect_chance", str(effect_chance))
-                        break
+                effect_fr = fields["effect_fr"]
+                if effect_fr and "$effect_chance" in effect_fr:
+                    effect_chance = data.get("effect_chance", 0)
+                    effect_fr = effect_fr.replace("$effect_chance", str(effect_chance))
             
             # Extract generation
             generation = None
@@ -197,10 +195,13 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create and run importer
-    importer = MoveImporter()
+    args = parse_arguments("Import moves from the PokeAPI")
+    
+    # Create and run importer on the snapshot or the cached live API
+    importer = MoveImporter(build_client())
     # Use the configuration variables
-    moves = importer.import_all()
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        moves = importer.import_all(incremental=args.incremental)
     
     # Print summary
     print(f"Successfully imported {len(moves)} moves.")
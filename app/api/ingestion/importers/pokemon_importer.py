@@ -1,5 +1,14 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.db.engine import engine as db_engine, bulk_loading
+from app.api.ingestion.manifest import ResourceManifest, parse_arguments
+from app.api.ingestion.checkpoint import Checkpoint
+from app.api.ingestion.pipeline import Pipeline, FETCH_WORKERS, TRANSFORM_WORKERS, WRITE_BATCH_SIZE
+from app.api.ingestion.bulk_writer import BulkWriter
+from app.api.ingestion.group_commit import GroupCommit
+from app.api.ingestion.extractors import Extractor, Lookup, localized, url_id
+from app.api.ingestion.learnset_loader import LearnsetBuffer, LearnsetLoader
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.pokemon import Pokemon
 from app.models.tables.pokemon_detail import PokemonDetail
@@ -7,15 +16,16 @@ from app.models.tables.pokemon_stat import PokemonStat
 from app.models.tables.pokemon_sprite import PokemonSprite
 from app.models.tables.pokedex_number import PokedexNumber
 from app.models.tables.pokemon_ability import PokemonAbility
-from app.models.tables.pokemon_learnset import PokemonLearnset
 from app.models.tables.move import Move
 from app.models.tables.ability import Ability
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 from functools import partial
+from itertools import islice
 import ujson
-import time
-from sqlmodel import Session, SQLModel, create_engine, select, delete
+from sqlmodel import Session, SQLModel, select
+from sqlalchemy.engine import Engine
 
 # Configuration variables
 LIMIT_IMPORT = False
@@ -25,151 +35,308 @@ logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = db_engine.get_engine(DB_PATH.name, DB_PATH.parent)
+
+# Base stats of the API, by PokemonStat field
+STAT_FIELDS = {
+    "hp": "hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special_attack": "special-attack",
+    "special_defense": "special-defense",
+    "speed": "speed",
+}
+# Pokedexes of the API, by PokedexNumber field
+POKEDEX_FIELDS = {
+    "national": "national",
+    "kanto": "kanto",
+    "original_johto": "original-johto",
+    "updated_johto": "updated-johto",
+    "hoenn": "hoenn",
+    "original_sinnoh": "original-sinnoh",
+    "extended_sinnoh": "extended-sinnoh",
+    "unova_bw": "unova",  # Approximation
+    "kalos_central": "kalos-central",
+    "kalos_coastal": "kalos-coastal",
+    "kalos_mountain": "kalos-mountain",
+    "alola": "alola",
+    "melemele": "melemele",
+    "akala": "akala",
+    "ulaula": "ulaula",
+    "poni": "poni",
+    "galar": "galar",
+    "isle_of_armor": "isle-of-armor",
+    "crown_tundra": "crown-tundra",
+    "hisui": "hisui",
+    "paldea": "paldea",
+}
+
+# Fields read from the lists of each payload, in a single pass per payload
+POKEMON_FIELDS = Extractor(
+    type_1_id=Lookup("types", ("slot",), 1, ("type", "url"), convert=url_id),
+    type_2_id=Lookup("types", ("slot",), 2, ("type", "url"), convert=url_id),
+    **{field: Lookup("stats", ("stat", "name"), stat, ("base_stat",), default=0) for field, stat in STAT_FIELDS.items()},
+)
+SPECIES_FIELDS = Extractor(
+    name_en=localized("names", "en"),
+    name_fr=localized("names", "fr"),
+    **{field: Lookup("pokedex_numbers", ("pokedex", "name"), pokedex, ("entry_number",))
+       for field, pokedex in POKEDEX_FIELDS.items()},
+)
+FORM_FIELDS = Extractor(
+    name_en=localized("names", "en"),
+    name_fr=localized("names", "fr"),
+    description_en=localized("form_names", "en"),
+    description_fr=localized("form_names", "fr"),
+)
+
+@dataclass
+class PokemonRows:
+    """ Rows of one Pokemon, built by the transform stage and written by the load stage. """
+    pokemon: Pokemon
+    detail: PokemonDetail
+    stat: PokemonStat
+    sprite: PokemonSprite
+    pokedex_number: PokedexNumber
+    abilities: List[PokemonAbility]
+    learnset: LearnsetBuffer
+    content_hash: str
+
 
 class PokemonImporter:
     """ Importer for Pokemon data from both Pokemon and Pokemon-species endpoints. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the Pokemon importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
+        self.engine = engine
         self.get_pokemon = partial(self.client.call, EndPoint.POKEMON)
-        self.get_pokemon_species = partial(self.client.call, EndPoint.POKEMON_SPECIES)
-        self.get_pokemon_form = partial(self.client.call, EndPoint.POKEMON_FORM)
-        self.get_abilities = partial(self.client.call, EndPoint.ABILITY)
-        self.get_moves = partial(self.client.call, EndPoint.MOVE)
-        
-        # Cache to avoid repeated API calls
-        self.species_cache = {}
-        self.pokemon_cache = {}
-        self.ability_cache = {}
-        self.move_cache = {}
-        self.form_cache = {}
-        
-    def import_all(self):
-        """ Import all Pokemon data to the database. """
+        
+        # Shared store to avoid repeated API calls across importers
+        self.store = store or resource_store
+        self.learnset_loader = LearnsetLoader()
+        # Set once a Pokemon fails to load: the checkpoint no longer moves for the rest of the import
+        self.checkpoint_held = False
+        
+    def import_all(self, incremental: bool = False, resume: bool = False,
+                   fetch_workers: int = FETCH_WORKERS, transform_workers: int = TRANSFORM_WORKERS,
+                   batch_size: int = WRITE_BATCH_SIZE):
+        """ Import all Pokemon data to the database.
+        
+        Fetching, transformation and writes run as pipelined stages: concurrent fetchers,
+        a pool of transformers and a single writer committing batches of Pokemon.
+        Args:
+            incremental: Skip Pokemon whose Pokemon and species data are unchanged since the last import
+            resume: Continue an interrupted import from its saved checkpoint
+            fetch_workers: Number of threads fetching Pokemon, species and form data
+            transform_workers: Number of threads turning API data into rows
+            batch_size: Number of Pokemon committed together """
         # Create tables if they don't exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         
-        with Session(engine) as session:
+        with Session(self.engine) as session:
             try:
-                count = 0
+                manifest = ResourceManifest(session, EndPoint.POKEMON)
                 
-                for pokemon_id, pokemon_data in self.client.get_items_generator(EndPoint.POKEMON):
-                    if LIMIT_IMPORT and count >= IMPORT_LIMIT:
-                        logger.info(f"Reached import limit of {IMPORT_LIMIT}")
-                        break
-                    
-                    # Fetching the corresponding species data
-                    species_id = self._extract_id_from_url(pokemon_data.get("species", {}).get("url", ""))
-                    species_data = self._get_species_data(species_id)
-                    
-                    if not species_data:
-                        logger.warning(f"Could not fetch species data for Pokemon ID {pokemon_id}")
-                        continue
-                    
-                    try:
-                        # Create Pokemon entry
-                        pokemon = self._create_pokemon(pokemon_id, pokemon_data, species_data, session)
-                        
-                        # Create related entries
-                        self._create_pokemon_detail(pokemon.id, pokemon_data, species_data, session)
-                        self._create_pokemon_stat(pokemon.id, pokemon_data, session)
-                        self._create_pokemon_sprite(pokemon.id, pokemon_data, session)
-                        self._create_pokedex_number(pokemon.id, species_data, session)
-                        self._create_pokemon_abilities(pokemon.id, pokemon_data, session)
-                        self._create_pokemon_learnset(pokemon.id, pokemon_data, session)
-                        
-                        count += 1
-                        logger.info(f"Imported Pokemon {pokemon.name_en} (ID: {pokemon.id})")
-                        
-                        # Commit after each Pokemon to avoid losing all data if something fails
-                        session.commit()
-                        
-                        # Small delay to respect API rate limits
-                        time.sleep(0.5)
-                        
-                    except Exception as e:
-                        logger.error(f"Error importing Pokemon ID {pokemon_id}: {e}")
-                        session.rollback()
+                importer_name = type(self).__name__
+                if resume:
+                    checkpoint = Checkpoint.load(session, importer_name, EndPoint.POKEMON)
+                else:
+                    checkpoint = Checkpoint(importer_name, EndPoint.POKEMON)
+                # start over unless resuming
+                
+                listing = self.client.iter_listing(EndPoint.POKEMON, offset=checkpoint.offset)
+                if LIMIT_IMPORT:
+                    logger.info(f"Limiting import to {IMPORT_LIMIT} Pokemon")
+                    listing = islice(listing, IMPORT_LIMIT)
+                
+                self.checkpoint_held = False
+                pipeline = Pipeline(
+                    fetch=self._fetch,
+                    transform=partial(self._transform, manifest, incremental),
+                    load=partial(self._load, session, manifest, checkpoint),
+                    fetch_workers=fetch_workers,
+                    transform_workers=transform_workers,
+                    batch_size=batch_size,
+                )
+                metrics = pipeline.run(listing, start=checkpoint.offset)
+                
+                failed = metrics['fetch'].errors + metrics['transform'].errors + metrics['load'].errors
+                if failed:
+                    # The checkpoint stays before the first failed Pokemon, retried by --resume
+                    logger.warning(f"{failed} Pokemon failed, resume the import to retry them")
+                elif not LIMIT_IMPORT:
+                    # The whole listing went through: the next run starts over
+                    checkpoint.clear(session)
+                    session.commit()
                 
-                logger.info(f"Imported {count} Pokemon")
+                logger.info(f"Imported {metrics['load'].processed} Pokemon")
+                if manifest.skipped:
+                    logger.info(f"Skipped {manifest.skipped} unchanged Pokemon")
+                logger.info(f"Learnsets: {self.learnset_loader.stats()}")
+                logger.info(f"Resource store: {self.store.stats()}")
                 
             except Exception as e:
                 logger.error(f"Error during Pokemon import: {e}")
                 session.rollback()
                 raise
     
-    def _get_species_data(self, species_id: int) -> Optional[Dict[str, Any]]:
-        """ Get species data from the API or cache.
+    def _fetch(self, item_info: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]:
+        """ Fetch the Pokemon, species and form data of a listing entry (fetch stage).
         Args:
-            species_id: The species ID
+            item_info: Listing entry of the Pokemon
         Returns:
-            The species data or None if not found
+            The Pokemon ID, Pokemon data, species data and form data (None for regular forms)
         """
-        if not species_id:
-            return None
-            
-        if species_id in self.species_cache:
-            return self.species_cache[species_id]
-            
-        try:
-            species_data = self.get_pokemon_species(resource_id=str(species_id))
-            self.species_cache[species_id] = species_data
-            return species_data
-        except Exception as e:
-            logger.error(f"Error fetching species data for ID {species_id}: {e}")
-            return None
+        url = item_info.get("url", "")
+        pokemon_id = self._extract_id_from_url(url)
+        if not pokemon_id:
+            raise ValueError(f"Could not extract ID from URL: {url}")
+        
+        pokemon_data = self.get_pokemon(resource_id=str(pokemon_id))
+        
+        # Fetching the corresponding species data
+        species_id = self._extract_id_from_url(pokemon_data.get("species", {}).get("url", ""))
+        species_data = self._get_species_data(species_id)
+        if not species_data:
+            raise ValueError(f"Could not fetch species data for Pokemon ID {pokemon_id}")
+        
+        return pokemon_id, pokemon_data, species_data, self._get_variant_form_data(pokemon_id, pokemon_data)
     
-    def _get_ability_data(self, ability_id: int) -> Optional[Dict[str, Any]]:
-        """ Get ability data from the API or cache.
+    def _transform(self, manifest: ResourceManifest, incremental: bool,
+                   fetched: Tuple[int, Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]) -> Optional[PokemonRows]:
+        """ Turn fetched API data into the rows of a Pokemon (transform stage).
         Args:
-            ability_id: The ability ID
+            manifest: Manifest of the imported Pokemon
+            incremental: Drop Pokemon unchanged since the last import
+            fetched: Output of the fetch stage
         Returns:
-            The ability data or None if not found
+            The rows to write, or None for an unchanged Pokemon
         """
-        if not ability_id:
+        pokemon_id, pokemon_data, species_data, form_data = fetched
+        
+        content_hash = manifest.content_hash(pokemon_data, species_data)
+        if incremental and manifest.is_unchanged(pokemon_id, content_hash):
             return None
+        # skip Pokemon unchanged since the last import
+        
+        pokemon_fields = POKEMON_FIELDS.extract(pokemon_data)
+        species_fields = SPECIES_FIELDS.extract(species_data)
+        
+        return PokemonRows(
+            pokemon=self._build_pokemon(pokemon_id, pokemon_data, species_data, form_data, pokemon_fields, species_fields),
+            detail=self._build_pokemon_detail(pokemon_id, pokemon_data, species_data),
+            stat=self._build_pokemon_stat(pokemon_id, pokemon_fields),
+            sprite=self._build_pokemon_sprite(pokemon_id, pokemon_data),
+            pokedex_number=self._build_pokedex_number(pokemon_id, species_fields),
+            abilities=self._build_pokemon_abilities(pokemon_id, pokemon_data),
+            learnset=self._build_pokemon_learnset(pokemon_id, pokemon_data),
+            content_hash=content_hash,
+        )
+    
+    def _load(self, session: Session, manifest: ResourceManifest, checkpoint: Checkpoint,
+              batch: List[PokemonRows], watermark: int) -> int:
+        """ Write a batch of Pokemon in one transaction (load stage).
+        
+        Each table of the batch is written with a single set-based statement. When the batch
+        fails, its savepoint undoes the whole batch and its Pokemon are written again one by one,
+        each in a savepoint of the same transaction, so that a single bad Pokemon does not lose
+        the whole batch. The checkpoint then stays before the batch if one of them still fails.
+        Args:
+            session: Database session, only used from the writer thread
+            manifest: Manifest of the imported Pokemon
+            checkpoint: Checkpoint of the import, saved with the batch
+            batch: Rows of the Pokemon to write
+            watermark: Listing position up to which every Pokemon is processed once the batch is written
+        Returns:
+            Number of Pokemon written
+        """
+        held_offset = checkpoint.offset
+        if not self.checkpoint_held:
+            checkpoint.offset = watermark
+        last_id = batch[-1].pokemon.id if batch else checkpoint.last_id
+        
+        # A single commit for the batch, the fallback isolates each Pokemon in a savepoint
+        with GroupCommit(session, size=len(batch) + 1, interval=None,
+                         before_commit=lambda _: checkpoint.save(session, last_id)) as group:
+            with group.item(f"batch ending with Pokemon ID {last_id}"):
+                self._write_batch(batch, manifest, session)
+            written = batch if not group.failed else []
             
-        if ability_id in self.ability_cache:
-            return self.ability_cache[ability_id]
-            
-        try:
-            ability_data = self.get_abilities(resource_id=str(ability_id))
-            self.ability_cache[ability_id] = ability_data
-            return ability_data
-        except Exception as e:
-            logger.error(f"Error fetching ability data for ID {ability_id}: {e}")
-            return None
+            if group.failed:
+                logger.warning(f"Batch of {len(batch)} Pokemon failed, writing them one by one")
+                for rows in batch:
+                    with group.item(f"Pokemon ID {rows.pokemon.id}"):
+                        self._write_batch([rows], manifest, session)
+                    if group.last_written:
+                        written.append(rows)
+                if len(written) < len(batch):
+                    # Saved by the commit below: resuming retries the Pokemon that failed
+                    checkpoint.offset = held_offset
+                    self.checkpoint_held = True
+        
+        for rows in written:
+            logger.info(f"Imported Pokemon {rows.pokemon.name_en} (ID: {rows.pokemon.id})")
+        return len(written)
+    
+    def _write_batch(self, batch: List[PokemonRows], manifest: ResourceManifest, session: Session) -> None:
+        """ Write the rows of Pokemon with one statement per table, recording them in the manifest.
+        Args:
+            batch: Rows of the Pokemon
+            manifest: Manifest of the imported Pokemon
+            session: Database session
+        """
+        writer = BulkWriter(keep_existing=[PokedexNumber])
+        learnset = LearnsetBuffer()
+        for rows in batch:
+            self._write_rows(rows, writer)
+            learnset.extend(rows.learnset)
+        writer.flush(session)
+        self.learnset_loader.replace(session, learnset)
+        for rows in batch:
+            manifest.record(rows.pokemon.id, rows.content_hash)
+    
+    def _write_rows(self, rows: PokemonRows, writer: BulkWriter) -> None:
+        """ Buffer the upserts of a Pokemon, replacing its abilities.
+        Args:
+            rows: Rows of the Pokemon
+            writer: Bulk writer of the batch, pokedex numbers unknown by the API are kept
+        """
+        pokemon_id = rows.pokemon.id
+        
+        writer.upsert(rows.pokemon)
+        writer.upsert(rows.detail)
+        writer.upsert(rows.stat)
+        writer.upsert(rows.sprite)
+        writer.upsert(rows.pokedex_number)
+        
+        # Replace the abilities of a previous import, learnsets go through the learnset loader
+        writer.replace(PokemonAbility, "pokemon_id", pokemon_id, rows.abilities)
     
-    def _get_move_data(self, move_id: int) -> Optional[Dict[str, Any]]:
-        """ Get move data from the API or cache.
+    def _get_species_data(self, species_id: int) -> Optional[Dict[str, Any]]:
+        """ Get species data from the shared store or the API.
         Args:
-            move_id: The move ID
+            species_id: The species ID
         Returns:
-            The move data or None if not found
+            The species data or None if not found
         """
-        if not move_id:
+        if not species_id:
             return None
             
-        if move_id in self.move_cache:
-            return self.move_cache[move_id]
-            
         try:
-            move_data = self.get_moves(resource_id=str(move_id))
-            self.move_cache[move_id] = move_data
-            return move_data
+            return self.store.fetch(self.client, EndPoint.POKEMON_SPECIES, species_id)
         except Exception as e:
-            logger.error(f"Error fetching move data for ID {move_id}: {e}")
+            logger.error(f"Error fetching species data for ID {species_id}: {e}")
             return None
     
     def _get_pokemon_form_data(self, form_id: int) -> Optional[Dict[str, Any]]:
-        """ Get form data from the API or cache.
+        """ Get form data from the shared store or the API.
         Args:
             form_id: The form ID
         Returns:
@@ -178,15 +345,8 @@ class PokemonImporter:
         if not form_id:
             return None
             
-        if form_id in self.form_cache:
-            logger.info(f"Using cached form data for ID {form_id}")
-            return self.form_cache[form_id]
-            
         try:
-            logger.info(f"Fetching form data for Pokemon form ID {form_id}")
-            form_data = self.get_pokemon_form(resource_id=str(form_id))
-            self.form_cache[form_id] = form_data
-            return form_data
+            return self.store.fetch(self.client, EndPoint.POKEMON_FORM, form_id)
         except Exception as e:
             logger.error(f"Error fetching form data for ID {form_id}: {e}")
             return None
@@ -207,90 +367,84 @@ class PokemonImporter:
         except (ValueError, IndexError):
             return None
     
-    def _create_pokemon(self, pokemon_id: int, pokemon_data: Dict[str, Any], 
-                        species_data: Dict[str, Any], session: Session) -> Pokemon:
-        """ Create a Pokemon entry in the database.
+    def _get_variant_form_data(self, pokemon_id: int, pokemon_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """ Get the form data of a form variant, whose names are better than the species ones.
+        Args:
+            pokemon_id: The Pokemon ID
+            pokemon_data: The Pokemon API data
+        Returns:
+            The form data, or None for a regular form
+        """
+        # Check if this is a form variant (indicated by a dash in the name)
+        if "-" not in pokemon_data.get("name", ""):
+            return None
+        
+        # Get the form URL from the forms array if available
+        form_url = None
+        forms = pokemon_data.get("forms", [])
+        if forms and len(forms) > 0:
+            form_url = forms[0].get("url", "")
+            
+        # Extract the form ID from the URL
+        form_id = self._extract_id_from_url(form_url) if form_url else pokemon_id
+        
+        return self._get_pokemon_form_data(form_id)
+    
+    def _build_pokemon(self, pokemon_id: int, pokemon_data: Dict[str, Any], species_data: Dict[str, Any],
+                       form_data: Optional[Dict[str, Any]], pokemon_fields: Dict[str, Any],
+                       species_fields: Dict[str, Any]) -> Pokemon:
+        """ Build the Pokemon row.
         Args:
             pokemon_id: The Pokemon ID
             pokemon_data: The Pokemon API data
             species_data: The species API data
-            session: Database session
+            form_data: The form API data of a form variant, None for a regular form
+            pokemon_fields: POKEMON_FIELDS extracted from the Pokemon data
+            species_fields: SPECIES_FIELDS extracted from the species data
         Returns:
-            The created Pokemon object
+            The Pokemon object
         """
         # Find English and French names from species data (best names for regular forms)
-        species_name_en = next((name.get("name") for name in species_data.get("names", [])
-                        if name.get("language", {}).get("name") == "en"), None)
-        species_name_fr = next((name.get("name") for name in species_data.get("names", [])
-                        if name.get("language", {}).get("name") == "fr"), None)
+        species_name_en = species_fields["name_en"]
+        species_name_fr = species_fields["name_fr"]
         
         # Default to API names if names are not found in species data
         name_en = species_name_en or pokemon_data.get("name", "")
         name_fr = species_name_fr or pokemon_data.get("name", "")
         
-        # Check if this is a form variant (indicated by a dash in the name)
-        is_form_variant = "-" in pokemon_data.get("name", "")
-        
-        if is_form_variant:
-            # Get the form URL from the forms array if available
-            form_url = None
-            forms = pokemon_data.get("forms", [])
-            if forms and len(forms) > 0:
-                form_url = forms[0].get("url", "")
-                
-            # Extract the form ID from the URL
-            form_id = self._extract_id_from_url(form_url) if form_url else pokemon_id
+        if form_data:
+            # Update names if available in form data
+            # First check in the "names" field which contains fully formatted names
+            form_fields = FORM_FIELDS.extract(form_data)
             
-            form_data = self._get_pokemon_form_data(form_id)
+            # Get English form name if available
+            en_form_name = form_fields["name_en"]
+            if en_form_name:
+                name_en = en_form_name  # Use the better formatted name from form data
             
-            if form_data:
-                # Update names if available in form data
-                # First check in the "names" field which contains fully formatted names
-                form_names = form_data.get("names", [])
+            # Get French form name if available
+            fr_form_name = form_fields["name_fr"]
+            if fr_form_name:
+                name_fr = fr_form_name  # Use the properly formatted name with region
+            
+            # If no names found in the "names" array, try to construct a better name
+            # from the form_names which contain form descriptors
+            if not en_form_name and not fr_form_name:
+                base_pokemon_name = species_name_en or species_data.get("name", "").capitalize()
                 
-                # Get English form name if available
-                en_form_name = next((name.get("name") for name in form_names
-                               if name.get("language", {}).get("name") == "en"), None)
-                if en_form_name:
-                    name_en = en_form_name  # Use the better formatted name from form data
+                # Get English form description if available
+                en_form_description = form_fields["description_en"]
+                fr_form_description = form_fields["description_fr"]
                 
-                # Get French form name if available
-                fr_form_name = next((name.get("name") for name in form_names
-                               if name.get("language", {}).get("name") == "fr"), None)
-                if fr_form_name:
-                    name_fr = fr_form_name  # Use the properly formatted name with region
+                # Combine base name with form description for a better display
+                if en_form_description and base_pokemon_name:
+                    name_en = f"{base_pokemon_name} ({en_form_description})"
                 
-                # If no names found in the "names" array, try to construct a better name
-                # from the form_names which contain form descriptors
-                if not en_form_name and not fr_form_name:
-                    base_pokemon_name = species_name_en or species_data.get("name", "").capitalize()
-                    
-                    # Get English form description if available
-                    form_descriptions = form_data.get("form_names", [])
-                    en_form_description = next((desc.get("name") for desc in form_descriptions
-                                         if desc.get("language", {}).get("name") == "en"), None)
-                    fr_form_description = next((desc.get("name") for desc in form_descriptions
-                                         if desc.get("language", {}).get("name") == "fr"), None)
-                    
-                    # Combine base name with form description for a better display
-                    if en_form_description and base_pokemon_name:
-                        name_en = f"{base_pokemon_name} ({en_form_description})"
+                # Do the same for French
+                if fr_form_description and species_name_fr:
+                    name_fr = f"{species_name_fr} ({fr_form_description})"
                     
-                    # Do the same for French
-                    fr_base_name = species_name_fr or next((name.get("name") for name in species_data.get("names", [])
-                                       if name.get("language", {}).get("name") == "fr"), None)
-                    
-                    if fr_form_description and fr_base_name:
-                        name_fr = f"{fr_base_name} ({fr_form_description})"
-                        
-                logger.info(f"Using form names: EN='{name_en}', FR='{name_fr}' for Pokemon ID {pokemon_id}")
-        
-        # Get types
-        types = pokemon_data.get("types", [])
-        type_1_id = next((t.get("type", {}).get("url", "").rstrip("/").split("/")[-1] 
-                         for t in types if t.get("slot") == 1), None)
-        type_2_id = next((t.get("type", {}).get("url", "").rstrip("/").split("/")[-1] 
-                         for t in types if t.get("slot") == 2), None)
+            logger.info(f"Using form names: EN='{name_en}', FR='{name_fr}' for Pokemon ID {pokemon_id}")
         
         # Determine the correct national Pokedex number
         # For special forms (ID > 10000), get the number from species data instead of using the ID
@@ -298,14 +452,7 @@ class PokemonImporter:
         
         # Get the national Pokedex number directly from the pokedex_numbers field in species_data
         # This is the most accurate source for this information
-        national_pokedex_number = None
-        
-        if species_data and "pokedex_numbers" in species_data:
-            # Find the entry for the national Pokedex
-            for entry in species_data.get("pokedex_numbers", []):
-                if entry.get("pokedex", {}).get("name") == "national":
-                    national_pokedex_number = entry.get("entry_number")
-                    break
+        national_pokedex_number = species_fields["national"]
         
         # If we couldn't find the number in pokedex_numbers, fall back to species_id or pokemon_id
         if not national_pokedex_number:
@@ -319,33 +466,23 @@ class PokemonImporter:
             national_pokedex_number=national_pokedex_number,
             name_en=name_en,
             name_fr=name_fr,
-            type_1_id=int(type_1_id) if type_1_id else None,
-            type_2_id=int(type_2_id) if type_2_id else None,
+            type_1_id=pokemon_fields["type_1_id"],
+            type_2_id=pokemon_fields["type_2_id"],
             sprite_url=pokemon_data.get("sprites", {}).get("front_default"),
             cry_url=pokemon_data.get("cries", {}).get("latest")
         )
         
-        # Check if Pokemon already exists
-        existing = session.get(Pokemon, pokemon_id)
-        if existing:
-            logger.info(f"Pokemon ID {pokemon_id} already exists, updating")
-            # Update existing Pokemon
-            for key, value in pokemon.dict(exclude={"id"}).items():
-                setattr(existing, key, value)
-            return existing
-        
-        # Add new Pokemon
-        session.add(pokemon)
         return pokemon
     
-    def _create_pokemon_detail(self, pokemon_id: int, pokemon_data: Dict[str, Any], 
-                              species_data: Dict[str, Any], session: Session) -> None:
-        """ Create a PokemonDetail entry in the database.
+    def _build_pokemon_detail(self, pokemon_id: int, pokemon_data: Dict[str, Any], 
+                              species_data: Dict[str, Any]) -> PokemonDetail:
+        """ Build the PokemonDetail row.
         Args:
             pokemon_id: The Pokemon ID
             pokemon_data: The Pokemon API data
             species_data: The species API data
-            session: Database session
+        Returns:
+            The PokemonDetail object
         """
         # Extract relevant data
         species_id = self._extract_id_from_url(pokemon_data.get("species", {}).get("url", ""))
@@ -381,7 +518,7 @@ class PokemonImporter:
             species_data.get("evolves_from_species", {}).get("url", "") if species_data.get("evolves_from_species") else ""
         )
         
-        # Create or update detail
+        # Build detail
         detail = PokemonDetail(
             pokemon_id=pokemon_id,
             species_id=species_id,
@@ -410,68 +547,36 @@ class PokemonImporter:
             growth_rate=growth_rate
         )
         
-        # Check if detail already exists
-        existing = session.get(PokemonDetail, pokemon_id)
-        if existing:
-            logger.info(f"PokemonDetail for ID {pokemon_id} already exists, updating")
-            # Update existing detail
-            for key, value in detail.dict(exclude={"pokemon_id"}).items():
-                setattr(existing, key, value)
-        else:
-            # Add new detail
-            session.add(detail)
+        return detail
     
-    def _create_pokemon_stat(self, pokemon_id: int, pokemon_data: Dict[str, Any], 
-                            session: Session) -> None:
-        """ Create a PokemonStat entry in the database.
+    def _build_pokemon_stat(self, pokemon_id: int, pokemon_fields: Dict[str, Any]) -> PokemonStat:
+        """ Build the PokemonStat row.
         Args:
             pokemon_id: The Pokemon ID
-            pokemon_data: The Pokemon API data
-            session: Database session
+            pokemon_fields: POKEMON_FIELDS extracted from the Pokemon data
+        Returns:
+            The PokemonStat object
         """
-        # Extract stats
-        stats = pokemon_data.get("stats", [])
-        hp = next((s.get("base_stat", 0) for s in stats if s.get("stat", {}).get("name") == "hp"), 0)
-        attack = next((s.get("base_stat", 0) for s in stats if s.get("stat", {}).get("name") == "attack"), 0)
-        defense = next((s.get("base_stat", 0) for s in stats if s.get("stat", {}).get("name") == "defense"), 0)
-        special_attack = next((s.get("base_stat", 0) for s in stats if s.get("stat", {}).get("name") == "special-attack"), 0)
-        special_defense = next((s.get("base_stat", 0) for s in stats if s.get("stat", {}).get("name") == "special-defense"), 0)
-        speed = next((s.get("base_stat", 0) for s in stats if s.get("stat", {}).get("name") == "speed"), 0)
-        
-        # Create or update stat
+        # Build stat
         stat = PokemonStat(
             pokemon_id=pokemon_id,
-            hp=hp,
-            attack=attack,
-            defense=defense,
-            special_attack=special_attack,
-            special_defense=special_defense,
-            speed=speed
+            **{field: pokemon_fields[field] for field in STAT_FIELDS}
         )
         
-        # Check if stat already exists
-        existing = session.get(PokemonStat, pokemon_id)
-        if existing:
-            logger.info(f"PokemonStat for ID {pokemon_id} already exists, updating")
-            # Update existing stat
-            for key, value in stat.dict(exclude={"pokemon_id"}).items():
-                setattr(existing, key, value)
-        else:
-            # Add new stat
-            session.add(stat)
+        return stat
     
-    def _create_pokemon_sprite(self, pokemon_id: int, pokemon_data: Dict[str, Any], 
-                              session: Session) -> None:
-        """ Create a PokemonSprite entry in the database.
+    def _build_pokemon_sprite(self, pokemon_id: int, pokemon_data: Dict[str, Any]) -> PokemonSprite:
+        """ Build the PokemonSprite row.
         Args:
             pokemon_id: The Pokemon ID
             pokemon_data: The Pokemon API data
-            session: Database session
+        Returns:
+            The PokemonSprite object
         """
         # Extract sprites
         sprites = pokemon_data.get("sprites", {})
         
-        # Create or update sprite
+        # Build sprite
         sprite = PokemonSprite(
             pokemon_id=pokemon_id,
             front_default=sprites.get("front_default"),
@@ -487,91 +592,39 @@ class PokemonImporter:
             pokemon_go_shiny=sprites.get("other", {}).get("go", {}).get("front_shiny")
         )
         
-        # Check if sprite already exists
-        existing = session.get(PokemonSprite, pokemon_id)
-        if existing:
-            logger.info(f"PokemonSprite for ID {pokemon_id} already exists, updating")
-            # Update existing sprite
-            for key, value in sprite.dict(exclude={"pokemon_id"}).items():
-                setattr(existing, key, value)
-        else:
-            # Add new sprite
-            session.add(sprite)
+        return sprite
     
-    def _create_pokedex_number(self, pokemon_id: int, species_data: Dict[str, Any], 
-                              session: Session) -> None:
-        """ Create a PokedexNumber entry in the database.
+    def _build_pokedex_number(self, pokemon_id: int, species_fields: Dict[str, Any]) -> PokedexNumber:
+        """ Build the PokedexNumber row.
         Args:
             pokemon_id: The Pokemon ID
-            species_data: The species API data
-            session: Database session
+            species_fields: SPECIES_FIELDS extracted from the species data
+        Returns:
+            The PokedexNumber object
         """
-        # Extract pokedex numbers
-        pokedex_numbers = species_data.get("pokedex_numbers", [])
-        
-        # Create empty pokedex entry
-        pokedex = PokedexNumber(pokemon_id=pokemon_id)
-        
-        # Define mapping between pokedex names and field names
-        pokedex_mapping = {
-            "national": "national",
-            "kanto": "kanto",
-            "original-johto": "original_johto",
-            "updated-johto": "updated_johto",
-            "hoenn": "hoenn",
-            "original-sinnoh": "original_sinnoh",
-            "extended-sinnoh": "extended_sinnoh",
-            "unova": "unova_bw",  # Approximation
-            "kalos-central": "kalos_central",
-            "kalos-coastal": "kalos_coastal",
-            "kalos-mountain": "kalos_mountain",
-            "alola": "alola",
-            "melemele": "melemele",
-            "akala": "akala",
-            "ulaula": "ulaula",
-            "poni": "poni",
-            "galar": "galar",
-            "isle-of-armor": "isle_of_armor",
-            "crown-tundra": "crown_tundra",
-            "hisui": "hisui",
-            "paldea": "paldea",
-        }
-        
         # Fill in pokedex numbers
-        for entry in pokedex_numbers:
-            pokedex_name = entry.get("pokedex", {}).get("name")
-            entry_number = entry.get("entry_number")
-            
-            if pokedex_name in pokedex_mapping:
-                field_name = pokedex_mapping[pokedex_name]
-                setattr(pokedex, field_name, entry_number)
+        pokedex = PokedexNumber(
+            pokemon_id=pokemon_id,
+            **{field: species_fields[field] for field in POKEDEX_FIELDS}
+        )
         
         # Always set national number if available
         if not pokedex.national:
             pokedex.national = pokemon_id
         
-        # Check if pokedex already exists
-        existing = session.get(PokedexNumber, pokemon_id)
-        if existing:
-            logger.info(f"PokedexNumber for ID {pokemon_id} already exists, updating")
-            # Update existing pokedex
-            for key, value in pokedex.dict(exclude={"pokemon_id"}).items():
-                if value is not None:  # Only update non-None values
-                    setattr(existing, key, value)
-        else:
-            # Add new pokedex
-            session.add(pokedex)
+        return pokedex
     
-    def _create_pokemon_abilities(self, pokemon_id: int, pokemon_data: Dict[str, Any],
-                                session: Session) -> None:
-        """ Create PokemonAbility entries in the database.
+    def _build_pokemon_abilities(self, pokemon_id: int, pokemon_data: Dict[str, Any]) -> List[PokemonAbility]:
+        """ Build the PokemonAbility rows.
         Args:
             pokemon_id: The Pokemon ID
             pokemon_data: The Pokemon API data
-            session: Database session
+        Returns:
+            The PokemonAbility objects
         """
         # Extract abilities
         abilities = pokemon_data.get("abilities", [])
+        rows = []
         
         # Create new ability entries
         for ability_data in abilities:
@@ -590,58 +643,25 @@ class PokemonImporter:
                 slot=slot
             )
             
-            # Add new ability
-            session.add(ability)
+            rows.append(ability)
             
-        logger.info(f"Added {len(abilities)} abilities for Pokemon ID {pokemon_id}")
+        return rows
     
-    def _create_pokemon_learnset(self, pokemon_id: int, pokemon_data: Dict[str, Any],
-                               session: Session) -> None:
-        """ Create PokemonLearnset entries in the database.
+    def _build_pokemon_learnset(self, pokemon_id: int, pokemon_data: Dict[str, Any]) -> LearnsetBuffer:
+        """ Build the learnset rows of a Pokemon.
         Args:
             pokemon_id: The Pokemon ID
             pokemon_data: The Pokemon API data
-            session: Database session
+        Returns:
+            The columnar learnset, one row per move, learn method and version group
         """
-        # Extract moves
-        moves = pokemon_data.get("moves", [])
-        
-        learn_count = 0
-        
-        # Create new learnset entries
-        for move_data in moves:
-            move_url = move_data.get("move", {}).get("url", "")
-            move_id = self._extract_id_from_url(move_url)
-            move_name = move_data.get("move", {}).get("name", "")
-            
-            # Get version group details
-            version_group_details = move_data.get("version_group_details", [])
-            
-            # For each version group where the Pokemon can learn this move
-            for vg_detail in version_group_details:
-                method_data = vg_detail.get("move_learn_method", {})
-                method = method_data.get("name", "unknown")
-                level = vg_detail.get("level_learned_at", 0)
-                version_group = vg_detail.get("version_group", {}).get("name", "unknown")
-                
-                # Create learnset entry
-                learnset = PokemonLearnset(
-                    pokemon_id=pokemon_id,
-                    move_id=move_id,
-                    move_name=move_name,
-                    method=method,
-                    level=level,
-                    version_group=version_group
-                )
-                
-                # Add new learnset
-                session.add(learnset)
-                learn_count += 1
-        
-        logger.info(f"Added {learn_count} learnset entries for Pokemon ID {pokemon_id}")
+        return LearnsetBuffer.from_moves(pokemon_id, pokemon_data.get("moves", []))
 
 # For CLI usage
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    importer = PokemonImporter()
-    importer.import_all() 
\ No newline at end of file
+    args = parse_arguments("Import Pokemon from the PokeAPI")
+    # Use the snapshot or the cached live API
+    importer = PokemonImporter(build_client())
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        importer.import_all(incremental=args.incremental, resume=args.resume)
\ No newline at end of file
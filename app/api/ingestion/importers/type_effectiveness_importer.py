@@ -1,8 +1,10 @@
 import logging
 import csv
 from pathlib import Path
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Tuple
 from sqlmodel import Session, SQLModel, select
+from sqlalchemy.engine import Engine
 from app.models.tables.type_effectiveness import TypeEffectiveness
 from app.models.tables.type import Type
 from app.db.engine import engine as db_engine
@@ -16,17 +18,31 @@ logger = logging.getLogger(__name__)
 class TypeEffectivenessImporter:
     """ Importer for Pokemon type effectiveness data from CSV file. """
     
-    def __init__(self, csv_file_path: Optional[Path] = None):
+    def __init__(self, csv_file_path: Optional[Path] = None, engine: Optional[Engine] = None):
         """ Initialize the type effectiveness importer.
         Args:
-            csv_file_path: Optional path to the CSV file, uses CSV_FILE_PATH by default """
+            csv_file_path: Optional path to the CSV file, uses CSV_FILE_PATH by default
+            engine: Optional database engine, connects to PKMN.db by default """
         self.csv_file_path = csv_file_path or CSV_FILE_PATH
+        self.engine = engine
         self.type_name_to_id_mapping = {}
     
+    @contextmanager
+    def _session(self):
+        """ Session committed on exit, on the given engine or on PKMN.db. """
+        if self.engine is None:
+            with db_engine.connect('PKMN.db') as session:
+                yield session
+            return
+        
+        with Session(self.engine) as session:
+            yield session
+            session.commit()
+    
     def import_all(self):
         """ Import all type effectiveness data to the database. """
         # Use the engine context manager to get a session
-        with db_engine.connect('PKMN.db') as session:
+        with self._session() as session:
             try:
                 # First, build the mapping from type names to type IDs
                 self._build_type_mapping(session)
@@ -1,5 +1,8 @@
 import logging
-from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.api.ingestion.group_commit import GroupCommit
+from app.api.ingestion.manifest import ResourceManifest, parse_arguments
 from app.models.enums.pokeapi import EndPoint
 from app.models.tables.type import Type
 from pathlib import Path
@@ -7,74 +10,84 @@ from typing import Dict, Any, List, Optional
 from functools import partial
 import ujson
 import roman
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
+from sqlalchemy.engine import Engine
 
-from app.db.engine import engine as engine_factory
+from app.db.engine import engine as engine_factory, bulk_loading
 
 logger = logging.getLogger(__name__)
 
 # Default path for PKMN.db database
 DB_PATH = Path('app/db/PKMN.db')
-# Create SQLAlchemy engine directly
-SQLITE_URL = f"sqlite:///{DB_PATH}"
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
-# use standard SQLAlchemy engine
+# Engine from the registry, shared with every importer and session on PKMN.db
+engine = engine_factory.get_engine(DB_PATH.name, DB_PATH.parent)
 
 class TypeImporter:
     """ Importer for Pokemon type data. """
     
-    def __init__(self, client: Optional[PokeApiClient] = None):
+    def __init__(self, client: Optional[PokeApiClient] = None, store: Optional[ResourceStore] = None,
+                 engine: Engine = engine):
         """ Initialize the type importer.
         Args:
-            client: Optional API client, creates a new client by default """
+            client: Optional API client, creates a new client by default
+            store: Optional resource store, uses the process-wide shared store by default
+            engine: Optional database engine, uses the engine on PKMN.db by default """
         self.client = client or PokeApiClient()
+        self.engine = engine
         self.get_types = partial(self.client.call, EndPoint.TYPE)
+        self.store = store or resource_store
         
-    def import_all(self) -> List[Type]:
+    def import_all(self, incremental: bool = False) -> List[Type]:
         """ Import all types from the API and store them in the database.
+        Args:
+            incremental: Skip types unchanged since the last import and upsert the others
         Returns:
             List of imported Type objects """
         # Ensure tables exist
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(self.engine)
         # create tables if they don't exist
         
-        types_list = self.get_types(limit=1)
-        total_count = types_list.get("count", 0)
-        
-        logger.info(f"Starting import of {total_count} types...")
+        logger.info("Starting import of types...")
         
-        all_types = self.get_types(limit=total_count).get("results", [])
         imported_types = []
-        # get types list
         
-        with Session(engine) as session:
-            for i, type_info in enumerate(all_types, 1):
-                try:
-                    # Extract URL and get resource_id from the last segment
-                    url = type_info.get("url", "")
-                    resource_id = url.rstrip("/").split("/")[-1]
-                    
-                    type_data = self.get_types(resource_id=resource_id)
+        with Session(self.engine) as session:
+            manifest = ResourceManifest(session, EndPoint.TYPE)
+            with GroupCommit(session, interval=None) as group:
+                for page in self.client.iter_pages(EndPoint.TYPE):
+                    fetched = []
+                    for type_info in page.get("results", []):
+                        # Extract URL and get resource_id from the last segment
+                        url = type_info.get("url", "")
+                        resource_id = url.rstrip("/").split("/")[-1]
+                        try:
+                            type_data = self.store.fetch(self.client, EndPoint.TYPE, resource_id)
+                            content_hash = manifest.content_hash(type_data)
+                            if incremental and manifest.is_unchanged(resource_id, content_hash):
+                                continue
+                            # skip types unchanged since the last import
+                            
+                            type_obj = self._process_type_data(type_data)
+                        except Exception as e:
+                            logger.error(f"Error importing type {resource_id}: {e}")
+                            continue  # Skip to next type on error
+                        fetched.append((resource_id, type_obj, content_hash))
                     
-                    type_obj = self._process_type_data(type_data)
-                    
-                    session.add(type_obj)
-                    imported_types.append(type_obj)
-                    
-                    logger.info(f"Imported type: {type_obj.name} (ID: {type_obj.id})")
-                except Exception as e:
-                    logger.error(f"Error importing type {i}: {e}")
-                    continue  # Skip to next type on error
+                    for resource_id, type_obj, content_hash in fetched:
+                        with group.item(f"type {resource_id}"):
+                            if incremental:
+                                session.merge(type_obj)
+                            else:
+                                session.add(type_obj)
+                            manifest.record(resource_id, content_hash)
+                        if group.last_written:
+                            imported_types.append(type_obj)
+                            logger.info(f"Imported type: {type_obj.name} (ID: {type_obj.id})")
+                    group.commit()
             
-            # Commit successful imports even if some failed
-            try:
-                session.commit()
-                logger.info(f"Committed {len(imported_types)} types to database")
-            except Exception as e:
-                logger.error(f"Failed to commit changes: {e}")
-                session.rollback()
-                return []
-            # process and save each type, continue on errors
+            logger.info(f"Committed {len(imported_types)} types to database ({group.stats()})")
+            if manifest.skipped:
+                logger.info(f"Skipped {manifest.skipped} unchanged types")
         
         logger.info(f"Import completed. {len(imported_types)} types imported.")
         return imported_types
@@ -124,9 +137,12 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create and run importer
-    importer = TypeImporter()
-    types = importer.import_all()
+    args = parse_arguments("Import types from the PokeAPI")
+    
+    # Create and run importer on the snapshot or the cached live API
+    importer = TypeImporter(build_client())
+    with bulk_loading(importer.engine, enabled=args.bulk_load):
+        types = importer.import_all(incremental=args.incremental)
     
     # Print summary
     print(f"Successfully imported {len(types)} types.")
@@ -0,0 +1,148 @@
+import logging
+import sys
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from sqlalchemy import delete
+from sqlmodel import Session
+from app.api.ingestion.extractors import url_id
+from app.models.tables.pokemon_learnset import PokemonLearnset
+
+# Rows sent to the database per executemany call
+LEARNSET_BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+LearnsetRow = Tuple[int, int, str, str, int, str]
+
+
+class LearnsetBuffer:
+    """ Learnset rows stored column by column.
+
+    IDs and levels live in typed arrays and the few distinct move names, learn methods and
+    version groups are interned, so a row costs a few machine words instead of an ORM object. """
+
+    def __init__(self):
+        self.pokemon_ids = array("l")
+        self.move_ids = array("l")
+        self.levels = array("l")
+        self.move_names: List[str] = []
+        self.methods: List[str] = []
+        self.version_groups: List[str] = []
+        self.owners: Set[int] = set()
+        self.duplicates = 0
+        self._seen: Set[Tuple[int, int, str, int, str]] = set()
+
+    @classmethod
+    def from_moves(cls, pokemon_id: int, moves: List[Dict[str, Any]]) -> "LearnsetBuffer":
+        """ Build the learnset of a Pokemon from the moves of its API data.
+        Args:
+            pokemon_id: The Pokemon ID
+            moves: The moves entries of the Pokemon API data
+        Returns:
+            A buffer owning the Pokemon, even when it learns no move
+        """
+        buffer = cls()
+        buffer.owners.add(pokemon_id)
+        for move_data in moves:
+            move = move_data.get("move", {})
+            move_id = url_id(move.get("url"))
+            move_name = move.get("name", "")
+            if move_id is None:
+                logger.warning(f"Skipping move {move_name!r} of Pokemon {pokemon_id}: no ID in URL {move.get('url')!r}")
+                continue
+
+            # One row per version group where the Pokemon can learn this move
+            for vg_detail in move_data.get("version_group_details", []):
+                buffer.append(
+                    pokemon_id, move_id, move_name,
+                    vg_detail.get("move_learn_method", {}).get("name", "unknown"),
+                    vg_detail.get("level_learned_at") or 0,
+                    vg_detail.get("version_group", {}).get("name", "unknown"),
+                )
+        return buffer
+
+    def append(self, pokemon_id: int, move_id: int, move_name: str, method: str, level: int,
+               version_group: str) -> bool:
+        """ Add a row unless the same row is already buffered.
+        Returns:
+            Whether the row was added
+        """
+        method, version_group = sys.intern(method), sys.intern(version_group)
+        key = (pokemon_id, move_id, method, level, version_group)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+
+        self.pokemon_ids.append(pokemon_id)
+        self.move_ids.append(move_id)
+        self.levels.append(level)
+        self.move_names.append(sys.intern(move_name))
+        self.methods.append(method)
+        self.version_groups.append(version_group)
+        return True
+
+    def extend(self, other: "LearnsetBuffer") -> None:
+        """ Take the rows and owners of another buffer. """
+        self.owners |= other.owners
+        for row in other.rows():
+            self.append(*row)
+        self.duplicates += other.duplicates
+
+    def rows(self) -> Iterator[LearnsetRow]:
+        """ Iterate the rows in pokemon_learnsets column order. """
+        return zip(self.pokemon_ids, self.move_ids, self.move_names, self.methods, self.levels, self.version_groups)
+
+    def __len__(self) -> int:
+        return len(self.pokemon_ids)
+
+
+class LearnsetLoader:
+    """ Replaces the learnsets of Pokemon with driver-level executemany inserts. """
+
+    COLUMNS = ("pokemon_id", "move_id", "move_name", "method", "level", "version_group")
+
+    def __init__(self, batch_size: int = LEARNSET_BATCH_SIZE):
+        """ Initialize the loader.
+        Args:
+            batch_size: Number of rows per executemany call """
+        self.batch_size = batch_size
+        self.inserted = 0
+        self.duplicates = 0
+
+    def _insert_sql(self, paramstyle: str) -> str:
+        placeholder = "?" if paramstyle == "qmark" else "%s"
+        return (f"INSERT INTO {PokemonLearnset.__tablename__} ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join([placeholder] * len(self.COLUMNS))})")
+
+    def replace(self, session: Session, buffer: LearnsetBuffer) -> int:
+        """ Replace the stored learnsets of the buffer owners in the session transaction.
+        Args:
+            session: Database session, committed by the caller
+            buffer: Learnset rows of the Pokemon to replace
+        Returns:
+            Number of inserted rows
+        """
+        if not buffer.owners:
+            return 0
+
+        session.execute(delete(PokemonLearnset).where(PokemonLearnset.pokemon_id.in_(buffer.owners)))
+
+        connection = session.connection()
+        sql = self._insert_sql(connection.dialect.paramstyle)
+        cursor = connection.connection.cursor()
+        try:
+            rows = buffer.rows()
+            while chunk := list(islice(rows, self.batch_size)):
+                cursor.executemany(sql, chunk)
+        finally:
+            cursor.close()
+        # the raw cursor shares the connection, and so the transaction, of the session
+
+        self.inserted += len(buffer)
+        self.duplicates += buffer.duplicates
+        return len(buffer)
+
+    def stats(self) -> str:
+        return f"{self.inserted} learnset rows inserted, {self.duplicates} duplicates dropped"
@@ -0,0 +1,72 @@
+import argparse
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Union
+import ujson
+from sqlmodel import Session, select
+from app.models.enums.pokeapi import EndPoint
+from app.models.tables.ingestion_manifest import IngestionManifest
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceManifest:
+    """ Content hashes of the ingested resources of one endpoint, used to skip unchanged ones. """
+
+    def __init__(self, session: Session, endpoint: EndPoint):
+        """ Load the known hashes of an endpoint in a single query.
+        Args:
+            session: Session of the import, manifest rows are committed with the imported rows
+            endpoint: The API endpoint of the tracked resources """
+        self.session = session
+        self.endpoint = endpoint
+        self.skipped = 0
+        self._hashes: Dict[int, str] = dict(session.exec(
+            select(IngestionManifest.resource_id, IngestionManifest.content_hash)
+            .where(IngestionManifest.endpoint == endpoint.value)
+        ).all())
+
+    @staticmethod
+    def content_hash(*payloads: Dict[str, Any]) -> str:
+        """ Hash API payloads independently of their key order.
+        Args:
+            payloads: Every payload the imported rows are derived from
+        Returns:
+            The hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for payload in payloads:
+            digest.update(ujson.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    def is_unchanged(self, resource_id: Union[int, str], content_hash: str) -> bool:
+        """ Tell whether a resource was already ingested with the same content, counting skips. """
+        unchanged = self._hashes.get(int(resource_id)) == content_hash
+        if unchanged:
+            self.skipped += 1
+        return unchanged
+
+    def record(self, resource_id: Union[int, str], content_hash: str) -> None:
+        """ Record the hash of an ingested resource in the import session. """
+        self._hashes[int(resource_id)] = content_hash
+        self.session.merge(IngestionManifest(
+            endpoint=self.endpoint.value,
+            resource_id=int(resource_id),
+            content_hash=content_hash,
+            fetched_at=datetime.now(timezone.utc),
+        ))
+
+
+def parse_arguments(description: str, argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """ Parse the common command line options of the importers. """
+    parser = argparse.ArgumentParser(description=description)
+
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip resources whose content did not change since the last import")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted import from its checkpoint (checkpointed importers only)")
+    parser.add_argument("--bulk-load", action="store_true",
+                        help="Use build pragmas and rebuild the secondary indexes once the import is done")
+
+    return parser.parse_args(argv)
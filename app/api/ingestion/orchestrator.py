@@ -0,0 +1,237 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+from app.api.ingestion.client import PokeApiClient, build_client
+from app.api.ingestion.resource_store import ResourceStore, resource_store
+from app.db.engine import engine as db_engine, bulk_loading
+
+# Default path for PKMN.db database
+DB_PATH = Path('app/db/PKMN.db')
+# Seconds a writer waits for the lock held by a concurrent stage
+SQLITE_BUSY_TIMEOUT = 120
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """ A unit of the build, run once all the stages it depends on succeeded. """
+    name: str
+    run: Callable[[], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageResult:
+    """ Outcome and timing of a stage. """
+    name: str
+    status: str = "pending"  # done, failed or skipped
+    started: Optional[float] = None
+    duration: float = 0.0
+    error: Optional[BaseException] = field(default=None, repr=False)
+
+
+class IngestionOrchestrator:
+    """ Runs stages in dependency order, independent stages running concurrently. """
+
+    def __init__(self, stages: Iterable[Stage], max_workers: int = 4):
+        """ Initialize the orchestrator.
+        Args:
+            stages: Stages of the build, forming a DAG through their depends_on names
+            max_workers: Maximum number of stages running at once """
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """ Order the stages so that each one comes after its dependencies.
+        Raises:
+            ValueError: On an unknown dependency or a dependency cycle
+        """
+        for stage in self.stages.values():
+            unknown = set(stage.depends_on) - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(sorted(unknown))}")
+
+        order, visiting, visited = [], set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def run(self) -> Dict[str, StageResult]:
+        """ Run every stage, skipping the dependents of failed stages.
+        Returns:
+            Result of each stage, in topological order
+        """
+        results = {name: StageResult(name) for name in self.order}
+        running: Dict[Future, str] = {}
+        build_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingestion") as executor:
+            while True:
+                for name in self.order:
+                    result = results[name]
+                    if result.status != "pending":
+                        continue
+                    dependencies = [results[d].status for d in self.stages[name].depends_on]
+                    if any(status in ("failed", "skipped") for status in dependencies):
+                        result.status = "skipped"
+                        logger.warning(f"Skipping stage {name}: a dependency did not complete")
+                    elif all(status == "done" for status in dependencies):
+                        result.status = "running"
+                        result.started = time.perf_counter() - build_start
+                        logger.info(f"Starting stage {name}")
+                        running[executor.submit(self.stages[name].run)] = name
+                # submit every stage whose dependencies are done
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = results[running.pop(future)]
+                    result.duration = time.perf_counter() - build_start - result.started
+                    try:
+                        future.result()
+                        result.status = "done"
+                        logger.info(f"Stage {result.name} done in {result.duration:.1f}s")
+                    except Exception as e:
+                        result.status = "failed"
+                        result.error = e
+                        logger.error(f"Stage {result.name} failed after {result.duration:.1f}s: {e}")
+
+        self._report(results, time.perf_counter() - build_start)
+        return results
+
+    def critical_path(self, results: Dict[str, StageResult]) -> Tuple[List[str], float]:
+        """ Find the chain of dependent stages with the longest total duration.
+        Returns:
+            The stage names of the chain and its total duration
+        """
+        longest: Dict[str, Tuple[float, List[str]]] = {}
+        for name in self.order:
+            before = max((longest[d] for d in self.stages[name].depends_on), default=(0.0, []))
+            longest[name] = (before[0] + results[name].duration, before[1] + [name])
+
+        duration, path = max(longest.values(), default=(0.0, []))
+        return path, duration
+
+    def _report(self, results: Dict[str, StageResult], wall_clock: float) -> None:
+        logger.info("Ingestion stages:")
+        for result in results.values():
+            started = f"+{result.started:.1f}s" if result.started is not None else "-"
+            logger.info(f"  {result.name:<20} {result.status:<8} start {started:>8}  took {result.duration:.1f}s")
+
+        path, duration = self.critical_path(results)
+        logger.info(f"Critical path: {' -> '.join(path)} ({duration:.1f}s)")
+        logger.info(f"Wall clock: {wall_clock:.1f}s, sum of stages: {sum(r.duration for r in results.values()):.1f}s")
+
+
+def create_build_engine(db_path: Path = DB_PATH) -> Engine:
+    """ Get the registry engine shared by concurrent stages.
+
+    WAL lets readers run alongside the single writer, and the busy timeout makes
+    writers wait for each other instead of failing with "database is locked". The
+    pragmas also reach an engine an importer module created first. """
+    return db_engine.get_engine(db_path.name, db_path.parent, pragmas={
+        "journal_mode": "WAL",
+        "busy_timeout": SQLITE_BUSY_TIMEOUT * 1000,
+    })
+
+
+def build_stages(client: PokeApiClient, engine: Engine, store: Optional[ResourceStore] = None,
+                 incremental: bool = False) -> List[Stage]:
+    """ Declare the importers of PKMN.db and the foreign keys between their tables.
+
+    The list importers fetch each listing page before writing it and commit it once written,
+    so concurrent stages only hold the write lock of the database while writing.
+    Args:
+        client: Client shared by the importers
+        engine: Engine shared by the importers
+        store: Optional resource store, uses the process-wide shared store by default
+        incremental: Skip resources unchanged since the last import
+    Returns:
+        The stages of a full build
+    """
+    from app.api.ingestion.importers.ability_importer import AbilityImporter
+    from app.api.ingestion.importers.evolution_importer import EvolutionImporter
+    from app.api.ingestion.importers.game_importer import GameImporter
+    from app.api.ingestion.importers.machine_importer import MachineImporter
+    from app.api.ingestion.importers.move_importer import MoveImporter
+    from app.api.ingestion.importers.pokemon_importer import PokemonImporter
+    from app.api.ingestion.importers.type_effectiveness_importer import TypeEffectivenessImporter
+    from app.api.ingestion.importers.type_importer import TypeImporter
+
+    store = store or resource_store
+
+    return [
+        Stage("types", lambda: TypeImporter(client, store, engine).import_all(incremental=incremental)),
+        Stage("games", lambda: GameImporter(client, store, engine).import_all(incremental=incremental)),
+        Stage("moves", lambda: MoveImporter(client, store, engine).import_all(incremental=incremental)),
+        Stage("abilities", lambda: AbilityImporter(client, store, engine).import_all(incremental=incremental)),
+        # machines.move_id -> moves, machines.version_group -> games
+        Stage("machines", lambda: MachineImporter(client, store, engine).import_all(incremental=incremental),
+              depends_on=("moves", "games")),
+        # pokemons.type_*_id -> types, pokemon_abilities -> abilities, pokemon_learnsets -> moves, games
+        Stage("pokemon", lambda: PokemonImporter(client, store, engine).import_all(incremental=incremental),
+              depends_on=("types", "abilities", "moves", "games")),
+        # evolutions.pokemon_*_id -> pokemons
+        Stage("evolutions", lambda: EvolutionImporter(client, store, engine).import_all(),
+              depends_on=("pokemon",)),
+        # type_effectiveness.*_type_id -> types
+        Stage("type_effectiveness", lambda: TypeEffectivenessImporter(engine=engine).import_all(),
+              depends_on=("types",)),
+    ]
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build PKMN.db, running independent importers concurrently")
+
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Target database")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of importers running at once")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip resources whose content did not change since the last import")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import app.models.tables  # noqa: F401 register every table
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    args = parse_arguments()
+    engine = create_build_engine(args.db)
+    # Create every table up front: concurrent create_all calls would race
+    SQLModel.metadata.create_all(engine)
+
+    stages = build_stages(build_client(), engine, incremental=args.incremental)
+    # A full build defers the secondary indexes and uses the build pragmas
+    with bulk_loading(engine, enabled=not args.incremental):
+        results = IngestionOrchestrator(stages, max_workers=args.workers).run()
+
+    failed = [r.name for r in results.values() if r.status != "done"]
+    print(f"Build finished: {len(results) - len(failed)}/{len(results)} stages done.")
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,264 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Default sizing of the stages
+FETCH_WORKERS = 8
+TRANSFORM_WORKERS = 2
+QUEUE_SIZE = 64
+WRITE_BATCH_SIZE = 50
+# Seconds the writer waits for a full batch before flushing a partial one
+FLUSH_INTERVAL = 2.0
+
+logger = logging.getLogger(__name__)
+
+# End of stream marker, marker of an item dropped by a stage and of an item whose stage failed
+_DONE = object()
+_DROPPED = object()
+_FAILED = object()
+
+
+@dataclass
+class StageMetrics:
+    """ Throughput and input queue depth of a pipeline stage. """
+    name: str
+    workers: int
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+    busy: float = 0.0  # seconds spent in the stage function, summed over workers
+    queue_max: int = 0
+    queue_total: int = 0
+    queue_samples: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, busy: float, processed: int = 0, dropped: int = 0, errors: int = 0) -> None:
+        with self._lock:
+            self.busy += busy
+            self.processed += processed
+            self.dropped += dropped
+            self.errors += errors
+
+    def sample_queue(self, depth: int) -> None:
+        with self._lock:
+            self.queue_max = max(self.queue_max, depth)
+            self.queue_total += depth
+            self.queue_samples += 1
+
+    @property
+    def queue_mean(self) -> float:
+        return self.queue_total / self.queue_samples if self.queue_samples else 0.0
+
+    def summary(self, elapsed: float) -> str:
+        throughput = self.processed / elapsed if elapsed else 0.0
+        utilization = self.busy / (elapsed * self.workers) if elapsed else 0.0
+        return (f"{self.name:<9} {self.workers:>2} workers  {self.processed:>6} done  {self.dropped:>5} dropped  "
+                f"{self.errors:>4} errors  {throughput:7.1f}/s  busy {utilization:4.0%}  "
+                f"queue max {self.queue_max} mean {self.queue_mean:.1f}")
+
+
+class Pipeline:
+    """ Fetch, transform and load items through bounded queues.
+
+    Fetchers and transformers run in worker threads while a single writer, the calling
+    thread, loads the results in batches: the network, the CPU and the database stay busy
+    at the same time and the database session never leaves the calling thread.
+
+    The watermark never moves past an item whose fetch or transform failed, so an import
+    resumed from it retries that item. """
+
+    def __init__(self, fetch: Callable[[Any], Any], transform: Callable[[Any], Any],
+                 load: Callable[[List[Any], int], Optional[int]], fetch_workers: int = FETCH_WORKERS,
+                 transform_workers: int = TRANSFORM_WORKERS, batch_size: int = WRITE_BATCH_SIZE,
+                 queue_size: int = QUEUE_SIZE):
+        """ Initialize the pipeline.
+        Args:
+            fetch: Function fetching the data of a source item, may block on I/O
+            transform: Function turning fetched data into rows to load, returns None to drop the item
+            load: Function writing a batch of rows, called with the batch and the watermark
+                (number of leading source items fully processed once the batch is written,
+                stopping before the first failed item);
+                returns the number of rows actually written, all of them when it returns None
+            fetch_workers: Number of fetching threads
+            transform_workers: Number of transforming threads
+            batch_size: Maximum number of rows given to each load call
+            queue_size: Capacity of each queue between stages """
+        self.fetch = fetch
+        self.transform = transform
+        self.load = load
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.metrics = {
+            "fetch": StageMetrics("fetch", fetch_workers),
+            "transform": StageMetrics("transform", transform_workers),
+            "load": StageMetrics("load", 1),
+        }
+        self._stop = threading.Event()
+        self._source_error: Optional[BaseException] = None
+
+    def _put(self, target: queue.Queue, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, source: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, items: Iterable[Any], start: int, target: queue.Queue) -> None:
+        try:
+            for position, item in enumerate(items, start + 1):
+                if self._stop.is_set():
+                    break
+                self._put(target, (position, item))
+                self.metrics["fetch"].sample_queue(target.qsize())
+        except Exception as e:
+            logger.error(f"Error reading the pipeline source: {e}")
+            self._source_error = e
+        # listing errors end the stream, they are raised once the queued items are loaded
+
+    def _work(self, metrics: StageMetrics, function: Callable[[Any], Any],
+              source: queue.Queue, target: queue.Queue, target_metrics: StageMetrics) -> None:
+        while True:
+            work = self._get(source)
+            if work is _DONE:
+                return
+            position, value = work
+
+            if value is not _DROPPED and value is not _FAILED:
+                started = time.perf_counter()
+                try:
+                    value = function(value)
+                    if value is None:
+                        value = _DROPPED
+                        metrics.record(time.perf_counter() - started, dropped=1)
+                    else:
+                        metrics.record(time.perf_counter() - started, processed=1)
+                except Exception as e:
+                    logger.error(f"Error in {metrics.name} stage for item {position}: {e}")
+                    value = _FAILED
+                    metrics.record(time.perf_counter() - started, errors=1)
+            # dropped and failed items still flow to the writer, which moves the watermark
+            # past the dropped ones only
+
+            self._put(target, (position, value))
+            target_metrics.sample_queue(target.qsize())
+
+    def _close_after(self, threads: List[threading.Thread], target: queue.Queue, count: int) -> None:
+        for thread in threads:
+            thread.join()
+        for _ in range(count):
+            self._put(target, _DONE)
+
+    def _start(self, target: Callable, *args: Any, name: str) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        return thread
+
+    def run(self, items: Iterable[Any], start: int = 0) -> Dict[str, StageMetrics]:
+        """ Run the pipeline until the source is exhausted and every row is loaded.
+        Args:
+            items: Source items, e.g. listing entries
+            start: Position of the source in the full listing, the watermark starts there
+        Returns:
+            Metrics of the fetch, transform and load stages
+        """
+        fetch_queue: queue.Queue = queue.Queue(self.queue_size)
+        transform_queue: queue.Queue = queue.Queue(self.queue_size)
+        load_queue: queue.Queue = queue.Queue(self.queue_size)
+        fetch_metrics, transform_metrics, load_metrics = (self.metrics[name] for name in ("fetch", "transform", "load"))
+
+        started = time.perf_counter()
+        feeder = self._start(self._feed, items, start, fetch_queue, name="pipeline-feed")
+        fetchers = [
+            self._start(self._work, fetch_metrics, self.fetch, fetch_queue, transform_queue, transform_metrics,
+                        name=f"pipeline-fetch-{i}")
+            for i in range(fetch_metrics.workers)
+        ]
+        transformers = [
+            self._start(self._work, transform_metrics, self.transform, transform_queue, load_queue, load_metrics,
+                        name=f"pipeline-transform-{i}")
+            for i in range(transform_metrics.workers)
+        ]
+        self._start(self._close_after, [feeder], fetch_queue, len(fetchers), name="pipeline-close-fetch")
+        self._start(self._close_after, fetchers, transform_queue, len(transformers), name="pipeline-close-transform")
+        self._start(self._close_after, transformers, load_queue, 1, name="pipeline-close-load")
+        # each stage is closed once every worker of the previous one is done
+
+        try:
+            self._write(load_queue, start)
+        finally:
+            self._stop.set()
+
+        self._report(time.perf_counter() - started)
+        if self._source_error is not None:
+            raise self._source_error
+        return self.metrics
+
+    def _write(self, load_queue: queue.Queue, watermark: int) -> None:
+        """ Load the transformed rows in batches, in the calling thread. """
+        metrics = self.metrics["load"]
+        batch: List[Any] = []
+        done = set()
+        first_failed: Optional[int] = None
+        received = 0
+        finished = False
+
+        while not finished:
+            try:
+                work = load_queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                work = None
+
+            if work is _DONE:
+                finished = True
+            elif work is not None:
+                position, value = work
+                received += 1
+                if value is _FAILED:
+                    # Kept out of done: the watermark stays before the failed item
+                    metrics.record(0.0, dropped=1)
+                    first_failed = position if first_failed is None else min(first_failed, position)
+                elif value is _DROPPED:
+                    done.add(position)
+                    metrics.record(0.0, dropped=1)
+                else:
+                    done.add(position)
+                    batch.append(value)
+                if received < self.batch_size:
+                    continue
+            elif not received:
+                continue
+            # flush on a full batch, at the end of the stream or when no row came for a while
+
+            while watermark + 1 in done:
+                watermark += 1
+                done.remove(watermark)
+            if first_failed is not None and finished:
+                logger.warning(f"Watermark held at {watermark}, before the failed item {first_failed}")
+
+            started = time.perf_counter()
+            try:
+                written = self.load(batch, watermark)
+                metrics.record(time.perf_counter() - started, processed=len(batch) if written is None else written,
+                               errors=0 if written is None else len(batch) - written)
+            except Exception:
+                metrics.record(time.perf_counter() - started, errors=len(batch))
+                raise
+            batch = []
+            received = 0
+
+    def _report(self, elapsed: float) -> None:
+        logger.info(f"Pipeline finished in {elapsed:.1f}s")
+        for metrics in self.metrics.values():
+            logger.info(f"  {metrics.summary(elapsed)}")
@@ -0,0 +1,131 @@
+import asyncio
+import random
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Default throughput allowed per host
+DEFAULT_RATE = 10.0  # requests per second
+DEFAULT_BURST = 20
+
+# Status codes worth retrying: the server is pushing back or temporarily failing
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """ Token bucket refilled at a constant rate, with a maximum burst. """
+
+    def __init__(self, rate: float, burst: int):
+        """ Initialize the bucket full.
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens in the bucket """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """ Take one token, possibly ahead of time.
+        Returns:
+            Number of seconds to wait before the reserved token is actually available
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """ Empty the bucket so that no token is available for the next seconds. """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """ Per-host token bucket limiter with jittered exponential backoff, shared by every importer. """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 60.0):
+        """ Initialize the rate limiter.
+        Args:
+            rate: Requests per second allowed for each host
+            burst: Number of requests that can be sent at once after an idle period
+            max_retries: Maximum number of retries of a request on 429/5xx
+            backoff_base: Base delay of the exponential backoff in seconds
+            backoff_max: Upper bound of a single backoff delay in seconds """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> None:
+        """ Block until a request to the host of url is allowed. """
+        delay = self._bucket(url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, url: str) -> None:
+        """ Wait, without blocking the event loop, until a request to the host of url is allowed. """
+        delay = self._bucket(url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def should_retry(self, status_code: int, attempt: int) -> bool:
+        """ Tell whether a response status is worth another attempt. """
+        return status_code in RETRY_STATUS_CODES and attempt < self.max_retries
+
+    def backoff(self, url: str, attempt: int, retry_after: Optional[str] = None) -> float:
+        """ Pause the host of url before the next attempt.
+        Args:
+            url: The URL that was pushed back
+            attempt: Number of the failed attempt, starting at 0
+            retry_after: Value of the Retry-After header, if any
+        Returns:
+            The applied delay in seconds
+        """
+        delay = self._parse_retry_after(retry_after)
+        if delay is None:
+            # Full jitter: spreads retries of concurrent workers
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+        self._bucket(url).pause(delay)
+        logger.warning(f"Backing off {urlparse(url).netloc} for {delay:.2f}s (attempt {attempt + 1})")
+        return delay
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """ Parse a Retry-After header given either in seconds or as an HTTP date. """
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            return min(self.backoff_max, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
+
+
+# Shared instance: every client of the process goes through the same buckets
+rate_limiter = RateLimiter()
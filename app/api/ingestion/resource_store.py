@@ -0,0 +1,93 @@
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Union, TYPE_CHECKING
+from app.models.enums.pokeapi import EndPoint
+
+if TYPE_CHECKING:
+    from app.api.ingestion.client import PokeApiClient
+
+# Enough for every species, move, ability and form of a full build
+DEFAULT_MAX_SIZE = 4096
+
+logger = logging.getLogger(__name__)
+
+ResourceKey = Tuple[EndPoint, Union[int, str]]
+
+
+class ResourceStore:
+    """ Size-bounded LRU store of PokeAPI resources shared by every importer of the process. """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """ Initialize the resource store.
+        Args:
+            max_size: Maximum number of resources kept, least recently used ones are evicted """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: "OrderedDict[ResourceKey, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: EndPoint, resource_id: Union[int, str]) -> ResourceKey:
+        """ Normalize numeric IDs so that 25 and "25" share the same entry. """
+        resource_id = str(resource_id)
+        return endpoint, int(resource_id) if resource_id.isdigit() else resource_id
+
+    def get(self, endpoint: EndPoint, resource_id: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """ Get a stored resource, counting the hit or miss. """
+        key = self.make_key(endpoint, resource_id)
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, endpoint: EndPoint, resource_id: Union[int, str], data: Dict[str, Any]) -> None:
+        """ Store a resource, evicting the least recently used ones beyond max_size. """
+        key = self.make_key(endpoint, resource_id)
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def fetch(self, client: "PokeApiClient", endpoint: EndPoint, resource_id: Union[int, str]) -> Dict[str, Any]:
+        """ Get a resource from the store, or from the API on a miss.
+        Args:
+            client: Client used on a miss
+            endpoint: The API endpoint
+            resource_id: The resource ID (or name)
+        Returns:
+            The resource data
+        """
+        data = self.get(endpoint, resource_id)
+        if data is None:
+            data = client.call(endpoint, resource_id=str(resource_id))
+            self.put(endpoint, resource_id, data)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """ Get the hit/miss counters of the store. """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+# Shared instance: importers of the same process deduplicate their fetches through it
+resource_store = ResourceStore()
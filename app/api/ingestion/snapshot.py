@@ -0,0 +1,201 @@
+import argparse
+import logging
+import zipfile
+import ujson
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any, Optional, List, Iterable, TYPE_CHECKING
+from app.models.enums.pokeapi import EndPoint
+
+if TYPE_CHECKING:
+    from app.api.ingestion.client import PokeApiClient
+
+# Default page size of the live API when no limit is given
+DEFAULT_PAGE_SIZE = 20
+# Prefix of every resource in the static api-data layout
+API_PREFIX = PurePosixPath("api/v2")
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotBackend:
+    """ Serves PokeAPI calls from a local snapshot in the static api-data layout.
+
+    The snapshot is either a directory or a .zip archive containing
+    api/v2/<endpoint>/index.json (full listing) and api/v2/<endpoint>/<id>/index.json
+    (resource details), optionally nested under a data/ folder as in the api-data repository. """
+
+    def __init__(self, path: Path, base_url: str = "https://pokeapi.co/api/v2/"):
+        """ Initialize the snapshot backend.
+        Args:
+            path: Snapshot directory or .zip archive
+            base_url: Base URL used to build the next/previous pagination links """
+        self.path = Path(path)
+        self.base_url = base_url
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[str, Dict[str, str]] = {}
+
+        if not self.path.exists():
+            raise FileNotFoundError(f"Snapshot not found at {self.path}")
+        if self.path.is_file():
+            self._zip = zipfile.ZipFile(self.path)
+        self.root = self._find_root()
+
+    def _find_root(self) -> PurePosixPath:
+        """ Locate the api/v2 folder inside the snapshot. """
+        for candidate in (API_PREFIX, PurePosixPath("data") / API_PREFIX):
+            if self._exists(candidate):
+                return candidate
+
+        if self._zip is not None:
+            # Archives often wrap everything in a top-level folder
+            for name in self._zip.namelist():
+                marker = name.find(f"{API_PREFIX}/")
+                if marker != -1:
+                    return PurePosixPath(name[:marker]) / API_PREFIX
+        raise FileNotFoundError(f"No {API_PREFIX} folder in snapshot {self.path}")
+
+    def _exists(self, relative: PurePosixPath) -> bool:
+        if self._zip is not None:
+            prefix = f"{relative}/"
+            return any(name.startswith(prefix) for name in self._zip.namelist())
+        return (self.path / relative).is_dir()
+
+    def _read(self, resource: str) -> Dict[str, Any]:
+        """ Read the index.json of a resource path relative to api/v2. """
+        relative = self.root / resource / "index.json"
+        try:
+            if self._zip is not None:
+                return ujson.loads(self._zip.read(str(relative)))
+            return ujson.loads((self.path / relative).read_bytes())
+        except (KeyError, FileNotFoundError):
+            raise FileNotFoundError(f"{resource} not found in snapshot {self.path}")
+
+    def _index(self, endpoint: EndPoint) -> Dict[str, Any]:
+        if endpoint.value not in self._indexes:
+            self._indexes[endpoint.value] = self._read(endpoint.value)
+        return self._indexes[endpoint.value]
+
+    def _resolve_id(self, endpoint: EndPoint, resource_id: str) -> str:
+        """ Map a resource name to its ID, as the live API accepts both. """
+        if resource_id.isdigit():
+            return resource_id
+        if endpoint.value not in self._names:
+            self._names[endpoint.value] = {
+                item["name"]: item["url"].rstrip("/").split("/")[-1]
+                for item in self._index(endpoint).get("results", []) if "name" in item
+            }
+        return self._names[endpoint.value].get(resource_id, resource_id)
+
+    def _page_url(self, endpoint: EndPoint, offset: int, limit: int) -> str:
+        return f"{self.base_url}{endpoint.value}?offset={offset}&limit={limit}"
+
+    def call(self, endpoint: EndPoint, resource_id: Optional[str] = None,
+             limit: Optional[int] = None, offset: Optional[int] = None,
+             params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """ Serve an API call from the snapshot, with the same pagination as the live API.
+        Args:
+            endpoint: The API endpoint (type, pokemon, etc.)
+            resource_id: Optional specific resource identifier
+            limit: Maximum number of items to retrieve
+            offset: Pagination offset
+            params: Additional request parameters (ignored)
+
+        Returns:
+            The API response data as dict """
+        if resource_id:
+            return self._read(f"{endpoint.value}/{self._resolve_id(endpoint, str(resource_id))}")
+
+        results = self._index(endpoint).get("results", [])
+        count = len(results)
+        offset = offset or 0
+        limit = DEFAULT_PAGE_SIZE if limit is None else limit
+
+        end = offset + limit
+        return {
+            "count": count,
+            "next": self._page_url(endpoint, end, limit) if end < count else None,
+            "previous": self._page_url(endpoint, max(0, offset - limit), limit) if offset > 0 else None,
+            "results": results[offset:end],
+        }
+        # slice the full listing like the API paginates it
+
+
+def record_snapshot(client: "PokeApiClient", output: Path,
+                    endpoints: Optional[Iterable[EndPoint]] = None, overwrite: bool = False) -> Dict[str, int]:
+    """ Record a snapshot of the live API in the static api-data layout.
+    Args:
+        client: Client used to fetch the live API
+        output: Destination directory
+        endpoints: Endpoints to record, all of them by default
+        overwrite: Refetch resources already present in the snapshot
+    Returns:
+        Number of recorded resources per endpoint
+    """
+    root = Path(output) / API_PREFIX
+    recorded = {}
+
+    for endpoint in endpoints or list(EndPoint):
+        results = list(client.iter_listing(endpoint))
+        total_count = len(results)
+        endpoint_dir = root / endpoint.value
+        _write_json(endpoint_dir / "index.json", {"count": total_count, "next": None, "previous": None, "results": results})
+        logger.info(f"Recording {total_count} {endpoint.value} resources")
+
+        count = 0
+        for item in results:
+            item_id = client.extract_id_from_url(item.get("url", ""))
+            if not item_id:
+                continue
+
+            target = endpoint_dir / str(item_id) / "index.json"
+            if target.exists() and not overwrite:
+                count += 1
+                continue
+            # resume interrupted recordings
+
+            try:
+                _write_json(target, client.call(endpoint, resource_id=str(item_id)))
+                count += 1
+            except Exception as e:
+                logger.error(f"Error recording {endpoint.value} {item_id}: {e}")
+
+        recorded[endpoint.value] = count
+        logger.info(f"Recorded {count}/{total_count} {endpoint.value} resources")
+
+    return recorded
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(ujson.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+    # atomic write: an interrupted run never leaves a truncated file
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record a local snapshot of the PokeAPI for offline builds")
+
+    parser.add_argument("output", type=Path, help="Destination directory of the snapshot")
+    parser.add_argument("--endpoint", action="append", choices=[e.value for e in EndPoint],
+                        help="Endpoint to record (repeatable), all endpoints by default")
+    parser.add_argument("--overwrite", action="store_true", help="Refetch resources already recorded")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from app.api.ingestion.client import PokeApiClient
+    from app.api.ingestion.cache import SQLiteResponseCache
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    args = parse_arguments()
+    endpoints = [EndPoint(value) for value in args.endpoint] if args.endpoint else None
+    recorded = record_snapshot(PokeApiClient(cache=SQLiteResponseCache()), args.output, endpoints, args.overwrite)
+
+    print(f"Snapshot recorded in {args.output}: {sum(recorded.values())} resources.")
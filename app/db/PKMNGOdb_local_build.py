@@ -1,6 +1,7 @@
 import logging
 from pathlib import Path
-from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel import SQLModel, Session
+from app.db.engine import engine as db_engine
 from typing import Optional
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -36,15 +37,12 @@ class PokemonGODatabase:
         # Créer le répertoire parent si nécessaire
         db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Créer le moteur SQLite
-        engine = create_engine(
-            f"sqlite:///{db_path}",
-            echo=True,
-            connect_args={"check_same_thread": False}
-        )
+        # Moteur SQLite du registre
+        engine = db_engine.get_engine(db_path.name, db_path.parent, echo=True)
         
         # Créer toutes les tables
         SQLModel.metadata.create_all(engine)
+        self.ensure_constraints(engine)
         
         logger.info("✅ Base de données Pokémon GO construite")
         
@@ -55,6 +53,23 @@ class PokemonGODatabase:
         
         return engine
     
+    def ensure_constraints(self, engine):
+        """Ajoute aux bases existantes les index uniques ciblés par les upserts (ON CONFLICT).
+
+        create_all ne modifie pas les tables existantes : les doublons sont supprimés (la plus
+        ancienne ligne est conservée) avant de créer les index manquants."""
+        from sqlalchemy import text
+        from app.models.GO_tables.GO_pokemon_learnset import GO_PokemonLearnset
+
+        with engine.begin() as connection:
+            connection.execute(text(
+                "DELETE FROM go_pokemon_learnsets WHERE id NOT IN ("
+                "SELECT MIN(id) FROM go_pokemon_learnsets GROUP BY pokemon_id, move_id, is_fast, is_charged)"
+            ))
+            for index in GO_PokemonLearnset.__table__.indexes:
+                if index.unique:
+                    index.create(connection, checkfirst=True)
+
     def init_go_types(self, engine):
         """Initialise les types Pokémon GO et leurs relations d'efficacité."""
         from app.models.GO_tables.GO_type import GO_Type
@@ -1,32 +1,238 @@
 # app/db/engine.py
+import logging
+import threading
+import time
+from functools import partial
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.engine import Engine as SQLAlchemyEngine
 from sqlmodel import create_engine, Session
 from contextlib import contextmanager
 
+logger = logging.getLogger(__name__)
+
+# Connexions gardées ouvertes par base, et pragmas appliqués à chaque nouvelle connexion
+DEFAULT_POOL_SIZE = 5
+DEFAULT_PRAGMAS: Dict[str, Any] = {}
+
+# Pragmas des connexions d'un build : pas de fsync, 256 Mo de cache par connexion, tables temporaires en mémoire
+BULK_LOAD_PRAGMAS: Dict[str, Any] = {
+    "synchronous": "OFF",
+    "cache_size": -262144,
+    "temp_store": "MEMORY",
+}
+# Clés de connection_record.info : pragmas du registre déjà appliqués à la connexion, et pragmas
+# d'origine à restituer quand elle revient au pool après un chargement massif
+_APPLIED_PRAGMAS = "applied_pragmas"
+_BULK_LOAD_RESTORE = "bulk_load_restore"
+
+
+def _set_pragmas(pragmas: Dict[str, Any], dbapi_connection, connection_record):
+    for name, value in pragmas.items():
+        dbapi_connection.execute(f"PRAGMA {name}={value}")
+
+
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    # pysqlite n'ouvre une transaction qu'avant un INSERT/UPDATE/DELETE : un SAVEPOINT ouvert hors
+    # transaction est alors validé dès son RELEASE. Les transactions sont ouvertes par _begin.
+    dbapi_connection.isolation_level = None
+
+
+def _begin(connection):
+    if connection.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        connection.exec_driver_sql("BEGIN")
+
+
+def _sync_pragmas(pragmas: Dict[str, Any], dbapi_connection, connection_record, connection_proxy):
+    # Les pragmas demandés après la création du moteur s'appliquent aussi aux connexions déjà ouvertes
+    applied = connection_record.info.setdefault(_APPLIED_PRAGMAS, {})
+    missing = {name: value for name, value in pragmas.items() if applied.get(name) != value}
+    if missing:
+        _set_pragmas(missing, dbapi_connection, connection_record)
+        applied.update(missing)
+
+
+def _apply_bulk_load_pragmas(dbapi_connection, connection_record, connection_proxy):
+    if _BULK_LOAD_RESTORE not in connection_record.info:
+        connection_record.info[_BULK_LOAD_RESTORE] = {
+            name: dbapi_connection.execute(f"PRAGMA {name}").fetchone()[0] for name in BULK_LOAD_PRAGMAS
+        }
+    _set_pragmas(BULK_LOAD_PRAGMAS, dbapi_connection, connection_record)
+
+
+def _restore_pragmas(dbapi_connection, connection_record):
+    restore = connection_record.info.pop(_BULK_LOAD_RESTORE, None)
+    if restore and dbapi_connection is not None:
+        _set_pragmas(restore, dbapi_connection, connection_record)
+
+
+def drop_secondary_indexes(engine: SQLAlchemyEngine) -> List[str]:
+    """Supprime les index secondaires de la base.
+
+    Les index des clés primaires et des contraintes d'unicité sont conservés : les upserts
+    (ON CONFLICT) en ont besoin.
+
+    Returns:
+        Les requêtes CREATE INDEX permettant de les reconstruire
+    """
+    with engine.begin() as connection:
+        indexes = connection.execute(text(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'"
+        )).all()
+        for name, _ in indexes:
+            connection.execute(text(f'DROP INDEX "{name}"'))
+    return [sql for _, sql in indexes]
+
+
+def rebuild_indexes(engine: SQLAlchemyEngine, statements: List[str]) -> None:
+    """Reconstruit les index supprimés, puis met à jour les statistiques et compacte la base."""
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+        connection.execute(text("ANALYZE"))
+    # VACUUM ne peut pas s'exécuter dans une transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM"))
+
+
+@contextmanager
+def bulk_loading(engine: SQLAlchemyEngine, enabled: bool = True):
+    """Context manager de chargement massif sur un moteur SQLite.
+
+    La base passe en journal WAL et les connexions prises dans le pool pendant le bloc reçoivent
+    les pragmas de build, restitués à leur retour au pool : le moteur n'est pas fermé et reste
+    utilisable par les autres sessions. Les index secondaires sont supprimés pendant le chargement
+    puis reconstruits à la sortie, même en cas d'erreur, avant ANALYZE et VACUUM.
+
+    À réserver au chargement des données d'un build complet (orchestrateur, importeur lancé seul).
+
+    Args:
+        engine: Moteur SQLAlchemy de la base à charger
+        enabled: Exécuter le bloc sans rien changer si False
+    """
+    if not enabled:
+        yield engine
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("PRAGMA journal_mode=WAL"))
+    if not event.contains(engine, "checkin", _restore_pragmas):
+        event.listen(engine, "checkin", _restore_pragmas)
+    event.listen(engine, "checkout", _apply_bulk_load_pragmas)
+    try:
+        statements = drop_secondary_indexes(engine)
+        logger.info(f"Chargement massif : {len(statements)} index secondaires supprimés")
+        try:
+            yield engine
+        finally:
+            started = time.perf_counter()
+            rebuild_indexes(engine, statements)
+            logger.info(f"Index reconstruits, ANALYZE et VACUUM en {time.perf_counter() - started:.1f}s")
+    finally:
+        # Les connexions encore empruntées restituent leurs pragmas au retour au pool
+        event.remove(engine, "checkout", _apply_bulk_load_pragmas)
+
+
 class Engine:
-    def __init__(self):
+    """Registre des moteurs SQLAlchemy : un moteur, et donc un pool de connexions, par fichier de base."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, pragmas: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            pool_size: Nombre de connexions gardées ouvertes par base
+            pragmas: Pragmas appliqués à chaque nouvelle connexion (défaut: DEFAULT_PRAGMAS)
+        """
         # Chemin absolu vers le dossier db, peu importe d'où est lancé le script
         self.default_folder = Path(__file__).resolve().parent
-    
+        self.pool_size = pool_size
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._engines: Dict[Path, SQLAlchemyEngine] = {}
+        self._pragmas: Dict[Path, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, db_name: str, folder: Path = None) -> Path:
+        """Chemin absolu d'une base, clé du registre."""
+        return ((folder or self.default_folder) / db_name).resolve()
+
+    def get_engine(self, db_name: str, folder: Path = None, echo: bool = False, pool_size: int = None,
+                   pragmas: Optional[Dict[str, Any]] = None) -> SQLAlchemyEngine:
+        """Moteur d'une base, créé au premier appel puis réutilisé.
+
+        echo et pool_size ne s'appliquent qu'à la création du moteur. Les pragmas demandés ensuite
+        s'ajoutent à ceux du moteur et sont appliqués à chaque connexion à sa prochaine sortie du pool.
+
+        Args:
+            db_name: Nom du fichier de base de données
+            folder: Dossier contenant la base (défaut: app/db)
+            echo: Afficher les logs SQL (défaut: False)
+            pool_size: Taille du pool (défaut: celle du registre)
+            pragmas: Pragmas des connexions (défaut: ceux du registre)
+
+        Raises:
+            ValueError: Si un pragma demandé a déjà une autre valeur sur le moteur
+        """
+        db_path = self.resolve(db_name, folder)
+        with self._lock:
+            engine = self._engines.get(db_path)
+            if engine is None:
+                # Créer le répertoire parent si nécessaire
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                engine = create_engine(
+                    f"sqlite:///{db_path}",
+                    echo=echo,
+                    poolclass=QueuePool,
+                    pool_size=pool_size or self.pool_size,
+                    connect_args={"check_same_thread": False}
+                )
+                # Transactions explicites (recette SQLAlchemy pour pysqlite) : les SAVEPOINT
+                # d'une session restent dans sa transaction jusqu'au commit
+                event.listen(engine, "connect", _disable_driver_transactions)
+                event.listen(engine, "begin", _begin)
+                connection_pragmas = dict(self.pragmas if pragmas is None else pragmas)
+                event.listen(engine, "checkout", partial(_sync_pragmas, connection_pragmas))
+                self._engines[db_path] = engine
+                self._pragmas[db_path] = connection_pragmas
+                logger.debug(f"Moteur créé pour {db_path}")
+            elif pragmas:
+                connection_pragmas = self._pragmas[db_path]
+                conflicts = {name for name, value in pragmas.items()
+                             if name in connection_pragmas and str(connection_pragmas[name]) != str(value)}
+                if conflicts:
+                    raise ValueError(f"Pragmas déjà définis avec d'autres valeurs pour {db_path} : "
+                                     f"{', '.join(sorted(conflicts))}")
+                connection_pragmas.update(pragmas)
+        return engine
+
+    def dispose(self, db_name: str = None, folder: Path = None) -> None:
+        """Ferme les connexions d'une base, ou de toutes, et la retire du registre."""
+        with self._lock:
+            if db_name is None:
+                engines = list(self._engines.values())
+                self._engines.clear()
+                self._pragmas.clear()
+            else:
+                db_path = self.resolve(db_name, folder)
+                engine = self._engines.pop(db_path, None)
+                self._pragmas.pop(db_path, None)
+                engines = [engine] if engine is not None else []
+        for engine in engines:
+            engine.dispose()
+
     @contextmanager
     def connect(self, db_name: str, folder: Path = None, echo: bool = False):
         """Context manager pour se connecter à la base de données locale.
-        
+
+        Les sessions d'une même base partagent le moteur du registre et réutilisent ses connexions.
+
         Args:
             db_name: Nom du fichier de base de données
             folder: Dossier contenant la base (défaut: app/db)
             echo: Afficher les logs SQL (défaut: False)
         """
-        db_dir = folder or self.default_folder
-        # Créer le répertoire parent si nécessaire
-        db_dir.mkdir(parents=True, exist_ok=True)
-        
-        db_path = db_dir / db_name
-        engine = create_engine(
-            f"sqlite:///{db_path}", 
-            echo=echo, 
-            connect_args={"check_same_thread": False}
-        )
+        engine = self.get_engine(db_name, folder, echo=echo)
         session = Session(engine)
         try:
             yield session
@@ -38,4 +244,4 @@ class Engine:
             session.close()
 
 # Instance singleton
-engine = Engine()
\ No newline at end of file
+engine = Engine()
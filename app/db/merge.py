@@ -11,21 +11,115 @@ from loguru import logger
 DEFAULT_PKMN_PATH = "PKMN copy.db"
 DEFAULT_PKMNGO_PATH = "PKMNGO copy.db"
 DEFAULT_OUTPUT_PATH = "PKMN copy V2.db"
+# Cache des correspondances de noms (attaques, types), réutilisé d'une fusion à l'autre
+DEFAULT_MAPPINGS_PATH = "name_mappings.db"
 
 # Import notre engine SQLAlchemy personnalisé
 from app.db.engine import engine
+from app.db.name_resolver import DEFAULT_THRESHOLD, NameMappingCache, NameResolver, normalize_name
 
 # Import des modèles de tables existants
 from app.models.tables import Pokemon
 # Import des modèles GO
 from app.models.GO_tables import GO_Pokemon, GO_PokemonStats, GO_Move, GO_PokemonLearnset, GO_Type, GO_TypeEffectiveness
 
+# Mots de forme dans les noms (« Alolan Vulpix », « Vulpix (Alola Form) », « Mega Charizard X »)
+FORM_WORDS = {
+    "alola": "alola", "alolan": "alola",
+    "galar": "galar", "galarian": "galar",
+    "hisui": "hisui", "hisuian": "hisui",
+    "paldea": "paldea", "paldean": "paldea",
+    "mega": "mega", "primal": "primal",
+}
+FORM_FILLERS = {"form", "forme"}
+
+
+def form_key(normalized_name):
+    """
+    Sépare un nom normalisé en (nom de base, forme), la forme valant "" pour la forme normale.
+    Ex: "mega charizard x" -> ("charizard", "mega-x"), "vulpix alola form" -> ("vulpix", "alola")
+    """
+    tokens = [t for t in re.split(r'[\s-]+', normalized_name) if t]
+    forms = [FORM_WORDS[t] for t in tokens if t in FORM_WORDS]
+    base = [t for t in tokens if t not in FORM_WORDS and t not in FORM_FILLERS]
+    # Méga-évolutions X/Y (Dracaufeu, Mewtwo)
+    if "mega" in forms and len(base) > 1 and base[-1] in ("x", "y"):
+        forms.append(base.pop())
+    return " ".join(base), "-".join(forms)
+
+
+class PokemonMatchIndex:
+    """
+    Index des Pokémon de la base principale, construit une fois pour apparier les Pokémon GO
+    par dictionnaires plutôt qu'en parcourant toute la liste pour chacun.
+
+    Clés : nom normalisé, (numéro de Pokédex, forme) et (nom de base, forme).
+    Les correspondances à plusieurs candidats sont conservées dans `ambiguous`.
+    """
+
+    def __init__(self, rows, normalize):
+        """
+        Args:
+            rows: Lignes (id, name_en, national_pokedex_number) de la table pokemons
+            normalize: Fonction de normalisation des noms (DatabaseFusion.normalize_name)
+        """
+        self.normalize = normalize
+        self.by_name = {}
+        self.by_form = {}
+        self.by_base = {}
+        self.bases = {}
+        self.ambiguous = []
+        for p_id, name, pokedex_num in sorted(rows, key=lambda row: row[0]):
+            normalized = normalize(name)
+            base, form = form_key(normalized)
+            self.bases[p_id] = base
+            self.by_name.setdefault(normalized, []).append(p_id)
+            self.by_form.setdefault((pokedex_num, form), []).append(p_id)
+            self.by_base.setdefault((base, form), []).append(p_id)
+
+    def match(self, name, pokedex_num, go_id=None):
+        """
+        ID principal du Pokémon GO, None si aucun candidat.
+
+        Ordre : nom exact, numéro de Pokédex et forme, nom de base et forme, puis forme normale
+        du même numéro. Entre plusieurs candidats, celui de même nom de base l'emporte, sinon
+        le plus petit ID (la correspondance est alors signalée comme ambiguë).
+        """
+        normalized = self.normalize(name)
+        base, form = form_key(normalized)
+        for candidates in (self.by_name.get(normalized), self.by_form.get((pokedex_num, form)),
+                           self.by_base.get((base, form)), self.by_form.get((pokedex_num, ""))):
+            if candidates:
+                break
+        else:
+            return None
+
+        if len(candidates) > 1:
+            same_base = [p_id for p_id in candidates if self.bases[p_id] == base]
+            if len(same_base) == 1:
+                return same_base[0]
+            self.ambiguous.append({"go_id": go_id, "name": name, "pokedex_number": pokedex_num,
+                                   "candidates": candidates})
+        return candidates[0]
+
+    def log_ambiguous(self):
+        """Rapport des correspondances ambiguës"""
+        for entry in self.ambiguous:
+            logger.warning(f"Correspondance ambiguë pour le Pokémon GO {entry['name']} (#{entry['pokedex_number']}): "
+                           f"candidats {entry['candidates']}, ID {entry['candidates'][0]} retenu")
+        if self.ambiguous:
+            logger.warning(f"{len(self.ambiguous)} correspondances ambiguës entre Pokémon GO et Pokémon principaux")
+
+
 class DatabaseFusion:
-    def __init__(self, pkmn_path=DEFAULT_PKMN_PATH, pkmngo_path=DEFAULT_PKMNGO_PATH, output_path=DEFAULT_OUTPUT_PATH):
+    def __init__(self, pkmn_path=DEFAULT_PKMN_PATH, pkmngo_path=DEFAULT_PKMNGO_PATH, output_path=DEFAULT_OUTPUT_PATH,
+                 mappings_path=DEFAULT_MAPPINGS_PATH, match_threshold=DEFAULT_THRESHOLD):
         self.current_dir = Path(__file__).parent
         self.pkmn_db_path = self.current_dir / pkmn_path
         self.pkmngo_db_path = self.current_dir / pkmngo_path
         self.merged_db_path = self.current_dir / output_path
+        self.mappings_path = self.current_dir / mappings_path
+        self.match_threshold = match_threshold
         
         # Ensure source databases exist
         if not self.pkmn_db_path.exists():
@@ -35,14 +129,20 @@ class DatabaseFusion:
     
     def normalize_name(self, name):
         """Normalize a name for better matching"""
-        if not name:
-            return ""
-        # Remove special characters, except hyphen
-        name = re.sub(r'[^\w\s-]', '', name)
-        # Replace multiple spaces with single space
-        name = re.sub(r'\s+', ' ', name)
-        # Convert to lowercase and strip
-        return name.lower().strip()
+        return normalize_name(name)
+    
+    def name_resolver(self, rows, namespace):
+        """
+        Create a name resolver over (id, name) rows of the main DB, cached in the mappings table
+        Call its save() method to keep the resolved names for the next fusion
+        """
+        return NameResolver(((row['id'], row['name']) for row in rows), threshold=self.match_threshold,
+                            cache=NameMappingCache(self.mappings_path), namespace=namespace)
+    
+    def log_unmatched(self, kind, name, resolver):
+        """Log a name without match, with its best candidates under the threshold"""
+        candidates = ", ".join(f"'{m.name}' ({m.score})" for m in resolver.candidates(name, limit=3, threshold=0.3))
+        logger.warning(f"No matching main DB {kind} for GO {kind} '{name}'" + (f" (candidates: {candidates})" if candidates else ""))
     
     def get_tables(self, db_path):
         """Get all tables from a database"""
@@ -80,12 +180,12 @@ class DatabaseFusion:
     
     def create_pokemon_mapping(self):
         """
-        Create a mapping between Pokémon GO and Pokémon DB entries based on pokédex number
+        Create a mapping between Pokémon GO and Pokémon DB entries based on pokédex number, name and form
         Returns a dict mapping GO Pokémon IDs to main DB IDs
         """
-        # Get Pokémon from main DB indexed by pokédex number
-        pkmn_pokemon = self.get_table_data(self.pkmn_db_path, "pokemons", ["id", "national_pokedex_number"])
-        pkmn_by_pokedex = {row['national_pokedex_number']: row['id'] for row in pkmn_pokemon}
+        # Index main DB Pokémon by name, pokédex number and form
+        pkmn_pokemon = self.get_table_data(self.pkmn_db_path, "pokemons", ["id", "name_en", "national_pokedex_number"])
+        index = PokemonMatchIndex(pkmn_pokemon, self.normalize_name)
         
         # Get Pokémon from GO DB
         go_pokemon = self.get_table_data(self.pkmngo_db_path, "go_pokemons", ["id", "name", "pokedex_number"])
@@ -93,14 +193,14 @@ class DatabaseFusion:
         # Map GO Pokémon IDs to main DB IDs
         pokemon_mapping = {}
         for row in go_pokemon:
-            go_id = row['id']
-            pokedex_num = row['pokedex_number']
-            
-            if pokedex_num in pkmn_by_pokedex:
-                pokemon_mapping[go_id] = pkmn_by_pokedex[pokedex_num]
+            main_id = index.match(row['name'], row['pokedex_number'], row['id'])
+            if main_id is not None:
+                pokemon_mapping[row['id']] = main_id
             else:
-                logger.warning(f"No matching main DB Pokémon for GO Pokémon {row['name']} (#{pokedex_num})")
+                logger.warning(f"No matching main DB Pokémon for GO Pokémon {row['name']} (#{row['pokedex_number']})")
         
+        index.log_ambiguous()
+        self.ambiguous_pokemon_matches = index.ambiguous
         logger.info(f"Created mapping between {len(pokemon_mapping)} GO Pokémon and main DB Pokémon")
         return pokemon_mapping
     
@@ -109,9 +209,9 @@ class DatabaseFusion:
         Create a mapping between GO moves and main DB moves based on name similarity
         Returns a dict mapping GO move IDs to main DB move IDs
         """
-        # Get moves from main DB
+        # Index main DB moves by name and trigrams
         pkmn_moves = self.get_table_data(self.pkmn_db_path, "moves", ["id", "name"])
-        pkmn_moves_by_name = {self.normalize_name(row['name']): row['id'] for row in pkmn_moves}
+        resolver = self.name_resolver(pkmn_moves, "moves")
         
         # Initialize move mapping dict
         move_mapping = {}
@@ -124,24 +224,15 @@ class DatabaseFusion:
             go_moves = self.get_table_data(self.pkmngo_db_path, table, ["id", "name"])
             
             for move in go_moves:
-                go_id = move['id']
-                go_name = self.normalize_name(move['name'])
-                
-                # Try exact match first
-                if go_name in pkmn_moves_by_name:
-                    move_mapping[go_id] = pkmn_moves_by_name[go_name]
+                # Exact match first, then trigram similarity
+                match = resolver.resolve(move['name'])
+                if match:
+                    move_mapping[move['id']] = match.id
                 else:
-                    # Try partial match
-                    matches = [name for name in pkmn_moves_by_name.keys() 
-                              if go_name in name or name in go_name]
-                    
-                    if matches:
-                        # Pick the shortest match as likely most similar
-                        best_match = min(matches, key=len)
-                        move_mapping[go_id] = pkmn_moves_by_name[best_match]
-                    else:
-                        logger.warning(f"No matching main DB move for GO move '{move['name']}'")
+                    self.log_unmatched("move", move['name'], resolver)
         
+        resolver.save()
+        resolver.cache.close()
         logger.info(f"Created mapping between {len(move_mapping)} GO moves and main DB moves")
         return move_mapping
     
@@ -152,7 +243,6 @@ class DatabaseFusion:
         """
         # Get types from main DB
         pkmn_types = self.get_table_data(self.pkmn_db_path, "types", ["id", "name"])
-        pkmn_types_by_name = {self.normalize_name(row['name']): row['id'] for row in pkmn_types}
         
         # Check if GO type table exists
         go_tables = self.get_tables(self.pkmngo_db_path)
@@ -165,15 +255,16 @@ class DatabaseFusion:
         
         # Map GO type IDs to main DB type IDs
         type_mapping = {}
+        resolver = self.name_resolver(pkmn_types, "types")
         for row in go_types:
-            go_id = row['id']
-            go_name = self.normalize_name(row['name'])
-            
-            if go_name in pkmn_types_by_name:
-                type_mapping[go_id] = pkmn_types_by_name[go_name]
+            match = resolver.resolve(row['name'])
+            if match:
+                type_mapping[row['id']] = match.id
             else:
-                logger.warning(f"No matching main DB type for GO type '{row['name']}'")
+                self.log_unmatched("type", row['name'], resolver)
         
+        resolver.save()
+        resolver.cache.close()
         logger.info(f"Created mapping between {len(type_mapping)} GO types and main DB types")
         return type_mapping
     
@@ -273,7 +364,8 @@ class DatabaseFusion:
     
     def update_go_pokemon_ids(self, conn, pokemon_mapping):
         """
-        Vérifie et aligne les IDs entre go_pokemons et pokemons basé sur le nom et les types.
+        Vérifie et aligne les IDs entre go_pokemons et pokemons, d'après pokemon_mapping
+        puis l'index PokemonMatchIndex pour les Pokémon GO qui n'y sont pas.
         Met à jour les références dans les autres tables GO.
         """
         try:
@@ -299,39 +391,25 @@ class DatabaseFusion:
             cursor.execute(query)
             go_pokemons = cursor.fetchall()
             
-            # Récupérer tous les Pokémon principaux
-            cursor.execute("""
-                SELECT p.id, p.name_en, p.national_pokedex_number
-                FROM pokemons p
-            """)
-            main_pokemons = {row[0]: row for row in cursor.fetchall()}
-            
-            # Pour chaque Pokémon GO
-            updates_count = 0
+            # Les Pokémon GO absents de pokemon_mapping sont appariés avec l'index de la base fusionnée
+            updates = []
+            index = None
             for go_id, go_name, pokedex_num in go_pokemons:
-                # Chercher par numéro de Pokédex d'abord (méthode la plus fiable)
-                found_id = None
-                for p_id, p in main_pokemons.items():
-                    if p[2] == pokedex_num:  # national_pokedex_number
-                        found_id = p_id
-                        break
-                
-                # Si pas trouvé par numéro de Pokédex, chercher par nom
-                if not found_id:
-                    go_name_lower = go_name.lower()
-                    for p_id, p in main_pokemons.items():
-                        p_name_lower = p[1].lower()  # name_en
-                        
-                        # Vérifier si les noms sont similaires
-                        if go_name_lower in p_name_lower or p_name_lower in go_name_lower:
-                            found_id = p_id
-                            break
-                
-                # Mettre à jour l'ID principal
-                if found_id:
-                    conn.execute("UPDATE go_pokemons SET main_id = ? WHERE id = ?", 
-                                (found_id, go_id))
-                    updates_count += 1
+                found_id = pokemon_mapping.get(go_id)
+                if found_id is None:
+                    if index is None:
+                        cursor.execute("SELECT id, name_en, national_pokedex_number FROM pokemons")
+                        index = PokemonMatchIndex(cursor.fetchall(), self.normalize_name)
+                    found_id = index.match(go_name, pokedex_num, go_id)
+                if found_id is not None:
+                    updates.append((found_id, go_id))
+            
+            if index is not None:
+                index.log_ambiguous()
+            
+            # Mettre à jour l'ID principal
+            conn.executemany("UPDATE go_pokemons SET main_id = ? WHERE id = ?", updates)
+            updates_count = len(updates)
             
             logger.info(f"Correspondance trouvée pour {updates_count}/{len(go_pokemons)} Pokémon GO")
             
@@ -517,6 +595,9 @@ def parse_arguments():
     parser.add_argument("--pkmn", default=DEFAULT_PKMN_PATH, help="Chemin vers la base de données PKMN.db (ou sa copie)")
     parser.add_argument("--pkmngo", default=DEFAULT_PKMNGO_PATH, help="Chemin vers la base de données PKMNGO.db (ou sa copie)")
     parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="Nom du fichier de sortie pour la base fusionnée V2")
+    parser.add_argument("--mappings", default=DEFAULT_MAPPINGS_PATH, help="Fichier du cache des correspondances de noms")
+    parser.add_argument("--match-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Score minimal (0-1) d'une correspondance approchée de noms (défaut: {DEFAULT_THRESHOLD})")
     
     return parser.parse_args()
 
@@ -536,7 +617,7 @@ if __name__ == "__main__":
             logger.info(f"Created logs directory at {logs_dir}")
         
         # Merge databases without modifying originals
-        fusion = DatabaseFusion(args.pkmn, args.pkmngo, args.output)
+        fusion = DatabaseFusion(args.pkmn, args.pkmngo, args.output, args.mappings, args.match_threshold)
         merged_db_path = fusion.merge_databases()
         
         print("🚀 Fusion V2 terminée!")
@@ -0,0 +1,179 @@
+# app/db/name_resolver.py
+#
+# Résolution de noms (attaques, types, Pokémon) entre deux sources : correspondance exacte sur le
+# nom normalisé, puis similarité de trigrammes de caractères (coefficient de Dice) via un index
+# inversé trigramme → noms, sans comparer chaque nom à toute la liste.
+import logging
+import re
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+# Score minimal (0-1) d'une correspondance approchée. Sous 0.9, des attaques distinctes se
+# confondent (« Thunder Fang » → « Thunder » : 0.76, « Wrap Green » → « Wrap » : 0.63)
+DEFAULT_THRESHOLD = 0.9
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS name_mappings ("
+    "namespace TEXT NOT NULL, source_name TEXT NOT NULL, target_id INTEGER NOT NULL, "
+    "target_name TEXT NOT NULL, score REAL NOT NULL, updated_at REAL NOT NULL, "
+    "PRIMARY KEY (namespace, source_name))",
+)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Normalise un nom pour la comparaison."""
+    if not name:
+        return ""
+    # Supprimer les caractères spéciaux, sauf le tiret
+    name = re.sub(r'[^\w\s-]', '', name)
+    # Réduire les suites d'espaces à un seul espace
+    name = re.sub(r'\s+', ' ', name)
+    # Passer en minuscules et retirer les espaces aux extrémités
+    return name.lower().strip()
+
+
+def match_key(name: Optional[str]) -> str:
+    """Clé de comparaison : nom normalisé, tirets remplacés par des espaces (« Mud-Slap » = « Mud Slap »)."""
+    return " ".join(normalize_name(name).replace("-", " ").split())
+
+
+def ngrams(key: str, size: int = NGRAM_SIZE) -> frozenset:
+    """Trigrammes d'une clé, complétée d'espaces pour compter les débuts et fins de mots."""
+    padded = f"{' ' * (size - 1)}{key} "
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+@dataclass(frozen=True)
+class Match:
+    id: int
+    name: str
+    score: float
+
+
+class NameMappingCache:
+    """Table name_mappings d'un fichier SQLite : noms sources déjà résolus, par espace de noms.
+
+    Une correspondance approchée ajoutée à la main avec un score de 1.0 vaut confirmation."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+
+    def load(self, namespace: str) -> Dict[str, Match]:
+        rows = self.connection.execute(
+            "SELECT source_name, target_id, target_name, score FROM name_mappings WHERE namespace = ?", (namespace,)
+        )
+        return {source: Match(target_id, target_name, score) for source, target_id, target_name, score in rows}
+
+    def save(self, namespace: str, matches: Dict[str, Match]):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO name_mappings "
+                "(namespace, source_name, target_id, target_name, score, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(namespace, source, m.id, m.name, m.score, time.time()) for source, m in matches.items()],
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NameResolver:
+    """
+    Résout des noms vers les IDs d'une liste de référence.
+
+    Un nom est d'abord cherché tel quel (clé normalisée), puis par similarité de trigrammes : les
+    candidats sont les noms partageant au moins un trigramme, classés par score de Dice, le plus
+    court l'emportant à score égal. Avec un cache, les résolutions sont lues dans sa table
+    name_mappings ; une entrée dont la cible a disparu ou changé de nom est recalculée. Seules les
+    correspondances exactes y sont enregistrées : une correspondance approchée n'est pas confirmée et
+    est recalculée à chaque exécution.
+    """
+
+    def __init__(self, names: Iterable[Tuple[int, str]], threshold: float = DEFAULT_THRESHOLD,
+                 cache: Optional[NameMappingCache] = None, namespace: Optional[str] = None):
+        """
+        Args:
+            names: Paires (id, nom) de la liste de référence
+            threshold: Score minimal d'une correspondance approchée (1.0 : correspondances exactes seules)
+            cache: Cache des résolutions, partagé entre les exécutions
+            namespace: Espace de noms des entrées du cache (ex: "moves")
+        """
+        self.threshold = threshold
+        self.cache = cache
+        self.namespace = namespace
+        self.names: Dict[int, str] = {}
+        self.exact: Dict[str, int] = {}
+        self.grams: Dict[str, frozenset] = {}
+        self.postings: Dict[str, List[str]] = {}
+        for target_id, name in names:
+            self.add(target_id, name)
+
+        self.cached = cache.load(namespace) if cache is not None else {}
+        self.resolved: Dict[str, Match] = {}
+
+    def add(self, target_id: int, name: str):
+        """Ajoute un nom à la liste de référence."""
+        self.names[target_id] = name
+        key = match_key(name)
+        if key in self.exact:
+            return
+        self.exact[key] = target_id
+        self.grams[key] = ngrams(key)
+        for gram in self.grams[key]:
+            self.postings.setdefault(gram, []).append(key)
+
+    def candidates(self, name: str, limit: int = 5, threshold: Optional[float] = None) -> List[Match]:
+        """Meilleurs candidats du nom, par score décroissant, au-dessus du seuil."""
+        threshold = self.threshold if threshold is None else threshold
+        key = match_key(name)
+        if key in self.exact:
+            target_id = self.exact[key]
+            return [Match(target_id, self.names[target_id], 1.0)]
+
+        query = ngrams(key)
+        shared = Counter(other for gram in query for other in self.postings.get(gram, ()))
+        scored = []
+        for other, count in shared.items():
+            score = 2 * count / (len(query) + len(self.grams[other]))
+            if score >= threshold:
+                scored.append((-score, len(other), other))
+        scored.sort()
+        return [Match(self.exact[other], self.names[self.exact[other]], round(-score, 4))
+                for score, _, other in scored[:limit]]
+
+    def resolve(self, name: str) -> Optional[Match]:
+        """Meilleure correspondance du nom, None sous le seuil."""
+        cached = self.cached.get(name)
+        if cached is not None and self.names.get(cached.id) == cached.name and cached.score >= self.threshold:
+            return cached
+
+        best = self.candidates(name, limit=1)
+        if not best:
+            return None
+        self.cached[name] = best[0]
+        if best[0].score < 1.0:
+            logger.debug(f"'{name}' résolu en '{best[0].name}' (score {best[0].score})")
+        else:
+            self.resolved[name] = best[0]
+        return best[0]
+
+    def save(self):
+        """Enregistre dans le cache les noms résolus exactement depuis la création du resolver."""
+        if self.cache is not None and self.resolved:
+            self.cache.save(self.namespace, self.resolved)
+            self.resolved = {}
@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
 if TYPE_CHECKING:
@@ -7,6 +8,10 @@ if TYPE_CHECKING:
 
 class GO_PokemonLearnset(SQLModel, table=True):
     __tablename__ = "go_pokemon_learnsets"
+    # Une seule ligne par attaque et catégorie : cible des upserts (ON CONFLICT)
+    __table_args__ = (
+        Index("uq_go_pokemon_learnsets_move", "pokemon_id", "move_id", "is_fast", "is_charged", unique=True),
+    )
     
     # COLUMNS
     id: int | None = Field(default=None, primary_key=True)
@@ -1,6 +1,8 @@
 from .ability import Ability
 from .evolution import Evolution
 from .game import Game
+from .import_checkpoint import ImportCheckpoint
+from .ingestion_manifest import IngestionManifest
 from .machine import Machine
 from .move import Move
 from .pokedex_number import PokedexNumber
@@ -25,6 +27,8 @@ __all_tables__ = [
     'Ability',
     'Evolution',
     'Game',
+    'ImportCheckpoint',
+    'IngestionManifest',
     'Machine',
     'Move',
     'PokedexNumber',
@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+class ImportCheckpoint(SQLModel, table=True):
+    __tablename__ = "import_checkpoints"
+    
+    # COLUMNS
+    importer: str = Field(primary_key=True, max_length=50)
+    endpoint: str = Field(max_length=50)
+    offset: int = Field(default=0)
+    last_id: int | None = None
+    updated_at: datetime
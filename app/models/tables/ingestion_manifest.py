@@ -0,0 +1,11 @@
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+class IngestionManifest(SQLModel, table=True):
+    __tablename__ = "ingestion_manifest"
+    
+    # COLUMNS
+    endpoint: str = Field(primary_key=True, max_length=50)
+    resource_id: int = Field(primary_key=True)
+    content_hash: str = Field(max_length=64)
+    fetched_at: datetime
@@ -0,0 +1 @@
+# Commandes scrapy du projet (COMMANDS_MODULE)
@@ -0,0 +1,94 @@
+# Mesure le temps de parsing des callbacks des spiders sur des pages HTML sauvegardées
+#
+# Usage (depuis app/scrap/PKMNdb) :
+#   scrapy parsebench                       # fixtures de tests/scrap/fixtures
+#   scrapy parsebench chemin/des/pages -n 200
+#
+# Les pages sont nommées <page_kind>_<id>[_suffixe].html (ex: pokemon_1_rendered.html) : chaque
+# page est passée aux callbacks des spiders de ce page_kind, une nouvelle réponse par itération
+# pour inclure la construction de l'arbre lxml.
+
+import logging
+import re
+import time
+from pathlib import Path
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from scrapy.http import HtmlResponse, Request
+
+FIXTURES_DIR = Path(__file__).resolve().parents[5] / "tests" / "scrap" / "fixtures"
+ITERATIONS = 100
+FIXTURE_NAME = re.compile(r"(?P<kind>[a-z]+)_(?P<id>\d+)")
+
+
+def fixture_pages(folder):
+    """Pages (page_kind, id, chemin) d'un dossier de fixtures."""
+    for path in sorted(Path(folder).glob("*.html")):
+        match = FIXTURE_NAME.match(path.stem)
+        if match:
+            yield match["kind"], int(match["id"]), path
+
+
+def bench_callback(callback, url, body, meta, iterations):
+    """Temps moyen en secondes d'un appel du callback sur la page, réponse comprise."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = HtmlResponse(url, body=body, encoding="utf-8", request=Request(url, meta=dict(meta)))
+        for _ in callback(response):
+            pass
+    return (time.perf_counter() - started) / iterations
+
+
+def run(spider_classes, folder=FIXTURES_DIR, iterations=ITERATIONS):
+    """Mesure chaque callback de page des spiders sur chaque fixture de leur page_kind.
+
+    Returns:
+        Une liste de (callback, fixture, secondes par page)
+    """
+    results = []
+    for kind, page_id, path in fixture_pages(folder):
+        body = path.read_bytes()
+        for spidercls in spider_classes:
+            if getattr(spidercls, "page_kind", None) != kind:
+                continue
+            spider = spidercls()
+            # Les logs par item fausseraient la mesure
+            logging.getLogger(spider.name).setLevel(logging.WARNING)
+            request = spider.id_request(page_id)
+            # 'splash' : une page sans données structurées est parsée par parse_rendered
+            meta = {spider.id_key: page_id, "splash": {}}
+            for callback in (request.callback, spider.parse_rendered):
+                seconds = bench_callback(callback, request.url, body, meta, iterations)
+                results.append((f"{spider.name}.{callback.__name__}", path.name, seconds))
+    return results
+
+
+class Command(ScrapyCommand):
+
+    requires_project = True
+    default_settings = {"LOG_ENABLED": False}
+
+    def syntax(self):
+        return "[options] [fixtures_dir]"
+
+    def short_desc(self):
+        return "Benchmark the parse callbacks of the spiders on saved HTML pages"
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument("-n", "--iterations", type=int, default=ITERATIONS,
+                            help=f"parses per callback and page (default: {ITERATIONS})")
+
+    def run(self, args, opts):
+        if len(args) > 1:
+            raise UsageError()
+        folder = Path(args[0]) if args else FIXTURES_DIR
+        loader = self.crawler_process.spider_loader
+        spider_classes = [loader.load(name) for name in loader.list()]
+
+        results = run(spider_classes, folder, opts.iterations)
+        if not results:
+            raise UsageError(f"No <page_kind>_<id>.html page in {folder}")
+        width = max(len(callback) for callback, _, _ in results)
+        for callback, fixture, seconds in results:
+            print(f"{callback:<{width}}  {fixture:<30}  {seconds * 1000:8.3f} ms/page  {1 / seconds:10.0f} pages/s")
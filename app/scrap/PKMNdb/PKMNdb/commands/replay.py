@@ -0,0 +1,40 @@
+# Rejoue un spider sur les réponses du cache HTTP, sans téléchargement
+#
+# Usage (depuis app/scrap/PKMNdb) :
+#   scrapy replay pokemons
+#
+# Les requêtes du spider sont servies par le cache (HTTPCACHE_IGNORE_MISSING : une requête
+# absente du cache est ignorée, jamais téléchargée) et ses callbacks reçoivent les réponses sans
+# délai ni limitation de débit. Les items passent par les ITEM_PIPELINES habituels : après une
+# correction de parsing, la base GO se reconstruit sans refaire le crawl.
+
+from scrapy.commands.crawl import Command as CrawlCommand
+
+# Réglages du rejeu, prioritaires sur ceux du projet et des spiders
+REPLAY_SETTINGS = {
+    'HTTPCACHE_ENABLED': True,
+    'HTTPCACHE_IGNORE_MISSING': True,
+    'HTTPCACHE_POLICY': 'scrapy.extensions.httpcache.DummyPolicy',
+    'HTTPCACHE_EXPIRATION_SECS': 0,
+    'GO_HTTPCACHE_EXPIRATION': {},
+    'DOWNLOAD_DELAY': 0,
+    'RANDOMIZE_DOWNLOAD_DELAY': False,
+    'AUTOTHROTTLE_ENABLED': False,
+    'CONCURRENT_REQUESTS': 64,
+    'CONCURRENT_REQUESTS_PER_DOMAIN': 64,
+    'RETRY_ENABLED': False,
+    'ROBOTSTXT_OBEY': False,
+}
+
+
+class Command(CrawlCommand):
+
+    def short_desc(self):
+        return "Replay a spider on the responses of the HTTP cache, without downloading"
+
+    def process_options(self, args, opts):
+        super().process_options(args, opts)
+        # Les -s de la ligne de commande restent prioritaires
+        for name, value in REPLAY_SETTINGS.items():
+            if self.settings.getpriority(name) is None or self.settings.getpriority(name) < 40:
+                self.settings.set(name, value, priority='cmdline')
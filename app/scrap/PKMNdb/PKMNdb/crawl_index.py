@@ -0,0 +1,127 @@
+# Découverte des IDs à crawler sur db.pokemongohub.net
+#
+# Au lieu de sonder tous les IDs de 1 à max_id, les spiders GO lisent les IDs existants dans le
+# sitemap du site et dans l'ensemble des IDs connus, sauvegardé d'un crawl à l'autre. Seuls ces
+# IDs sont demandés, plus une petite fenêtre de sondage après le plus grand ID connu pour
+# trouver les nouveautés absentes du sitemap.
+
+import json
+import os
+import re
+from pathlib import Path
+import scrapy
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.sitemap import Sitemap
+
+SITEMAP_URL = "https://db.pokemongohub.net/sitemap.xml"
+# Nombre d'IDs demandés après le plus grand ID connu
+PROBE_WINDOW = 20
+# Dossier des ensembles d'IDs connus, relatif au projet scrapy comme HTTPCACHE_DIR
+KNOWN_IDS_DIR = "known_ids"
+
+
+class KnownIds:
+    """Ensemble des IDs existants d'un type de page, sauvegardé en JSON."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.ids = self._load()
+        self.missing = set()
+
+    def _load(self):
+        try:
+            return set(json.loads(self.path.read_text()))
+        except (FileNotFoundError, ValueError):
+            return set()
+
+    def add(self, page_id):
+        self.ids.add(page_id)
+        self.missing.discard(page_id)
+
+    def discard(self, page_id):
+        self.ids.discard(page_id)
+        self.missing.add(page_id)
+
+    def max(self):
+        return max(self.ids, default=0)
+
+    def save(self):
+        """Fusionne avec le fichier, qu'un autre spider a pu mettre à jour, puis l'écrit atomiquement."""
+        ids = (self._load() | self.ids) - self.missing
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(sorted(ids)))
+        os.replace(tmp_path, self.path)
+        self.ids = ids
+
+
+class IndexedCrawlMixin:
+    """Planification des pages d'un spider GO depuis le sitemap et les IDs connus.
+
+    Le spider définit page_kind (segment d'URL des pages, ex: "pokemon"), max_id et
+    id_request(page_id). Sans sitemap ni ID connu, tous les IDs de 1 à max_id sont sondés comme
+    auparavant."""
+
+    page_kind = None
+    sitemap_url = SITEMAP_URL
+
+    def _setting(self, name, default):
+        settings = getattr(self, 'settings', None)
+        return settings.get(name, default) if settings is not None else default
+
+    def start_requests(self):
+        self.known_ids = KnownIds(Path(self._setting('GO_KNOWN_IDS_DIR', KNOWN_IDS_DIR)) / f"{self.page_kind}.json")
+        self.probe_window = int(self._setting('GO_PROBE_WINDOW', PROBE_WINDOW))
+        self.scheduled = set()
+
+        self.logger.info(f"{len(self.known_ids.ids)} known {self.page_kind} IDs, reading {self.sitemap_url}")
+        yield from self.schedule(self.known_ids.ids)
+        yield scrapy.Request(self.sitemap_url, self.parse_index, errback=self.index_error, dont_filter=True)
+
+    def parse_index(self, response):
+        """Lit les IDs d'un sitemap, ou suit les sitemaps d'un index de sitemaps."""
+        sitemap = Sitemap(response.body)
+        if sitemap.type == 'sitemapindex':
+            for entry in sitemap:
+                yield scrapy.Request(entry['loc'], self.parse_index, errback=self.index_error, dont_filter=True)
+            return
+
+        pattern = re.compile(rf"/{self.page_kind}/(\d+)(?:[/?#-]|$)")
+        discovered = {int(match.group(1)) for entry in sitemap if (match := pattern.search(entry['loc']))}
+        for page_id in discovered:
+            self.known_ids.add(page_id)
+        self.logger.info(f"{len(discovered)} {self.page_kind} IDs found in {response.url}")
+        yield from self.schedule(discovered)
+
+    def index_error(self, failure):
+        """Sans sitemap, les IDs connus suffisent, sinon tous les IDs sont sondés."""
+        self.logger.warning(f"Sitemap {failure.request.url} unavailable: {failure.value}")
+        if not self.known_ids.ids:
+            yield from self.schedule(range(1, int(self.max_id) + 1), probe=False)
+
+    def schedule(self, ids, probe=True):
+        """Requêtes des IDs pas encore demandés, plus la fenêtre de sondage après le plus grand ID."""
+        highest = max(self.known_ids.max(), max(ids, default=0))
+        # Pas de sondage tant qu'aucun ID n'est connu : le sitemap ou le repli s'en chargent
+        probes = range(highest + 1, highest + self.probe_window + 1) if probe and highest else ()
+        for page_id in sorted({*ids, *probes} - self.scheduled):
+            self.scheduled.add(page_id)
+            yield self.id_request(page_id)
+
+    def page_found(self, page_id):
+        # known_ids n'existe qu'une fois start_requests appelé
+        if page_id is not None and hasattr(self, 'known_ids'):
+            self.known_ids.add(int(page_id))
+
+    def page_missing(self, failure):
+        """Retire des IDs connus une page qui n'existe plus (404)."""
+        if failure.check(HttpError) and failure.value.response.status == 404:
+            page_id = failure.request.meta.get(self.id_key)
+            if page_id is not None and hasattr(self, 'known_ids'):
+                self.known_ids.discard(int(page_id))
+
+    def save_known_ids(self):
+        known_ids = getattr(self, 'known_ids', None)
+        if known_ids is not None:
+            known_ids.save()
+            self.logger.info(f"{len(known_ids.ids)} known {self.page_kind} IDs saved to {known_ids.path}")
@@ -0,0 +1,145 @@
+# Stockage du cache HTTP de Scrapy dans un seul fichier SQLite
+#
+# Remplace SplashAwareFSCacheStorage, qui écrit un dossier de fichiers non compressés par page :
+# les corps des réponses sont compressés (zstd si disponible, sinon zlib) et stockés une seule
+# fois par contenu (hash SHA-256), quel que soit le nombre de requêtes qui les ont renvoyés.
+
+import hashlib
+import logging
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+try:
+    import zstandard
+except ImportError:  # zstandard est optionnel : zlib sinon
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Fichier du cache, dans HTTPCACHE_DIR
+HTTPCACHE_FILE = "httpcache.db"
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS bodies (hash TEXT PRIMARY KEY, codec TEXT NOT NULL, data BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS responses ("
+    "spider TEXT NOT NULL, fingerprint TEXT NOT NULL, url TEXT NOT NULL, status INTEGER NOT NULL, "
+    "response_url TEXT NOT NULL, headers BLOB NOT NULL, body_hash TEXT NOT NULL REFERENCES bodies (hash), "
+    "timestamp REAL NOT NULL, PRIMARY KEY (spider, fingerprint))",
+    "CREATE INDEX IF NOT EXISTS ix_responses_body_hash ON responses (body_hash)",
+)
+
+
+def compress(body):
+    """Compresse un corps de réponse, retourne (codec, données)."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return "zlib", zlib.compress(body, ZLIB_LEVEL)
+
+
+def decompress(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise LookupError("zstandard is required to read zstd compressed cache entries")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class SQLiteCacheStorage:
+    """Stockage HTTPCACHE_STORAGE : réponses dans un fichier SQLite, corps compressés et dédupliqués.
+
+    Les clés sont les empreintes du request_fingerprinter du crawler, celui de scrapy-splash
+    (REQUEST_FINGERPRINTER_CLASS) : une requête Splash et la requête directe de la même URL ne
+    partagent pas leur entrée. La durée de validité est HTTPCACHE_EXPIRATION_SECS, ou
+    celle du spider dans GO_HTTPCACHE_EXPIRATION ({nom du spider: secondes}) ; 0 pour ne jamais
+    expirer."""
+
+    def __init__(self, settings):
+        self.path = Path(data_path(settings["HTTPCACHE_DIR"])) / settings.get("GO_HTTPCACHE_FILE", HTTPCACHE_FILE)
+        self.default_expiration = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.expirations = settings.getdict("GO_HTTPCACHE_EXPIRATION")
+        self.connection = None
+
+    def open_spider(self, spider):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Plusieurs spiders peuvent partager le fichier : WAL et attente des verrous
+        self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.expiration_secs = int(self.expirations.get(spider.name, self.default_expiration))
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        logger.debug(f"Using SQLite cache storage in {self.path}", extra={"spider": spider})
+
+    def close_spider(self, spider):
+        purged = self.purge(spider.name)
+        if purged:
+            logger.info(f"{purged} expired cache entries purged", extra={"spider": spider})
+        self.connection.close()
+        self.connection = None
+
+    def _fingerprint(self, request):
+        return self._fingerprinter.fingerprint(request).hex()
+
+    def retrieve_response(self, spider, request):
+        """Réponse en cache de la requête, None si absente ou expirée."""
+        row = self.connection.execute(
+            "SELECT r.status, r.response_url, r.headers, r.timestamp, b.codec, b.data "
+            "FROM responses r JOIN bodies b ON b.hash = r.body_hash WHERE r.spider = ? AND r.fingerprint = ?",
+            (spider.name, self._fingerprint(request)),
+        ).fetchone()
+        if row is None:
+            return None
+        status, url, raw_headers, timestamp, codec, data = row
+        if 0 < self.expiration_secs < time.time() - timestamp:
+            return None
+
+        try:
+            body = decompress(codec, data)
+        except LookupError as e:
+            logger.warning(f"Cache entry of {request.url} ignored: {e}")
+            return None
+        headers = Headers(headers_raw_to_dict(raw_headers))
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        """Enregistre la réponse, son corps n'étant écrit que s'il n'est pas déjà en cache."""
+        body_hash = hashlib.sha256(response.body).hexdigest()
+        with self.connection:
+            self.connection.execute("BEGIN")
+            if self.connection.execute("SELECT 1 FROM bodies WHERE hash = ?", (body_hash,)).fetchone() is None:
+                self.connection.execute("INSERT OR IGNORE INTO bodies (hash, codec, data) VALUES (?, ?, ?)",
+                                        (body_hash, *compress(response.body)))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(spider, fingerprint, url, status, response_url, headers, body_hash, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (spider.name, self._fingerprint(request), request.url, response.status, response.url,
+                 headers_dict_to_raw(response.headers), body_hash, time.time()),
+            )
+
+    def purge(self, spider_name=None):
+        """Supprime les réponses expirées, puis les corps qui ne sont plus référencés.
+
+        Returns:
+            Le nombre de réponses supprimées
+        """
+        expiration = int(self.expirations.get(spider_name, self.default_expiration))
+        if expiration <= 0:
+            return 0
+        with self.connection:
+            self.connection.execute("BEGIN")
+            deleted = self.connection.execute(
+                "DELETE FROM responses WHERE timestamp < ? AND (? IS NULL OR spider = ?)",
+                (time.time() - expiration, spider_name, spider_name),
+            ).rowcount
+            self.connection.execute("DELETE FROM bodies WHERE hash NOT IN (SELECT body_hash FROM responses)")
+        return deleted
@@ -52,3 +52,6 @@ class MoveItem(scrapy.Item):
     pvp_dps = scrapy.Field()  # PVP damage per second
     pvp_dpe = scrapy.Field()  # PVP damage per energy
     pvp_effects = scrapy.Field()  # Special effects in PVP
+
+    # Pokémon that can learn the move (rendered pages only)
+    pokemon_with_move = scrapy.Field()
@@ -0,0 +1,99 @@
+# Parsing des pages rendues de db.pokemongohub.net en une passe
+#
+# Chaque sélecteur 'tr:contains("...")' était traduit en XPath puis évalué sur tout le document.
+# Les lignes des tableaux sont maintenant parcourues une seule fois pour construire une table
+# libellé → ligne, et les expressions XPath sont compilées une fois, au chargement du module.
+
+from lxml import etree
+
+TITLE = etree.XPath('//h1[contains(concat(" ", normalize-space(@class), " "), " Card_cardTitle__URr_A ")]/text()')
+ROW_TEXT = etree.XPath('string(.)')
+CELL_TEXT = etree.XPath('td/text()')
+CELL_STRONG = etree.XPath('td//strong/text()')
+CELL_SPAN = etree.XPath('td//span/text()')
+SECTIONS = etree.XPath('//section')
+IMAGE_TITLE = etree.XPath('//figure//img/@title')
+MOVE_NAMES = etree.XPath('//h3[contains(., $title)]/following-sibling::*[1][self::ul]//li//summary//strong/text()')
+EFFECTS = etree.XPath('following-sibling::section[1]/header[contains(text(), "Effects")]/following-sibling::text()')
+POKEMON_LIST = etree.XPath('//ul[contains(concat(" ", normalize-space(@class), " "), " MoveInfo_pokemonList__ZJB1N ")]//li//a/text()')
+
+
+def _first(values):
+    return str(values[0]) if values else None
+
+
+class PageTables:
+    """Lignes des tableaux d'une page (ou d'une section), indexées par libellé."""
+
+    def __init__(self, root):
+        """
+        Args:
+            root: Élément lxml de la page (response.selector.root) ou d'une section
+        """
+        self.root = root
+        self.labels = {}
+        self.rows = []
+        for row in root.iter('tr'):
+            th = row.find('th')
+            if th is not None:
+                self.labels.setdefault(' '.join(''.join(th.itertext()).split()), row)
+            self.rows.append(row)
+        self._texts = None
+        self._sections = None
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response.selector.root)
+
+    def row(self, label):
+        """Ligne du libellé, sinon la première ligne qui le contient (comme tr:contains)."""
+        row = self.labels.get(label)
+        if row is None:
+            # Texte complet des lignes, calculé au premier libellé introuvable
+            if self._texts is None:
+                self._texts = [(ROW_TEXT(row), row) for row in self.rows]
+            row = next((row for text, row in self._texts if label in text), None)
+        return row
+
+    def text(self, label):
+        """Équivalent de tr:contains(label) td::text"""
+        row = self.row(label)
+        return _first(CELL_TEXT(row)) if row is not None else None
+
+    def strong(self, label):
+        """Équivalent de tr:contains(label) td strong::text"""
+        row = self.row(label)
+        return _first(CELL_STRONG(row)) if row is not None else None
+
+    def span(self, label):
+        """Équivalent de tr:contains(label) td span::text"""
+        row = self.row(label)
+        return _first(CELL_SPAN(row)) if row is not None else None
+
+    def section(self, title):
+        """Tableaux de la première section contenant title (comme section:contains), vides sinon."""
+        if self._sections is None:
+            self._sections = {}
+            self._section_texts = [(ROW_TEXT(section), section) for section in SECTIONS(self.root)]
+        if title not in self._sections:
+            section = next((section for text, section in self._section_texts if title in text), None)
+            self._sections[title] = PageTables(section) if section is not None else PageTables(etree.Element('section'))
+        return self._sections[title]
+
+    @property
+    def title(self):
+        return _first(TITLE(self.root))
+
+    def image_title(self):
+        return _first(IMAGE_TITLE(self.root))
+
+    def move_names(self, heading):
+        """Noms des attaques de la liste qui suit le titre h3 heading."""
+        return [str(name) for name in MOVE_NAMES(self.root, title=heading)]
+
+    def effects(self):
+        """Texte des effets JcJ, dans la section qui suit celle-ci."""
+        return _first(EFFECTS(self.root))
+
+    def pokemon_list(self):
+        return [str(name) for name in POKEMON_LIST(self.root)]
@@ -20,7 +20,15 @@ from app.models.GO_tables.GO_pokemon_stats import GO_PokemonStats
 from app.models.GO_tables.GO_move import GO_Move
 from app.models.GO_tables.GO_pokemon_learnset import GO_PokemonLearnset
 from app.db.engine import engine
+from app.db.name_resolver import NameResolver
 import sqlite3
+import time
+
+# Taille maximale d'un lot d'items, et délai maximal en secondes avant son écriture
+FLUSH_SIZE = 100
+FLUSH_INTERVAL = 30.0
+# Score minimal pour rattacher un nom d'attaque ou de type à un nom connu légèrement différent
+MATCH_THRESHOLD = 0.9
 
 
 class CleanDataPipeline:
@@ -49,155 +57,234 @@ class BaseDatabasePipeline:
     def _get_session(self):
         return engine.connect("PKMNGO.db")
 
+    def _ensure_constraints(self):
+        """Crée les index uniques ciblés par les upserts si la base existait avant eux."""
+        from app.db.PKMNGOdb_local_build import go_db
+
+        with self._get_session() as session:
+            go_db.ensure_constraints(session.get_bind())
+
 
 class PokemonDatabasePipeline(BaseDatabasePipeline):
-    """Pipeline spécifique pour les données de Pokémon"""
-    def __init__(self):
+    """Pipeline spécifique pour les données de Pokémon.
+
+    Les items sont accumulés puis écrits par lots : les correspondances nom → id des Pokémon et
+    des attaques sont chargées une fois à l'ouverture, si bien qu'un item ne coûte plus aucune
+    requête de recherche. Les attaques et les learnsets sont écrits en INSERT ... ON CONFLICT sur
+    leurs contraintes d'unicité : un lot rejoué ou écrit en même temps par un autre spider ne
+    crée pas de doublon. Une attaque dont le nom diffère à peine d'une attaque connue (tiret,
+    casse, astérisque) lui est rattachée plutôt que créée en double."""
+
+    def __init__(self, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL, match_threshold=MATCH_THRESHOLD):
         super().__init__()
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.match_threshold = match_threshold
         self.processed_pokemon = 0
         self.processed_learnsets = 0
-        
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        # Correspondances chargées dans open_spider puis tenues à jour à chaque lot
+        self.pokemon_ids = {}
+        self.move_ids = {}
+        self.move_names = NameResolver((), threshold=match_threshold)
+        self.pokemon_with_stats = set()
+        self.learnsets = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            flush_size=crawler.settings.getint("GO_DB_FLUSH_SIZE", FLUSH_SIZE),
+            flush_interval=crawler.settings.getfloat("GO_DB_FLUSH_INTERVAL", FLUSH_INTERVAL),
+            match_threshold=crawler.settings.getfloat("GO_NAME_MATCH_THRESHOLD", MATCH_THRESHOLD),
+        )
+
+    def open_spider(self, spider):
+        self._ensure_constraints()
+        self._load_ids(spider)
+
+    def _load_ids(self, spider):
+        """Charge les correspondances nom → id et les lignes déjà présentes."""
+        from sqlmodel import select
+
+        with self._get_session() as session:
+            self.pokemon_ids = dict(session.exec(select(GO_Pokemon.name, GO_Pokemon.id)).all())
+            self.move_ids = dict(session.exec(select(GO_Move.name, GO_Move.id)).all())
+            self.move_names = NameResolver(((move_id, name) for name, move_id in self.move_ids.items()),
+                                           threshold=self.match_threshold)
+            self.pokemon_with_stats = set(session.exec(select(GO_PokemonStats.pokemon_id)).all())
+            self.learnsets = set(session.exec(select(
+                GO_PokemonLearnset.pokemon_id, GO_PokemonLearnset.move_id, GO_PokemonLearnset.is_fast, GO_PokemonLearnset.is_charged
+            )).all())
+        spider.logger.info(f"Pokemon pipeline - {len(self.pokemon_ids)} Pokemon et {len(self.move_ids)} attaques connus")
+        self.last_flush = time.monotonic()
+
     def process_item(self, item, spider):
         if not isinstance(item, PokemonItem):
             return item
-            
-        self._process_pokemon_item(item, spider)
+
+        if not item.get('name'):
+            spider.logger.warning(f"Pokemon has no name. Skipping.")
+            return item
+
+        self.buffer.append(dict(item))
+        if len(self.buffer) >= self.flush_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self._flush(spider)
         return item
-    
+
     def close_spider(self, spider):
+        self._flush(spider)
         spider.logger.info(f"Pokemon pipeline - Processed: {self.processed_pokemon} Pokemon, {self.processed_learnsets} Learnsets")
         super().close_spider(spider)
-    
-    def _process_pokemon_item(self, item, spider):
-        with self._get_session() as session:
-            try:
-                # Convert item to dict
-                item_dict = dict(item)
-                
-                # Check if this Pokemon already exists
-                pokemon_id = item_dict.get('id')
-                name = item_dict.get('name')
-                
-                if not name:
-                    spider.logger.warning(f"Pokemon has no name. Skipping.")
-                    return
-                
-                existing_pokemon = session.query(GO_Pokemon).filter(
-                    GO_Pokemon.name == name
-                ).first()
-                
-                if existing_pokemon:
-                    # Update existing record
-                    existing_pokemon.pokedex_number = item_dict.get('pokedex_number', existing_pokemon.pokedex_number)
-                    existing_pokemon.buddy_distance = item_dict.get('buddy_distance', existing_pokemon.buddy_distance)
-                    existing_pokemon.released = item_dict.get('released', existing_pokemon.released)
-                    
-                    # Update stats
-                    if hasattr(existing_pokemon, 'stats') and existing_pokemon.stats:
-                        existing_pokemon.stats.max_cp = item_dict.get('max_cp', existing_pokemon.stats.max_cp)
-                        existing_pokemon.stats.attack = item_dict.get('attack', existing_pokemon.stats.attack)
-                        existing_pokemon.stats.defense = item_dict.get('defense', existing_pokemon.stats.defense)
-                        existing_pokemon.stats.stamina = item_dict.get('stamina', existing_pokemon.stats.stamina)
-                    else:
-                        # Create stats if they don't exist
-                        stats = GO_PokemonStats(
-                            pokemon_id=existing_pokemon.id,
-                            max_cp=item_dict.get('max_cp'),
-                            attack=item_dict.get('attack'),
-                            defense=item_dict.get('defense'),
-                            stamina=item_dict.get('stamina')
-                        )
-                        session.add(stats)
-                    
-                    pokemon = existing_pokemon
-                    spider.logger.info(f"Updated Pokemon: {pokemon.name} (#{pokemon.pokedex_number})")
+
+    @staticmethod
+    def _item_moves(item_dict):
+        """Attaques d'un item : (nom, is_fast, is_charged, is_elite), une chaîne ou un dict par attaque."""
+        for key, is_fast in (('fast_moves', True), ('charged_moves', False)):
+            for move_data in item_dict.get(key) or []:
+                if isinstance(move_data, dict):
+                    yield move_data['name'], is_fast, not is_fast, move_data.get('is_elite', False)
                 else:
-                    # Create new Pokemon
-                    pokemon = GO_Pokemon(
+                    yield move_data, is_fast, not is_fast, False
+
+    def _flush(self, spider):
+        """Écrit les items accumulés en un lot : quelques requêtes groupées par table."""
+        items, self.buffer = self.buffer, []
+        self.last_flush = time.monotonic()
+        if items:
+            self._write_batch(items, spider)
+
+    def _write_batch(self, items, spider):
+        """Écrit un lot ; en cas d'échec, le rejoue item par item pour n'écarter que les items en erreur."""
+        try:
+            self._write(items, spider)
+        except Exception as e:
+            # Les correspondances ne sont plus sûres après un rollback : les recharger
+            self._load_ids(spider)
+            if len(items) == 1:
+                spider.logger.error(f"Error writing Pokemon item {items[0]['name']}: {e}")
+                return
+            spider.logger.warning(f"Error writing a batch of {len(items)} Pokemon items, retrying them one by one: {e}")
+            for item_dict in items:
+                self._write_batch([item_dict], spider)
+
+    def _write(self, items, spider):
+        from sqlalchemy import select, update
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        with self._get_session() as session:
+            # Créer en une fois les Pokémon et les attaques inconnus (attaques provisoires,
+            # complétées quand elles sont scrapées, ignorées si un autre spider les a créées)
+            new_pokemon = {}
+            new_moves = {}
+            # Noms d'attaques du lot rattachés à une attaque créée dans ce même lot
+            aliases = {}
+            batch_moves = NameResolver((), threshold=self.match_threshold)
+            for item_dict in items:
+                name = item_dict['name']
+                if name not in self.pokemon_ids and name not in new_pokemon:
+                    new_pokemon[name] = GO_Pokemon(
                         name=name,
                         pokedex_number=item_dict.get('pokedex_number'),
                         released=item_dict.get('released', True),
                         buddy_distance=item_dict.get('buddy_distance')
                     )
-                    session.add(pokemon)
-                    session.flush()  # Flush to get the generated ID
-                    
-                    # Create stats
-                    stats = GO_PokemonStats(
-                        pokemon_id=pokemon.id,
-                        max_cp=item_dict.get('max_cp'),
-                        attack=item_dict.get('attack'),
-                        defense=item_dict.get('defense'),
-                        stamina=item_dict.get('stamina')
+                for move_name, is_fast, is_charged, _ in self._item_moves(item_dict):
+                    if move_name in self.move_ids or move_name in new_moves or move_name in aliases:
+                        continue
+                    match = self.move_names.resolve(move_name)
+                    if match:
+                        spider.logger.info(f"Move '{move_name}' matched to '{match.name}' (score {match.score})")
+                        self.move_ids[move_name] = match.id
+                    elif (match := batch_moves.resolve(move_name)):
+                        aliases[move_name] = match.name
+                    else:
+                        new_moves[move_name] = {'name': move_name, 'is_fast': is_fast, 'is_charged': is_charged}
+                        batch_moves.add(len(new_moves), move_name)
+            session.add_all(new_pokemon.values())
+            session.flush()  # Flush to get the generated IDs
+            created = set(new_pokemon)
+            self.pokemon_ids.update((name, pokemon.id) for name, pokemon in new_pokemon.items())
+            if new_moves:
+                session.execute(sqlite_insert(GO_Move).on_conflict_do_nothing(index_elements=['name']),
+                                list(new_moves.values()))
+                created_moves = session.execute(
+                    select(GO_Move.name, GO_Move.id).where(GO_Move.name.in_(new_moves))
+                ).all()
+                self.move_ids.update(created_moves)
+                for name, move_id in created_moves:
+                    self.move_names.add(move_id, name)
+                self.move_ids.update((alias, self.move_ids[name]) for alias, name in aliases.items())
+            if new_moves:
+                spider.logger.info(f"Created {len(new_moves)} placeholder moves")
+
+            added = set()
+            pokemon_updates = {}
+            stats_updates = {}
+            new_stats = {}
+            learnsets = []
+            for item_dict in items:
+                name = item_dict['name']
+                pokemon_id = self.pokemon_ids[name]
+
+                # Mettre à jour les Pokémon existants avec les champs présents dans l'item
+                if name not in created or name in added:
+                    pokemon_updates.setdefault(pokemon_id, {'id': pokemon_id}).update(
+                        (key, item_dict[key]) for key in ('pokedex_number', 'buddy_distance', 'released') if key in item_dict
                     )
-                    session.add(stats)
-                    spider.logger.info(f"Added new Pokemon: {pokemon.name} (#{pokemon.pokedex_number})")
-                
-                # Process moves (if we have a pokemon ID now)
-                if pokemon.id:
-                    # Process fast moves
-                    fast_moves = item_dict.get('fast_moves', [])
-                    for move_data in fast_moves:
-                        self._add_pokemon_move(pokemon.id, move_data, is_fast=True, is_charged=False, spider=spider, session=session)
-                    
-                    # Process charged moves
-                    charged_moves = item_dict.get('charged_moves', [])
-                    for move_data in charged_moves:
-                        self._add_pokemon_move(pokemon.id, move_data, is_fast=False, is_charged=True, spider=spider, session=session)
-                
-                self.processed_pokemon += 1
-                
-            except Exception as e:
-                spider.logger.error(f"Error processing Pokemon item: {e}")
-                raise
-            
-    def _add_pokemon_move(self, pokemon_id, move_data, is_fast, is_charged, spider, session):
-        try:
-            # Extract move name from move data (either string or dict)
-            move_name = move_data['name'] if isinstance(move_data, dict) else move_data
-            is_elite = move_data.get('is_elite', False) if isinstance(move_data, dict) else False
-            
-            # Find the move
-            move = session.query(GO_Move).filter(GO_Move.name == move_name).first()
-            
-            if not move:
-                # Create a placeholder move if it doesn't exist yet
-                move = GO_Move(
-                    name=move_name,
-                    is_fast=is_fast,
-                    is_charged=is_charged,
-                    type_id=None  # Will be updated when the move is properly scraped
-                )
-                session.add(move)
-                session.flush()
-                spider.logger.info(f"Created placeholder move: {move_name}")
-            
-            # Check if the learnset relation already exists
-            existing_learnset = session.query(GO_PokemonLearnset).filter(
-                GO_PokemonLearnset.pokemon_id == pokemon_id,
-                GO_PokemonLearnset.move_id == move.id
-            ).first()
-            
-            if not existing_learnset:
-                # Create the learnset relation
-                learnset = GO_PokemonLearnset(
-                    pokemon_id=pokemon_id,
-                    move_id=move.id,
-                    move_name=move_name,
-                    is_fast=is_fast,
-                    is_charged=is_charged,
-                    is_elite=is_elite
-                )
-                session.add(learnset)
-                self.processed_learnsets += 1
-                spider.logger.debug(f"Added learnset relation: Pokemon ID {pokemon_id} - Move {move_name}")
-        
-        except Exception as e:
-            spider.logger.error(f"Error adding Pokemon-Move relation: {e}")
-            raise
+                    spider.logger.info(f"Updated Pokemon: {name} (#{item_dict.get('pokedex_number')})")
+                else:
+                    added.add(name)
+                    spider.logger.info(f"Added new Pokemon: {name} (#{item_dict.get('pokedex_number')})")
 
+                stats = {key: item_dict.get(key) for key in ('max_cp', 'attack', 'defense', 'stamina')}
+                if pokemon_id in self.pokemon_with_stats and pokemon_id not in new_stats:
+                    stats_updates.setdefault(pokemon_id, {'pokemon_id': pokemon_id}).update(
+                        (key, value) for key, value in stats.items() if key in item_dict
+                    )
+                else:
+                    new_stats[pokemon_id] = {'pokemon_id': pokemon_id, **stats}
+
+                for move_name, is_fast, is_charged, is_elite in self._item_moves(item_dict):
+                    move_id = self.move_ids[move_name]
+                    key = (pokemon_id, move_id, is_fast, is_charged)
+                    if key in self.learnsets:
+                        continue
+                    self.learnsets.add(key)
+                    learnsets.append({
+                        'pokemon_id': pokemon_id, 'move_id': move_id, 'move_name': move_name,
+                        'is_fast': is_fast, 'is_charged': is_charged, 'is_elite': is_elite,
+                    })
+
+            # Une requête groupée (executemany) par table
+            if pokemon_updates:
+                session.execute(update(GO_Pokemon), list(pokemon_updates.values()))
+            if stats_updates:
+                session.execute(update(GO_PokemonStats), list(stats_updates.values()))
+            if new_stats:
+                statement = sqlite_insert(GO_PokemonStats)
+                session.execute(statement.on_conflict_do_update(
+                    index_elements=['pokemon_id'],
+                    set_={key: statement.excluded[key] for key in ('max_cp', 'attack', 'defense', 'stamina')},
+                ), list(new_stats.values()))
+            if learnsets:
+                session.execute(sqlite_insert(GO_PokemonLearnset).on_conflict_do_nothing(
+                    index_elements=['pokemon_id', 'move_id', 'is_fast', 'is_charged']
+                ), learnsets)
+
+        self.pokemon_with_stats.update(new_stats)
+        self.processed_pokemon += len(items)
+        self.processed_learnsets += len(learnsets)
+        spider.logger.info(f"Pokemon pipeline - Lot de {len(items)} Pokemon écrit")
+
+
+class MoveDatabasePipeline(BaseDatabasePipeline):
+    """Pipeline spécifique pour les attaques.
+
+    Les attaques sont accumulées puis écrites par lots en un seul INSERT ... ON CONFLICT(name)
+    DO UPDATE, sans requête de recherche préalable : l'écriture est idempotente et sûre face aux
+    attaques provisoires créées en parallèle par le pipeline des Pokémon."""
 
-class MoveDatabasePipeline:
     # Mapping des types vers leurs IDs
     TYPE_ID_MAPPING = {
         "Normal": 1,
@@ -220,81 +307,107 @@ class MoveDatabasePipeline:
         "Fairy": 18
     }
     
-    def __init__(self):
+    # Résolution des noms de type (casse, espaces) vers TYPE_ID_MAPPING
+    TYPE_NAMES = NameResolver((type_id, name) for name, type_id in TYPE_ID_MAPPING.items())
+
+    # Colonnes mises à jour quand l'attaque existe déjà
+    UPDATE_COLUMNS = ('type_id', 'is_fast', 'is_charged', 'damage', 'energy', 'duration',
+                      'pvp_damage', 'pvp_energy', 'pvp_effects')
+
+    def __init__(self, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL, match_threshold=MATCH_THRESHOLD):
+        super().__init__()
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.match_threshold = match_threshold
         self.moves_count = 0
-    
+        self.buffer = {}
+        self.last_flush = time.monotonic()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            flush_size=crawler.settings.getint("GO_DB_FLUSH_SIZE", FLUSH_SIZE),
+            flush_interval=crawler.settings.getfloat("GO_DB_FLUSH_INTERVAL", FLUSH_INTERVAL),
+            match_threshold=crawler.settings.getfloat("GO_NAME_MATCH_THRESHOLD", MATCH_THRESHOLD),
+        )
+
     def open_spider(self, spider):
-        # Importer engine ici
-        from app.db.engine import engine
-        from app.models.GO_tables.GO_move import GO_Move
-        
         spider.logger.info("Ouverture du pipeline de base de données pour les moves")
-    
+        self.last_flush = time.monotonic()
+
     def close_spider(self, spider):
+        self._flush(spider)
         spider.logger.info(f"Fermeture du pipeline de base de données. Moves traités: {self.moves_count}")
-        
+
     def process_item(self, item, spider):
         if not isinstance(item, MoveItem):
             return item
-            
-        # Imports nécessaires
-        from app.db.engine import engine
-        from app.models.GO_tables.GO_move import GO_Move
-        from sqlmodel import select
-        
+
         adapter = ItemAdapter(item)
-                
+
         # Get type_id from type name
         move_type = adapter.get('type')
         type_id = self.TYPE_ID_MAPPING.get(move_type)
+        if type_id is None and move_type:
+            match = self.TYPE_NAMES.candidates(move_type, limit=1, threshold=self.match_threshold)
+            type_id = match[0].id if match else None
         if type_id is None and move_type:
             spider.logger.warning(f"Type inconnu trouvé: {move_type} pour {adapter.get('name')}")
-        
-        # Utiliser le context manager de Engine pour se connecter à la BDD
-        with engine.connect("PKMNGO.db") as session:
-            # Vérifier si le move existe déjà
-            existing_move = session.exec(
-                select(GO_Move).where(GO_Move.name == adapter.get('name'))
-            ).first()
-                
-                if existing_move:
-                # Update existing move
-                existing_move.type_id = type_id
-                existing_move.is_fast = adapter.get('is_fast')
-                existing_move.is_charged = adapter.get('is_charged')
-                
-                # Convert des stats numériques en string
-                existing_move.damage = str(adapter.get('power')) if adapter.get('power') is not None else None
-                existing_move.energy = str(adapter.get('energy')) if adapter.get('energy') is not None else None
-                existing_move.duration = str(adapter.get('animation_duration')) if adapter.get('animation_duration') is not None else None
-                
-                existing_move.pvp_damage = str(adapter.get('pvp_power')) if adapter.get('pvp_power') is not None else None
-                existing_move.pvp_energy = str(adapter.get('pvp_energy')) if adapter.get('pvp_energy') is not None else None
-                existing_move.pvp_effects = adapter.get('pvp_effects')
-                    
-                spider.logger.info(f"Updated move: {existing_move.name}")
-                else:
-                # Create new move
-                    move = GO_Move(
-                    name=adapter.get('name'),
-                    type_id=type_id,
-                    is_fast=adapter.get('is_fast'),
-                    is_charged=adapter.get('is_charged'),
-                    
-                    # Convert des stats numériques en string
-                    damage=str(adapter.get('power')) if adapter.get('power') is not None else None,
-                    energy=str(adapter.get('energy')) if adapter.get('energy') is not None else None,
-                    duration=str(adapter.get('animation_duration')) if adapter.get('animation_duration') is not None else None,
-                    
-                    pvp_damage=str(adapter.get('pvp_power')) if adapter.get('pvp_power') is not None else None,
-                    pvp_energy=str(adapter.get('pvp_energy')) if adapter.get('pvp_energy') is not None else None,
-                    pvp_effects=adapter.get('pvp_effects'),
-                    )
-                
-                    session.add(move)
-                spider.logger.info(f"Added new move: {move.name}")
-                
-            # Le commit est automatique à la sortie du with grâce au context manager
-            self.moves_count += 1
-                
+
+        # Une attaque scrapée deux fois dans le même lot : la dernière version l'emporte
+        self.buffer[adapter.get('name')] = self._move_row(adapter, type_id)
+        if len(self.buffer) >= self.flush_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self._flush(spider)
         return item
+
+    @staticmethod
+    def _move_row(adapter, type_id):
+        """Ligne go_moves d'un item, les stats numériques converties en string."""
+        def as_str(key):
+            return str(adapter.get(key)) if adapter.get(key) is not None else None
+
+        return {
+            'name': adapter.get('name'),
+            'type_id': type_id,
+            'is_fast': adapter.get('is_fast'),
+            'is_charged': adapter.get('is_charged'),
+            'damage': as_str('power'),
+            'energy': as_str('energy'),
+            'duration': as_str('animation_duration'),
+            'pvp_damage': as_str('pvp_power'),
+            'pvp_energy': as_str('pvp_energy'),
+            'pvp_effects': adapter.get('pvp_effects'),
+        }
+
+    def _flush(self, spider):
+        """Écrit les attaques accumulées en un upsert groupé (executemany)."""
+        rows, self.buffer = list(self.buffer.values()), {}
+        self.last_flush = time.monotonic()
+        if rows:
+            self._write_batch(rows, spider)
+
+    def _write_batch(self, rows, spider):
+        """Écrit un lot ; en cas d'échec, le rejoue attaque par attaque pour n'écarter que celles en erreur."""
+        try:
+            self._write(rows, spider)
+        except Exception as e:
+            if len(rows) == 1:
+                spider.logger.error(f"Error writing move {rows[0]['name']}: {e}")
+                return
+            spider.logger.warning(f"Error writing a batch of {len(rows)} moves, retrying them one by one: {e}")
+            for row in rows:
+                self._write_batch([row], spider)
+
+    def _write(self, rows, spider):
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        statement = sqlite_insert(GO_Move)
+        statement = statement.on_conflict_do_update(
+            index_elements=['name'],
+            set_={column: statement.excluded[column] for column in self.UPDATE_COLUMNS},
+        )
+        with self._get_session() as session:
+            session.execute(statement, rows)
+        # Le commit est automatique à la sortie du with grâce au context manager
+        self.moves_count += len(rows)
+        spider.logger.info(f"Move pipeline - Lot de {len(rows)} attaques écrit")
@@ -11,6 +11,7 @@ BOT_NAME = "PKMNdb"
 
 SPIDER_MODULES = ["PKMNdb.spiders"]
 NEWSPIDER_MODULE = "PKMNdb.spiders"
+COMMANDS_MODULE = "PKMNdb.commands"
 
 # Crawl responsibly by identifying yourself (and your website) on the user-agent
 USER_AGENT = "PKMN.DB Bot (+https://github.com/davidbreau/PKMN.DB)"
@@ -87,7 +88,18 @@ HTTPCACHE_ENABLED = True
 HTTPCACHE_EXPIRATION_SECS = 43200  # 12 hours
 HTTPCACHE_DIR = "httpcache"
 HTTPCACHE_IGNORE_HTTP_CODES = [404, 500, 502, 503, 504]
-HTTPCACHE_STORAGE = 'scrapy_splash.SplashAwareFSCacheStorage'
+HTTPCACHE_STORAGE = 'PKMNdb.httpcache.SQLiteCacheStorage'
+# Un seul fichier SQLite dans HTTPCACHE_DIR, corps compressés (zstd si installé, sinon zlib)
+GO_HTTPCACHE_FILE = "httpcache.db"
+# Durée de validité du cache par spider, HTTPCACHE_EXPIRATION_SECS pour les autres
+GO_HTTPCACHE_EXPIRATION = {
+    "moves": 7 * 24 * 3600,
+    "fast_moves": 7 * 24 * 3600,
+    "charged_moves": 7 * 24 * 3600,
+}
+
+# Score minimal (0-1) pour rattacher un nom d'attaque ou de type à un nom connu légèrement différent
+GO_NAME_MATCH_THRESHOLD = 0.9
 
 # Log settings
 LOG_LEVEL = "INFO"
@@ -99,6 +111,7 @@ FEED_EXPORT_ENCODING = "utf-8"
 # Splash settings
 SPLASH_URL = 'http://localhost:8050'
 DUPEFILTER_CLASS = 'scrapy_splash.SplashAwareDupeFilter'
+REQUEST_FINGERPRINTER_CLASS = 'scrapy_splash.SplashRequestFingerprinter'
 
 # Enable retry middleware with increased settings for resilience
 RETRY_ENABLED = True
@@ -1,13 +1,18 @@
 import scrapy
-from scrapy_splash import SplashRequest
 import re
-import time
 from ..items import MoveItem
+from ..crawl_index import IndexedCrawlMixin
+from ..page_tables import PageTables
+from ..structured_data import StructuredDataMixin, move_item
 
 
-class ChargedMovesSpider(scrapy.Spider):
+class ChargedMovesSpider(IndexedCrawlMixin, StructuredDataMixin, scrapy.Spider):
     name = "charged_moves"
     allowed_domains = ["db.pokemongohub.net", "localhost"]
+    id_key = "move_id"
+    page_kind = "move"
+    # IDs sondés quand ni le sitemap ni les IDs connus ne sont disponibles
+    max_id = 300
     
     # Configuration spécifique pour cette araignée
     custom_settings = {
@@ -28,32 +33,13 @@ class ChargedMovesSpider(scrapy.Spider):
         'DUPEFILTER_CLASS': 'scrapy_splash.SplashAwareDupeFilter',
     }
 
-    def start_requests(self):
+    def id_request(self, move_id):
         """
-        Itère sur des IDs numériques croissants pour trouver les moves
+        Requête de la page d'un ID, planifiée depuis le sitemap et les IDs connus (voir IndexedCrawlMixin)
         """
-        # On commence à l'ID 1 et on essaie jusqu'à MAX_MOVE_ID
-        MAX_MOVE_ID = 300  # Valeur suffisamment grande pour couvrir tous les moves
-        base_url = "https://db.pokemongohub.net/move/"
-        
-        self.logger.info(f"Trying moves with IDs from 1 to {MAX_MOVE_ID}")
-        
-        # Générer des requêtes pour chaque ID possible de move
-        for move_id in range(1, MAX_MOVE_ID + 1):
-            move_url = f"{base_url}{move_id}"
-            self.logger.info(f"Scheduling request for move ID: {move_id}")
-            yield SplashRequest(
-                move_url,
-                self.parse_move,
-                args={
-                    'wait': 2,
-                    'timeout': 90,
-                    'resource_timeout': 20,
-                },
-                # Retry policy for 404s
-                errback=self.handle_error,
-                meta={'move_id': move_id}
-            )
+        move_url = f"https://db.pokemongohub.net/move/{move_id}"
+        self.logger.debug(f"Scheduling request for move ID: {move_id}")
+        return self.page_request(move_url, self.parse_move, meta={'move_id': move_id})
     
     def handle_error(self, failure):
         """
@@ -61,18 +47,33 @@ class ChargedMovesSpider(scrapy.Spider):
         """
         move_id = failure.request.meta.get('move_id')
         self.logger.info(f"Move ID {move_id} not found (404 or other error)")
+        self.page_missing(failure)
     
     def parse_move(self, response):
+        """
+        Parse la page depuis ses données structurées (__NEXT_DATA__), sans rendu Splash
+        """
+        yield from self.parse_page(response, self.structured_item, self.parse_rendered)
+
+    def structured_item(self, page_props, move_id):
+        move = move_item(page_props, move_id)
+        if move is None or not move['is_charged']:
+            return None
+        self.logger.info(f"Scraped Charged Move: {move.get('name')} (ID: {move.get('id')})")
+        return move
+
+    def parse_rendered(self, response):
         """
         Parse individual move page to extract all data
         """
+        page = PageTables.from_response(response)
         # Vérifier si la page existe et contient un move
-        if response.css('h1.Card_cardTitle__URr_A::text').get() is None:
+        if page.title is None:
             self.logger.info(f"Skipping ID {response.meta.get('move_id')} - not a valid move page")
             return
         
         # Vérifier si c'est un move chargé (si non, on ignore)
-        move_category = response.css('tr:contains("Category") td::text').get()
+        move_category = page.text("Category")
         if move_category and "charged" not in move_category.lower():
             self.logger.info(f"Skipping ID {response.meta.get('move_id')} - not a charged move")
             return
@@ -83,15 +84,15 @@ class ChargedMovesSpider(scrapy.Spider):
         move['id'] = str(response.meta.get('move_id'))
         
         # Extract move name
-        name = response.css('h1.Card_cardTitle__URr_A::text').get()
+        name = page.title
         if name:
             move['name'] = name.strip()
         
         # Extract move type
-        move_type = response.css('tr:contains("Type") td span::text').get()
+        move_type = page.span("Type")
         if not move_type:
             # Backup: try to get from the type image
-            move_type = response.css('figure img::attr(title)').get()
+            move_type = page.image_title()
         if move_type:
             move['type'] = move_type.strip()
         
@@ -100,10 +101,10 @@ class ChargedMovesSpider(scrapy.Spider):
         move['is_charged'] = True
         
         # Extract Raid/Gym stats
-        stats_section = response.css('section:contains("Gym and Raid Battles")')
+        stats_section = page.section("Gym and Raid Battles")
         
         # Extract base power
-        power = stats_section.css('tr:contains("Power") td::text').get()
+        power = stats_section.text("Power")
         if power:
             try:
                 move['power'] = int(power.strip())
@@ -111,7 +112,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert power to int: {power}")
         
         # Extract energy
-        energy = stats_section.css('tr:contains("Energy") td::text').get()
+        energy = stats_section.text("Energy")
         if energy:
             try:
                 move['energy'] = int(energy.strip())
@@ -119,7 +120,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert energy to int: {energy}")
         
         # Extract animation duration
-        duration = stats_section.css('tr:contains("Animation Duration") td::text').get()
+        duration = stats_section.text("Animation Duration")
         if duration:
             try:
                 move['animation_duration'] = float(duration.strip().replace('s', ''))
@@ -127,12 +128,12 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert duration to float: {duration}")
         
         # Extract damage window
-        damage_window = stats_section.css('tr:contains("Damage Window") td::text').get()
+        damage_window = stats_section.text("Damage Window")
         if damage_window:
             move['damage_window'] = damage_window.strip()
         
         # Extract DPS
-        dps = stats_section.css('tr:contains("DPS") td::text').get()
+        dps = stats_section.text("DPS")
         if dps:
             try:
                 move['dps'] = float(dps.split()[0])  # Get first number before "Damage per second"
@@ -140,7 +141,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert DPS to float: {dps}")
         
         # Extract DPE
-        dpe = stats_section.css('tr:contains("DPE") td::text').get()
+        dpe = stats_section.text("DPE")
         if dpe:
             try:
                 move['dpe'] = float(dpe.split()[0])  # Get first number before "Damage per Energy"
@@ -148,13 +149,13 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert DPE to float: {dpe}")
         
         # Extract PVP stats
-        pvp_section = response.css('section:contains("Trainer Battles")')
+        pvp_section = page.section("Trainer Battles")
         
         # Set PVP flag
         move['is_pvp'] = True
         
         # PVP power
-        pvp_power = pvp_section.css('tr:contains("Power") td::text').get()
+        pvp_power = pvp_section.text("Power")
         if pvp_power:
             try:
                 move['pvp_power'] = int(pvp_power.strip())
@@ -162,7 +163,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert PVP power to int: {pvp_power}")
         
         # PVP energy
-        pvp_energy = pvp_section.css('tr:contains("Energy") td::text').get()
+        pvp_energy = pvp_section.text("Energy")
         if pvp_energy:
             try:
                 move['pvp_energy'] = int(pvp_energy.strip())
@@ -170,7 +171,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert PVP energy to int: {pvp_energy}")
         
         # PVP duration
-        pvp_duration = pvp_section.css('tr:contains("Duration") td::text').get()
+        pvp_duration = pvp_section.text("Duration")
         if pvp_duration:
             # Pour les charged moves, la durée est en tours (Turns)
             try:
@@ -179,7 +180,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert PVP duration to int: {pvp_duration}")
         
         # PVP DPS
-        pvp_dps = pvp_section.css('tr:contains("DPS") td::text').get()
+        pvp_dps = pvp_section.text("DPS")
         if pvp_dps:
             try:
                 move['pvp_dps'] = float(pvp_dps.split()[0])  # Get first number before "Damage per second"
@@ -187,7 +188,7 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert PVP DPS to float: {pvp_dps}")
         
         # PVP DPE
-        pvp_dpe = pvp_section.css('tr:contains("DPE") td::text').get()
+        pvp_dpe = pvp_section.text("DPE")
         if pvp_dpe:
             try:
                 move['pvp_dpe'] = float(pvp_dpe.split()[0])  # Get first number before "Damage per Energy"
@@ -195,21 +196,24 @@ class ChargedMovesSpider(scrapy.Spider):
                 self.logger.warning(f"Could not convert PVP DPE to float: {pvp_dpe}")
         
         # Extract tags
-        tags = pvp_section.css('tr:contains("Tags") td::text').get()
+        tags = pvp_section.text("Tags")
         if tags:
             move['tags'] = [tag.strip() for tag in tags.split(',')]
         
         # For charged moves, extract PVP effects if any
-        pvp_effects = pvp_section.xpath('./following-sibling::section[1]/header[contains(text(), "Effects")]/following-sibling::text()').get()
+        pvp_effects = pvp_section.effects()
         if pvp_effects and "no special effects" not in pvp_effects.lower():
             move['pvp_effects'] = pvp_effects.strip()
         
         # Extract Pokémon that can learn this move
-        pokemon_with_move = response.css('ul.MoveInfo_pokemonList__ZJB1N li a::text').getall()
+        pokemon_with_move = page.pokemon_list()
         if pokemon_with_move:
             move['pokemon_with_move'] = [p.strip() for p in pokemon_with_move]
         
         self.logger.info(f"Scraped Charged Move: {move.get('name')} (ID: {move.get('id')})")
         
-        time.sleep(0.2)  # Small delay between requests
-        yield move 
\ No newline at end of file
+        yield move
+
+    def closed(self, reason):
+        """Appelé quand le spider se termine"""
+        self.save_known_ids()
@@ -1,13 +1,16 @@
 import scrapy
-from scrapy_splash import SplashRequest
 import re
-import time
 from ..items import PokemonItem
+from ..crawl_index import IndexedCrawlMixin
+from ..page_tables import PageTables
+from ..structured_data import StructuredDataMixin, pokemon_item
 
 
-class PokemonsSpider(scrapy.Spider):
+class PokemonsSpider(IndexedCrawlMixin, StructuredDataMixin, scrapy.Spider):
     name = "pokemons"
     allowed_domains = ["db.pokemongohub.net", "localhost"]
+    id_key = "pokemon_id"
+    page_kind = "pokemon"
     
     # Configuration spécifique pour cette araignée
     custom_settings = {
@@ -31,33 +34,16 @@ class PokemonsSpider(scrapy.Spider):
     def __init__(self, max_id=2000, *args, **kwargs):
         super(PokemonsSpider, self).__init__(*args, **kwargs)
         # Valeur paramétrable en ligne de commande
-        self.MAX_POKEMON_ID = int(max_id) if max_id else 200
+        self.max_id = int(max_id) if max_id else 200
         self.pokemon_count = 0
         
-    def start_requests(self):
+    def id_request(self, pokemon_id):
         """
-        Itère sur des IDs numériques croissants pour trouver les pokémons
+        Requête de la page d'un ID, planifiée depuis le sitemap et les IDs connus (voir IndexedCrawlMixin)
         """
-        base_url = "https://db.pokemongohub.net/pokemon/"
-        
-        self.logger.info(f"Trying pokemons with IDs from 1 to {self.MAX_POKEMON_ID}")
-        
-        # Générer des requêtes pour chaque ID possible de pokémon
-        for pokemon_id in range(1, self.MAX_POKEMON_ID + 1):
-            pokemon_url = f"{base_url}{pokemon_id}"
-            self.logger.info(f"Scheduling request for pokemon ID: {pokemon_id}")
-            yield SplashRequest(
-                pokemon_url,
-                self.parse_pokemon,
-                args={
-                    'wait': 2,
-                    'timeout': 90,
-                    'resource_timeout': 20,
-                },
-                # Retry policy for 404s
-                errback=self.handle_error,
-                meta={'pokemon_id': pokemon_id}
-            )
+        pokemon_url = f"https://db.pokemongohub.net/pokemon/{pokemon_id}"
+        self.logger.debug(f"Scheduling request for pokemon ID: {pokemon_id}")
+        return self.page_request(pokemon_url, self.parse_pokemon, meta={'pokemon_id': pokemon_id})
     
     def handle_error(self, failure):
         """
@@ -65,13 +51,28 @@ class PokemonsSpider(scrapy.Spider):
         """
         pokemon_id = failure.request.meta.get('pokemon_id')
         self.logger.info(f"Pokemon ID {pokemon_id} not found (404 or other error)")
+        self.page_missing(failure)
     
     def parse_pokemon(self, response):
+        """
+        Parse la page depuis ses données structurées (__NEXT_DATA__), sans rendu Splash
+        """
+        yield from self.parse_page(response, self.structured_item, self.parse_rendered)
+
+    def structured_item(self, page_props, pokemon_id):
+        pokemon = pokemon_item(page_props, pokemon_id)
+        if pokemon is not None:
+            self.pokemon_count += 1
+            self.logger.info(f"Scraped Pokemon {pokemon.get('name')} (ID: {pokemon.get('id')}) - Total: {self.pokemon_count}")
+        return pokemon
+
+    def parse_rendered(self, response):
         """
         Parse individual Pokemon page to extract all data
         """
+        page = PageTables.from_response(response)
         # Vérifier si la page existe et contient un Pokémon
-        if response.css('h1.Card_cardTitle__URr_A::text').get() is None:
+        if page.title is None:
             self.logger.info(f"Skipping ID {response.meta.get('pokemon_id')} - not a valid pokemon page")
             return
         
@@ -81,7 +82,7 @@ class PokemonsSpider(scrapy.Spider):
         pokemon['id'] = str(response.meta.get('pokemon_id'))
         
         # Extract Pokemon name
-        name = response.css('h1.Card_cardTitle__URr_A::text').get()
+        name = page.title
         if name:
             pokemon['name'] = name.strip()
         
@@ -89,28 +90,28 @@ class PokemonsSpider(scrapy.Spider):
         pokemon['pokedex_number'] = str(response.meta.get('pokemon_id'))
         
         # Extract basic stats (GO_PokemonStats)
-        max_cp = response.css('tr:contains("Max CP") td strong::text').get()
+        max_cp = page.strong("Max CP")
         if max_cp:
             try:
                 pokemon['max_cp'] = int(max_cp.strip().replace('CP', '').strip())
             except (ValueError, TypeError):
                 self.logger.warning(f"Impossible de convertir max_cp en entier: {max_cp}")
             
-        attack = response.css('tr:contains("Attack") td strong::text').get()
+        attack = page.strong("Attack")
         if attack:
             try:
                 pokemon['attack'] = int(attack.strip().replace('ATK', '').strip())
             except (ValueError, TypeError):
                 self.logger.warning(f"Impossible de convertir attack en entier: {attack}")
             
-        defense = response.css('tr:contains("Defense") td strong::text').get()
+        defense = page.strong("Defense")
         if defense:
             try:
                 pokemon['defense'] = int(defense.strip().replace('DEF', '').strip())
             except (ValueError, TypeError):
                 self.logger.warning(f"Impossible de convertir defense en entier: {defense}")
             
-        stamina = response.css('tr:contains("Stamina") td strong::text').get()
+        stamina = page.strong("Stamina")
         if stamina:
             try:
                 pokemon['stamina'] = int(stamina.strip().replace('HP', '').strip())
@@ -118,7 +119,7 @@ class PokemonsSpider(scrapy.Spider):
                 self.logger.warning(f"Impossible de convertir stamina en entier: {stamina}")
         
         # Extract buddy distance
-        buddy_distance = response.css('tr:contains("Buddy distance") td::text').get()
+        buddy_distance = page.text("Buddy distance")
         if buddy_distance:
             try:
                 # Extraire le nombre et convertir en flottant
@@ -126,19 +127,19 @@ class PokemonsSpider(scrapy.Spider):
                 if match:
                     pokemon['buddy_distance'] = float(match.group(1))
                 else:
-            pokemon['buddy_distance'] = buddy_distance.strip()
+                    pokemon['buddy_distance'] = buddy_distance.strip()
             except (ValueError, TypeError):
                 self.logger.warning(f"Impossible de convertir buddy_distance: {buddy_distance}")
         
         # Extract released status
-        released = response.css('tr:contains("Released") td::text').get()
+        released = page.text("Released")
         if released:
             pokemon['released'] = 'Yes' in released
         
         # Extract moves for learnset
         # Fast moves
         fast_moves = []
-        for move in response.css('h3:contains("Fast Attacks") + ul li summary strong::text').getall():
+        for move in page.move_names("Fast Attacks"):
             move_name = move.strip()
             is_elite = '*' in move_name
             fast_moves.append({
@@ -151,7 +152,7 @@ class PokemonsSpider(scrapy.Spider):
         
         # Charged moves
         charged_moves = []
-        for move in response.css('h3:contains("Charged Moves") + ul li summary strong::text').getall():
+        for move in page.move_names("Charged Moves"):
             move_name = move.strip()
             is_elite = '*' in move_name
             charged_moves.append({
@@ -165,9 +166,9 @@ class PokemonsSpider(scrapy.Spider):
         self.pokemon_count += 1
         self.logger.info(f"Scraped Pokemon {pokemon.get('name')} (ID: {pokemon.get('id')}) - Total: {self.pokemon_count}")
         
-        time.sleep(0.2)  # Small delay between requests
         yield pokemon 
         
     def closed(self, reason):
         """Appelé quand le spider se termine"""
-        self.logger.info(f"Spider closed. Stats: {self.pokemon_count} pokemons scraped.") 
\ No newline at end of file
+        self.logger.info(f"Spider closed. Stats: {self.pokemon_count} pokemons scraped.")
+        self.save_known_ids()
@@ -0,0 +1,156 @@
+# Extraction des données structurées des pages de db.pokemongohub.net
+#
+# Les pages sont rendues par Next.js : les données affichées sont embarquées dans le HTML brut,
+# dans le JSON du script __NEXT_DATA__. Les lire directement évite le rendu Splash, qui n'est
+# plus utilisé qu'en repli quand le JSON est absent.
+
+import json
+import sys
+import os
+import scrapy
+from scrapy_splash import SplashRequest
+from .items import PokemonItem, MoveItem
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from app.api.ingestion.extractors import get_path
+
+# Arguments Splash du rendu de repli
+SPLASH_ARGS = {
+    'wait': 2,
+    'timeout': 90,
+    'resource_timeout': 20,
+}
+
+# Chemins des champs des items dans pageProps
+POKEMON_FIELDS = {
+    'name': ('pokemon', 'name'),
+    'max_cp': ('pokemon', 'maxCp'),
+    'attack': ('pokemon', 'stats', 'baseAttack'),
+    'defense': ('pokemon', 'stats', 'baseDefense'),
+    'stamina': ('pokemon', 'stats', 'baseStamina'),
+    'buddy_distance': ('pokemon', 'buddyDistance'),
+    'released': ('pokemon', 'released'),
+}
+POKEMON_MOVES = {
+    'fast_moves': (('pokemon', 'quickMoves'), True),
+    'charged_moves': (('pokemon', 'chargeMoves'), False),
+}
+MOVE_FIELDS = {
+    'name': ('move', 'name'),
+    'type': ('move', 'type'),
+    'power': ('move', 'power'),
+    'energy': ('move', 'energy'),
+    'animation_duration': ('move', 'duration'),
+    'pvp_power': ('move', 'pvp', 'power'),
+    'pvp_energy': ('move', 'pvp', 'energy'),
+    'pvp_duration': ('move', 'pvp', 'turns'),
+    'pvp_effects': ('move', 'pvp', 'effects'),
+}
+
+
+def next_data(response):
+    """Retourne les pageProps du JSON __NEXT_DATA__ de la page, None s'il est absent ou invalide."""
+    payload = response.xpath('//script[@id="__NEXT_DATA__"]/text()').get()
+    if not payload:
+        return None
+    try:
+        return get_path(json.loads(payload), ('props', 'pageProps'))
+    except ValueError:
+        return None
+
+
+def pokemon_item(page_props, pokemon_id):
+    """Construit un PokemonItem depuis les pageProps d'une page Pokémon, None si ce n'en est pas une."""
+    if not get_path(page_props, POKEMON_FIELDS['name']):
+        return None
+
+    pokemon = PokemonItem(id=str(pokemon_id), pokedex_number=str(pokemon_id))
+    for field, path in POKEMON_FIELDS.items():
+        value = get_path(page_props, path)
+        if value is not None:
+            pokemon[field] = value
+
+    for field, (path, is_fast) in POKEMON_MOVES.items():
+        pokemon[field] = [
+            {
+                'name': move['name'],
+                'is_elite': bool(move.get('isElite')),
+                'is_fast': is_fast,
+                'is_charged': not is_fast,
+            }
+            for move in get_path(page_props, path, []) if move.get('name')
+        ]
+    return pokemon
+
+
+def move_item(page_props, move_id):
+    """Construit un MoveItem depuis les pageProps d'une page d'attaque, None si ce n'en est pas une
+    ou si sa catégorie n'est ni rapide ni chargée."""
+    category = (get_path(page_props, ('move', 'category')) or '').lower()
+    if not get_path(page_props, MOVE_FIELDS['name']) or not ('fast' in category or 'charge' in category):
+        return None
+
+    move = MoveItem(id=str(move_id), is_fast='fast' in category, is_charged='charge' in category, is_pvp=True)
+    for field, path in MOVE_FIELDS.items():
+        value = get_path(page_props, path)
+        if value is not None:
+            move[field] = value
+    return move
+
+
+class StructuredDataMixin:
+    """Requêtes des spiders GO : HTML brut d'abord, rendu Splash seulement en repli.
+
+    L'argument de spider render=splash force le rendu Splash de toutes les pages
+    (ex: scrapy crawl pokemons -a render=splash)."""
+
+    render = "auto"
+    # Clé de l'ID de la page dans response.meta, transmise à la requête de repli
+    id_key = None
+
+    def page_request(self, url, callback, meta):
+        """Requête d'une page, directe sauf si le rendu Splash est forcé."""
+        if self.render == "splash":
+            return self.splash_request(url, callback, meta)
+        return scrapy.Request(url, callback, errback=self.handle_error, meta=meta)
+
+    def splash_request(self, url, callback, meta):
+        return SplashRequest(url, callback, args=SPLASH_ARGS, errback=self.handle_error, meta=meta, dont_filter=True)
+
+    def parse_page(self, response, build_item, parse_rendered):
+        """Extrait l'item d'une page depuis ses données structurées.
+
+        Sans données structurées, une réponse brute est redemandée à Splash et une réponse rendue
+        est parsée par parse_rendered (sélecteurs CSS).
+
+        Args:
+            response: Réponse de la page
+            build_item: Construit l'item depuis les pageProps et l'ID de la page, None pour ignorer la page
+            parse_rendered: Callback de parsing du HTML rendu
+        """
+        page_props = next_data(response)
+        if page_props is not None:
+            item = build_item(page_props, response.meta.get(self.id_key))
+            if item is None:
+                self.logger.info(f"Skipping ID {response.meta.get(self.id_key)} - not a valid page")
+                return
+            self.stats_inc('structured')
+            self.page_found(response.meta.get(self.id_key))
+            yield item
+        elif 'splash' not in response.meta:
+            self.logger.info(f"No structured data in {response.url}, falling back to Splash rendering")
+            yield self.splash_request(response.url, response.request.callback, {self.id_key: response.meta.get(self.id_key)})
+        else:
+            self.stats_inc('rendered')
+            for result in parse_rendered(response):
+                if isinstance(result, scrapy.Item):
+                    self.page_found(response.meta.get(self.id_key))
+                yield result
+
+    def page_found(self, page_id):
+        """Appelé pour chaque page dont un item a été extrait."""
+
+    def stats_inc(self, key):
+        crawler = getattr(self, 'crawler', None)
+        if crawler is not None:
+            crawler.stats.inc_value(f'structured_data/{key}', spider=self)
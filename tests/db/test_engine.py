@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+
+import app.models.tables  # noqa: F401 register every table
+from app.db.engine import Engine, bulk_loading
+
+
+def index_names(engine):
+    with engine.connect() as connection:
+        return set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+
+
+def test_bulk_loading_defers_secondary_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'PKMN.db'}")
+    SQLModel.metadata.create_all(engine)
+    indexes = index_names(engine)
+
+    with bulk_loading(engine):
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 0
+        assert "ix_pokemon_learnsets_pokemon_id" not in index_names(engine)
+
+    assert index_names(engine) == indexes
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 2
+        assert connection.execute(text("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")).scalar() == 1
+
+
+def test_bulk_loading_keeps_the_shared_engine_open(tmp_path):
+    registry = Engine()
+    engine = registry.get_engine("PKMN.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    with registry.connect("PKMN.db", folder=tmp_path) as session:
+        pooled = session.connection().connection.dbapi_connection
+
+    with bulk_loading(engine):
+        with registry.connect("PKMN.db", folder=tmp_path) as session:
+            assert session.connection().connection.dbapi_connection is pooled
+            assert session.exec(text("PRAGMA synchronous")).scalar() == 0
+
+    assert registry.get_engine("PKMN.db", tmp_path) is engine
+    with registry.connect("PKMN.db", folder=tmp_path) as session:
+        assert session.connection().connection.dbapi_connection is pooled
+        assert session.exec(text("PRAGMA synchronous")).scalar() == 2
+        assert session.exec(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_registry_reuses_one_engine_per_database(tmp_path):
+    registry = Engine(pragmas={"busy_timeout": 1234})
+    engine = registry.get_engine("PKMN.db", tmp_path)
+
+    assert registry.get_engine("PKMN.db", tmp_path / "sub" / "..") is engine
+    with registry.connect("PKMN.db", folder=tmp_path) as session:
+        assert session.get_bind() is engine
+        assert session.exec(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert engine.pool.checkedin() == 1
+
+    registry.dispose()
+    assert registry.get_engine("PKMN.db", tmp_path) is not engine
+
+
+def test_pragmas_requested_after_creation_reach_pooled_connections(tmp_path):
+    registry = Engine()
+    engine = registry.get_engine("PKMN.db", tmp_path)
+    with registry.connect("PKMN.db", folder=tmp_path) as session:
+        assert session.exec(text("PRAGMA busy_timeout")).scalar() != 1234
+
+    assert registry.get_engine("PKMN.db", tmp_path, pragmas={"busy_timeout": 1234}) is engine
+    with registry.connect("PKMN.db", folder=tmp_path) as session:
+        assert session.exec(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert engine.pool.checkedin() == 1
+
+    with pytest.raises(ValueError, match="busy_timeout"):
+        registry.get_engine("PKMN.db", tmp_path, pragmas={"busy_timeout": 10})
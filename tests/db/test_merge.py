@@ -0,0 +1,94 @@
+import sqlite3
+
+from app.db.merge import DatabaseFusion, PokemonMatchIndex, form_key
+from app.db.name_resolver import Match, NameMappingCache
+
+MAIN_POKEMONS = [
+    (37, "Vulpix", 37), (10103, "Alolan Vulpix", 37),
+    (6, "Charizard", 6), (10034, "Mega Charizard X", 6), (10035, "Mega Charizard Y", 6),
+    (386, "Deoxys (Normal Forme)", 386), (10001, "Deoxys (Attack Forme)", 386),
+    (122, "Mr. Mime", 122), (10168, "Mr. Mime (Galarian Form)", 122),
+]
+
+
+def create_db(path, statements):
+    conn = sqlite3.connect(path)
+    for statement, rows in statements:
+        conn.executemany(statement, rows) if rows else conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def test_form_key_separates_regional_and_mega_forms():
+    assert form_key("alolan vulpix") == ("vulpix", "alola")
+    assert form_key("vulpix alola form") == ("vulpix", "alola")
+    assert form_key("mega charizard x") == ("charizard", "mega-x")
+    assert form_key("charizard mega y") == ("charizard", "mega-y")
+    assert form_key("mr mime") == ("mr mime", "")
+
+
+def test_index_matches_forms_and_reports_ambiguous_matches():
+    index = PokemonMatchIndex(MAIN_POKEMONS, lambda name: DatabaseFusion.normalize_name(None, name))
+
+    assert index.match("Vulpix", 37) == 37
+    assert index.match("Vulpix (Alola)", 37) == 10103
+    assert index.match("Charizard (Mega X)", 6) == 10034
+    assert index.match("Galarian Mr. Mime", None) == 10168
+    # Forme absente de la base principale : forme normale du même numéro
+    assert index.match("Hisuian Vulpix", 37) == 37
+    assert index.match("Missingno", 0) is None
+    assert index.ambiguous == []
+
+    assert index.match("Deoxys", 386) == 386
+    assert index.ambiguous == [{"go_id": None, "name": "Deoxys", "pokedex_number": 386, "candidates": [386, 10001]}]
+
+
+def test_merge_aligns_go_pokemon_ids(tmp_path):
+    create_db(tmp_path / "PKMN.db", [
+        ("CREATE TABLE pokemons (id INTEGER PRIMARY KEY, name_en TEXT, national_pokedex_number INTEGER)", None),
+        ("INSERT INTO pokemons VALUES (?, ?, ?)", MAIN_POKEMONS),
+    ])
+    create_db(tmp_path / "PKMNGO.db", [
+        ("CREATE TABLE go_pokemons (id INTEGER PRIMARY KEY, name TEXT, pokedex_number INTEGER)", None),
+        ("INSERT INTO go_pokemons VALUES (?, ?, ?)", [(1, "Vulpix", 37), (2, "Alolan Vulpix", 37), (3, "Mega Charizard Y", 6)]),
+        ("CREATE TABLE go_pokemon_stats (id INTEGER PRIMARY KEY, pokemon_id INTEGER)", None),
+        ("INSERT INTO go_pokemon_stats VALUES (?, ?)", [(1, 1), (2, 2), (3, 3)]),
+        ("CREATE TABLE go_pokemon_learnsets (id INTEGER PRIMARY KEY, pokemon_id INTEGER)", None),
+    ])
+    fusion = DatabaseFusion(tmp_path / "PKMN.db", tmp_path / "PKMNGO.db", tmp_path / "V2.db")
+
+    mapping = fusion.create_pokemon_mapping()
+    assert mapping == {1: 37, 2: 10103, 3: 10035}
+
+    fusion.adapt_and_copy_go_tables(mapping, {}, {})
+    conn = sqlite3.connect(fusion.merged_db_path)
+    # Les Pokémon GO absents du mapping sont appariés par l'index
+    fusion.update_go_pokemon_ids(conn, {1: 37})
+    assert conn.execute("SELECT id, main_id FROM go_pokemons ORDER BY id").fetchall() == [(1, 37), (2, 10103), (3, 10035)]
+    assert conn.execute("SELECT pokemon_id FROM go_pokemon_stats ORDER BY id").fetchall() == [(37,), (10103,), (10035,)]
+    conn.close()
+
+
+def test_move_and_type_mappings_use_the_cached_resolver(tmp_path):
+    create_db(tmp_path / "PKMN.db", [
+        ("CREATE TABLE moves (id INTEGER PRIMARY KEY, name TEXT)", None),
+        ("INSERT INTO moves VALUES (?, ?)", [(11, "Vise Grip"), (12, "Mud-Slap"), (13, "Weather Ball"), (14, "Thunder")]),
+        ("CREATE TABLE types (id INTEGER PRIMARY KEY, name TEXT)", None),
+        ("INSERT INTO types VALUES (?, ?)", [(1, "Normal"), (12, "Grass")]),
+    ])
+    create_db(tmp_path / "PKMNGO.db", [
+        ("CREATE TABLE go_moves (id INTEGER PRIMARY KEY, name TEXT)", None),
+        ("INSERT INTO go_moves VALUES (?, ?)", [(1, "Vice Grip"), (2, "Mud Slap"), (3, "Thunder Fang"), (4, "Future Sight")]),
+        ("CREATE TABLE go_types (id INTEGER PRIMARY KEY, name TEXT)", None),
+        ("INSERT INTO go_types VALUES (?, ?)", [(1, "normal"), (2, "GRASS")]),
+    ])
+    fusion = DatabaseFusion(tmp_path / "PKMN.db", tmp_path / "PKMNGO.db", tmp_path / "V2.db", tmp_path / "mappings.db")
+    # Correspondance approchée confirmée à la main
+    with NameMappingCache(tmp_path / "mappings.db") as cache:
+        cache.save("moves", {"Vice Grip": Match(11, "Vise Grip", 1.0)})
+
+    assert fusion.create_move_mapping() == {1: 11, 2: 12}
+    assert fusion.create_type_mapping() == {1: 1, 2: 12}
+    conn = sqlite3.connect(tmp_path / "mappings.db")
+    assert conn.execute("SELECT namespace, count(*) FROM name_mappings GROUP BY namespace").fetchall() == [("moves", 2), ("types", 2)]
+    conn.close()
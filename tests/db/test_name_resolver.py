@@ -0,0 +1,43 @@
+from app.db.name_resolver import Match, NameMappingCache, NameResolver
+
+MOVES = [(1, "Vise Grip"), (2, "Weather Ball"), (3, "Mud-Slap"), (4, "Hydro Pump"), (5, "Hydro Cannon")]
+
+
+def test_exact_then_trigram_matches_with_scores():
+    resolver = NameResolver(MOVES, threshold=0.6)
+
+    assert resolver.resolve("mud slap") == Match(3, "Mud-Slap", 1.0)
+    assert resolver.resolve("Vice Grip").id == 1
+    assert resolver.resolve("Weather Ball (Fire)").id == 2
+    assert resolver.resolve("Future Sight") is None
+
+    hydro = resolver.candidates("Hydro", threshold=0.5)
+    assert [m.id for m in hydro] == [4, 5] and hydro[0].score > hydro[1].score
+
+
+def test_default_threshold_rejects_distinct_moves():
+    resolver = NameResolver([(1, "Thunder"), (2, "Wrap"), (3, "Psychic Fangs")])
+
+    assert resolver.resolve("Thunder Fang") is None
+    assert resolver.resolve("Wrap Green") is None
+    assert resolver.resolve("Psychic Fangs*").id == 3
+
+
+def test_only_exact_and_confirmed_resolutions_are_cached(tmp_path):
+    with NameMappingCache(tmp_path / "mappings.db") as cache:
+        resolver = NameResolver(MOVES, threshold=0.6, cache=cache, namespace="moves")
+        assert resolver.resolve("Vice Grip").id == 1
+        resolver.resolve("mud slap")
+        resolver.save()
+
+    with NameMappingCache(tmp_path / "mappings.db") as cache:
+        assert cache.load("moves") == {"mud slap": Match(3, "Mud-Slap", 1.0)}
+        assert cache.load("types") == {}
+        # Une correspondance approchée confirmée à la main est réutilisée
+        cache.save("moves", {"Vice Grip": Match(1, "Vise Grip", 1.0)})
+        resolver = NameResolver(MOVES, cache=cache, namespace="moves")
+        assert resolver.resolve("Vice Grip") == Match(1, "Vise Grip", 1.0)
+        # Une entrée dont la cible a changé de nom est recalculée
+        cache.save("moves", {"Hydro": Match(2, "Hydro Pump", 1.0)})
+        resolver = NameResolver(MOVES, threshold=0.6, cache=cache, namespace="moves")
+        assert resolver.resolve("Hydro").id == 4
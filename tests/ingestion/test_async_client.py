@@ -0,0 +1,68 @@
+import asyncio
+import httpx
+import ujson
+
+from app.api.ingestion.async_client import AsyncPokeApiClient
+from app.api.ingestion.rate_limiter import RateLimiter
+from app.models.enums.pokeapi import EndPoint
+
+BASE_URL = "https://pokeapi.test/api/v2/"
+TOTAL = 5
+
+
+def fake_pokeapi(request: httpx.Request) -> httpx.Response:
+    """Mini PokeAPI: listing with limit/offset and one detail per ID (ID 3 is broken)"""
+    parts = request.url.path.rstrip("/").split("/")
+    if parts[-1] == "pokemon":
+        limit = int(request.url.params.get("limit", 20))
+        offset = int(request.url.params.get("offset", 0))
+        results = [
+            {"name": f"pkmn-{i}", "url": f"{BASE_URL}pokemon/{i}/"}
+            for i in range(offset + 1, min(offset + limit, TOTAL) + 1)
+        ]
+        return httpx.Response(200, text=ujson.dumps({"count": TOTAL, "results": results}))
+
+    item_id = int(parts[-1])
+    if item_id == 3:
+        return httpx.Response(500)
+    return httpx.Response(200, text=ujson.dumps({"id": item_id, "name": f"pkmn-{item_id}"}))
+
+
+def test_call_returns_json():
+    async def run():
+        async with AsyncPokeApiClient(base_url=BASE_URL, transport=httpx.MockTransport(fake_pokeapi)) as client:
+            return await client.call(EndPoint.POKEMON, resource_id="1")
+
+    assert asyncio.run(run()) == {"id": 1, "name": "pkmn-1"}
+
+
+def test_items_generator_keeps_order_and_skips_failures():
+    async def run():
+        async with AsyncPokeApiClient(base_url=BASE_URL, max_concurrency=2,
+                                      transport=httpx.MockTransport(fake_pokeapi),
+                                      rate_limiter=RateLimiter(max_retries=0)) as client:
+            return [item_id async for _, item_id, _ in client.get_items_generator(EndPoint.POKEMON, batch_size=2)]
+
+    assert asyncio.run(run()) == [1, 2, 4, 5]
+
+
+def test_iter_pages_prefetches_the_next_page():
+    requested = []
+
+    def recording_pokeapi(request: httpx.Request) -> httpx.Response:
+        requested.append(int(request.url.params.get("offset", 0)))
+        return fake_pokeapi(request)
+
+    async def run():
+        async with AsyncPokeApiClient(base_url=BASE_URL, transport=httpx.MockTransport(recording_pokeapi)) as client:
+            pages = client.iter_pages(EndPoint.POKEMON, page_size=2)
+            await pages.__anext__()
+            await asyncio.sleep(0)  # let the prefetch run
+            seen_after_first_page = list(requested)
+            names = [item["name"] async for item in client.iter_listing(EndPoint.POKEMON, page_size=2, limit=3)]
+            await pages.aclose()
+            return seen_after_first_page, names
+
+    seen_after_first_page, names = asyncio.run(run())
+    assert seen_after_first_page == [0, 2]
+    assert names == ["pkmn-1", "pkmn-2", "pkmn-3"]
@@ -0,0 +1,46 @@
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import app.models.tables  # noqa: F401 register every table
+from app.api.ingestion.bulk_writer import BulkWriter
+from app.models.tables.pokedex_number import PokedexNumber
+from app.models.tables.pokemon import Pokemon
+from app.models.tables.pokemon_ability import PokemonAbility
+
+
+def write(engine, *pokemon, dex=(), abilities=None):
+    writer = BulkWriter(keep_existing=[PokedexNumber])
+    for row in (*pokemon, *dex):
+        writer.upsert(row)
+    for pokemon_id, rows in (abilities or {}).items():
+        writer.replace(PokemonAbility, "pokemon_id", pokemon_id, rows)
+    with Session(engine) as session:
+        written = writer.flush(session)
+        session.commit()
+    return written
+
+
+def pokemon(pokemon_id, name_en, name_fr=None):
+    return Pokemon(id=pokemon_id, national_pokedex_number=pokemon_id, name_en=name_en, name_fr=name_fr, type_1_id=12)
+
+
+def ability(pokemon_id, slot, name):
+    return PokemonAbility(pokemon_id=pokemon_id, ability_id=slot, ability_name=name, slot=slot)
+
+
+def test_bulk_writer_upserts_and_replaces_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'PKMN.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    write(engine, pokemon(1, "bulbasaur"), pokemon(4, "charmander"),
+          dex=[PokedexNumber(pokemon_id=1, national=1, kanto=1)],
+          abilities={1: [ability(1, 1, "overgrow"), ability(1, 3, "chlorophyll")]})
+    written = write(engine, pokemon(1, "bulbasaur", "Bulbizarre"),
+                    dex=[PokedexNumber(pokemon_id=1, national=1)],
+                    abilities={1: [ability(1, 1, "overgrow")]})
+
+    assert written == {"pokemons": 1, "pokedex_numbers": 1, "pokemon_abilities": 1}
+    with Session(engine) as session:
+        assert session.exec(select(Pokemon.name_fr).order_by(Pokemon.id)).all() == ["Bulbizarre", None]
+        # pokedex numbers unknown by the source are kept
+        assert session.exec(select(PokedexNumber.kanto)).one() == 1
+        assert session.exec(select(PokemonAbility.ability_name)).all() == ["overgrow"]
@@ -0,0 +1,51 @@
+from unittest.mock import Mock, patch
+
+from app.api.ingestion.cache import SQLiteResponseCache
+from app.api.ingestion.client import PokeApiClient
+from app.models.enums.pokeapi import EndPoint
+
+
+def make_response(status_code=200, text="", headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    response.raise_for_status = Mock()
+    return response
+
+
+def test_cache_roundtrip_is_compressed(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "cache.db")
+    key = cache.make_key(EndPoint.POKEMON, "1", {"offset": 0, "limit": 1})
+    assert key == cache.make_key(EndPoint.POKEMON, "1", {"limit": 1, "offset": 0})
+
+    body = '{"id": 1, "name": "bulbasaur"}' * 100
+    cache.set(key, body, etag='"abc"')
+    cached = cache.get(key)
+
+    assert cached.body == body
+    assert cached.revalidation_headers() == {"If-None-Match": '"abc"'}
+    stored = cache._conn.execute("SELECT length(body) FROM responses").fetchone()[0]
+    assert stored < len(body)
+
+
+def test_fresh_entry_skips_network(tmp_path):
+    client = PokeApiClient(cache=SQLiteResponseCache(tmp_path / "cache.db"))
+    with patch("app.api.ingestion.client.requests.get",
+               return_value=make_response(text='{"id": 1}')) as get:
+        assert client.call(EndPoint.POKEMON, resource_id="1") == {"id": 1}
+        assert client.call(EndPoint.POKEMON, resource_id="1") == {"id": 1}
+    assert get.call_count == 1
+
+
+def test_stale_entry_is_revalidated(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "cache.db", ttl=0)
+    client = PokeApiClient(cache=cache)
+    with patch("app.api.ingestion.client.requests.get",
+               return_value=make_response(text='{"id": 1}', headers={"ETag": '"v1"'})):
+        client.call(EndPoint.POKEMON, resource_id="1")
+
+    with patch("app.api.ingestion.client.requests.get",
+               return_value=make_response(status_code=304)) as get:
+        assert client.call(EndPoint.POKEMON, resource_id="1") == {"id": 1}
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
@@ -0,0 +1,71 @@
+from sqlmodel import Session, create_engine, select, SQLModel
+
+from app.api.ingestion.checkpoint import Checkpoint
+from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.snapshot import SnapshotBackend
+from app.db.engine import Engine
+from app.models.enums.pokeapi import EndPoint
+from app.models.tables.type import Type
+from tests.ingestion.test_snapshot import write_snapshot
+
+
+def test_generator_resumes_after_the_checkpoint(tmp_path):
+    client = PokeApiClient(backend=SnapshotBackend(write_snapshot(tmp_path)))
+    checkpoint = Checkpoint("PokemonImporter", EndPoint.POKEMON)
+
+    first_run = client.get_items_generator(EndPoint.POKEMON, batch_size=2, checkpoint=checkpoint)
+    assert [next(first_run)[:2] for _ in range(3)] == [(1, 1), (2, 2), (3, 3)]
+    first_run.close()  # interrupted after the third Pokémon
+    # Only the consumer moves the offset, once it has written the items
+    assert checkpoint.offset == 0
+    checkpoint.offset = 3
+
+    resumed = client.get_items_generator(EndPoint.POKEMON, batch_size=2, checkpoint=checkpoint)
+    assert [item_id for _, item_id, _ in resumed] == [4, 5]
+
+
+def test_resume_retries_an_item_rolled_back_mid_batch(tmp_path):
+    client = PokeApiClient(backend=SnapshotBackend(write_snapshot(tmp_path / "snapshot")))
+    registry = Engine()
+    registry.default_folder = tmp_path
+    engine = registry.get_engine("PKMN.db")
+    SQLModel.metadata.create_all(engine)
+
+    def to_type(data, failing=()):
+        if data["id"] in failing:
+            raise ValueError("invalid item")
+        return Type(id=data["id"], name=data["name"])
+
+    checkpoint = Checkpoint("TypeImporter", EndPoint.POKEMON)
+    PokeApiClient.batch_ingest(client.get_items_generator(EndPoint.POKEMON, batch_size=2, checkpoint=checkpoint),
+                               registry, lambda data: to_type(data, failing=(3,)), batch_size=2,
+                               db_name="PKMN.db", checkpoint=checkpoint)
+    with Session(engine) as session:
+        assert session.exec(select(Type.id).order_by(Type.id)).all() == [1, 2, 4, 5]
+        saved = Checkpoint.load(session, "TypeImporter", EndPoint.POKEMON)
+    assert (saved.offset, saved.last_id) == (2, 5)
+
+    PokeApiClient.batch_ingest(client.get_items_generator(EndPoint.POKEMON, batch_size=2, checkpoint=saved),
+                               registry, to_type, batch_size=2, db_name="PKMN.db", checkpoint=saved)
+    with Session(engine) as session:
+        assert session.exec(select(Type.id).order_by(Type.id)).all() == [1, 2, 3, 4, 5]
+        assert Checkpoint.load(session, "TypeImporter", EndPoint.POKEMON).offset == 0
+
+
+def test_checkpoint_is_persisted_until_cleared(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'PKMN.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        checkpoint = Checkpoint("PokemonImporter", EndPoint.POKEMON, offset=900)
+        checkpoint.save(session, last_id=900)
+        session.commit()
+
+    with Session(engine) as session:
+        loaded = Checkpoint.load(session, "PokemonImporter", EndPoint.POKEMON)
+        assert (loaded.offset, loaded.last_id) == (900, 900)
+        assert Checkpoint.load(session, "PokemonImporter", EndPoint.POKEMON_SPECIES).offset == 0
+
+        loaded.clear(session)
+        session.commit()
+        assert Checkpoint.load(session, "PokemonImporter", EndPoint.POKEMON).offset == 0
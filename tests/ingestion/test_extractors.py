@@ -0,0 +1,44 @@
+from app.api.ingestion.extractors import Extractor, Lookup, localized, url_id, version_group_id
+from app.api.ingestion.importers.ability_importer import ABILITY_FIELDS
+from app.api.ingestion.importers.pokemon_importer import POKEMON_FIELDS
+
+
+def entry(language, text, version_group=None, key="name"):
+    data = {"language": {"name": language}, key: text}
+    if version_group:
+        data["version_group"] = {"url": f"/api/v2/version-group/{version_group}/"}
+    return data
+
+
+def test_first_match_wins_and_defaults_fill_missing_fields():
+    extractor = Extractor(
+        fr=localized("names", "fr"),
+        de=localized("names", "de", default="?"),
+        first_slot=Lookup("types", ("slot",), 1, ("type", "url"), convert=url_id),
+    )
+    payload = {"names": [entry("en", "Bulbasaur"), entry("fr", "Bulbizarre"), entry("fr", "Doublon")],
+               "types": [{"slot": 2, "type": {"url": "/api/v2/type/4/"}}, {"slot": 1, "type": {"url": "/api/v2/type/12/"}}]}
+
+    assert extractor.extract(payload) == {"fr": "Bulbizarre", "de": "?", "first_slot": 12}
+    assert extractor.extract({}) == {"fr": None, "de": "?", "first_slot": None}
+
+
+def test_latest_by_picks_the_most_recent_entry():
+    extractor = Extractor(flavor=localized("flavor_text_entries", "fr", "flavor_text", latest_by=version_group_id))
+    payload = {"flavor_text_entries": [entry("fr", "ancien", 5, "flavor_text"), entry("fr", "récent", 20, "flavor_text"),
+                                       entry("en", "english", 25, "flavor_text"), entry("fr", "moyen", 11, "flavor_text")]}
+
+    assert extractor.extract(payload) == {"flavor": "récent"}
+
+
+def test_importer_field_declarations():
+    pokemon = {"stats": [{"base_stat": 45, "stat": {"name": "hp"}}, {"base_stat": 65, "stat": {"name": "special-attack"}}],
+               "types": [{"slot": 1, "type": {"url": "/api/v2/type/12/"}}]}
+    fields = POKEMON_FIELDS.extract(pokemon)
+    assert (fields["hp"], fields["special_attack"], fields["speed"]) == (45, 65, 0)
+    assert (fields["type_1_id"], fields["type_2_id"]) == (12, None)
+
+    ability = {"effect_entries": [entry("en", "Boosts Grass moves.", key="effect")],
+               "flavor_text_entries": [entry("fr", "Vieux", 1, "flavor_text"), entry("fr", "Neuf", 3, "flavor_text")]}
+    assert ABILITY_FIELDS.extract(ability) == {"name_fr": None, "effect_en": "Boosts Grass moves.", "effect_fr": None,
+                                               "flavor_text_fr": "Neuf"}
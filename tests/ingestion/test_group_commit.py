@@ -0,0 +1,62 @@
+import sqlite3
+from datetime import datetime, timezone
+
+from sqlmodel import Session, SQLModel, select
+
+from app.api.ingestion.group_commit import GroupCommit
+from app.db.engine import Engine
+from app.models.tables.ingestion_manifest import IngestionManifest
+
+
+def entry(resource_id):
+    return IngestionManifest(endpoint="type", resource_id=resource_id, content_hash="h",
+                             fetched_at=datetime.now(timezone.utc))
+
+
+def committed_ids(path):
+    # Lecture par une autre connexion : seules les lignes validées sont visibles
+    connection = sqlite3.connect(path)
+    try:
+        return [row[0] for row in connection.execute("SELECT resource_id FROM ingestion_manifest ORDER BY resource_id")]
+    finally:
+        connection.close()
+
+
+def test_items_are_committed_by_group_and_failing_items_roll_back_alone(tmp_path):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(entry(1))
+        session.commit()
+
+    saved = []
+    visible = []
+    with Session(engine) as session:
+        with GroupCommit(session, size=3, interval=None, before_commit=saved.append) as group:
+            # 1 is a duplicate and fails in the first group, the second 4 fails first in its group
+            for resource_id in (2, 1, 3, 4, 4, 5):
+                with group.item(resource_id):
+                    session.add(entry(resource_id))
+                visible.append(committed_ids(tmp_path / "PKMN.db"))
+
+    assert visible == [[1], [1], [1], [1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4]]
+    assert (group.committed, group.failed, group.commits) == (4, 2, 2)
+    assert saved == [4, 5]
+    assert committed_ids(tmp_path / "PKMN.db") == [1, 2, 3, 4, 5]
+
+
+def test_an_uncommitted_group_is_rolled_back(tmp_path):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        group = GroupCommit(session, size=10, interval=None)
+        for resource_id in (1, 2, 3):
+            with group.item(resource_id):
+                session.add(entry(resource_id))
+        assert group.pending == 3
+        session.rollback()
+
+    assert committed_ids(tmp_path / "PKMN.db") == []
+    with Session(engine) as session:
+        assert session.exec(select(IngestionManifest)).all() == []
@@ -0,0 +1,44 @@
+from sqlmodel import Session, SQLModel, create_engine, select
+
+import app.models.tables  # noqa: F401 register every table
+from app.api.ingestion.learnset_loader import LearnsetBuffer, LearnsetLoader
+from app.models.tables.pokemon_learnset import PokemonLearnset
+
+
+def move(move_id, name, *details):
+    return {"move": {"name": name, "url": f"/api/v2/move/{move_id}/"}, "version_group_details": [
+        {"level_learned_at": level, "move_learn_method": {"name": method}, "version_group": {"name": "red-blue"}}
+        for method, level in details
+    ]}
+
+
+def test_buffer_drops_duplicate_rows_and_interns_strings():
+    buffer = LearnsetBuffer.from_moves(1, [move(33, "tackle", ("level-up", 1), ("level-up", 1), ("machine", 0))])
+
+    assert list(buffer.rows()) == [(1, 33, "tackle", "level-up", 1, "red-blue"), (1, 33, "tackle", "machine", 0, "red-blue")]
+    assert buffer.duplicates == 1
+    assert buffer.version_groups[0] is buffer.version_groups[1]
+
+
+def test_moves_without_an_id_are_skipped():
+    broken = {"move": {"name": "broken"}, "version_group_details": move(1, "x", ("level-up", 1))["version_group_details"]}
+    buffer = LearnsetBuffer.from_moves(1, [broken, move(33, "tackle", ("level-up", 1))])
+
+    assert [row[1] for row in buffer.rows()] == [33]
+
+
+def test_loader_replaces_the_learnsets_of_the_owners(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'PKMN.db'}")
+    SQLModel.metadata.create_all(engine)
+    loader = LearnsetLoader(batch_size=2)
+
+    with Session(engine) as session:
+        first = LearnsetBuffer.from_moves(1, [move(33, "tackle", ("level-up", 1)), move(45, "growl", ("level-up", 3))])
+        first.extend(LearnsetBuffer.from_moves(4, [move(10, "scratch", ("level-up", 1))]))
+        loader.replace(session, first)
+        # Pokemon 1 forgot every move, Pokemon 4 is untouched
+        loader.replace(session, LearnsetBuffer.from_moves(1, []))
+        session.commit()
+
+        assert session.exec(select(PokemonLearnset.pokemon_id, PokemonLearnset.move_name)).all() == [(4, "scratch")]
+    assert loader.inserted == 3
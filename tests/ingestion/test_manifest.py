@@ -0,0 +1,86 @@
+import sqlite3
+from functools import partial
+
+from sqlmodel import Session, select
+
+from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.group_commit import GroupCommit
+from app.api.ingestion.importers.type_importer import TypeImporter
+from app.api.ingestion.manifest import ResourceManifest
+from app.api.ingestion.resource_store import ResourceStore
+from app.db.engine import Engine
+from app.models.tables.type import Type
+
+
+def fake_types(names_fr):
+    """Client serving one type per French name"""
+    def call(endpoint, resource_id=None, limit=None, **kwargs):
+        if resource_id is None:
+            results = [{"name": f"type-{i}", "url": f"/api/v2/type/{i}/"} for i in range(1, len(names_fr) + 1)]
+            return {"count": len(names_fr), "results": results[kwargs.get("offset") or 0:][:limit]}
+        i = int(resource_id)
+        return {"id": i, "name": f"type-{i}", "names": [{"language": {"name": "fr"}, "name": names_fr[i - 1]}]}
+
+    client = PokeApiClient()
+    client.call = call
+    return client
+
+
+def test_content_hash_ignores_key_order():
+    assert ResourceManifest.content_hash({"a": 1, "b": [1, 2]}) == ResourceManifest.content_hash({"b": [1, 2], "a": 1})
+    assert ResourceManifest.content_hash({"a": 1}) != ResourceManifest.content_hash({"a": 2})
+
+
+def test_incremental_import_only_upserts_changed_resources(tmp_path):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+
+    full = TypeImporter(fake_types(["Normal", "Combat"]), ResourceStore(), engine).import_all()
+    delta = TypeImporter(fake_types(["Normal", "Lutte"]), ResourceStore(), engine).import_all(incremental=True)
+
+    assert len(full) == 2
+    assert [t.id for t in delta] == [2]
+    with Session(engine) as session:
+        assert session.exec(select(Type.name_fr).order_by(Type.id)).all() == ["Normal", "Lutte"]
+
+
+def test_no_write_lock_is_held_while_fetching_details(tmp_path):
+    # WAL, as in a build
+    engine = Engine(pragmas={"journal_mode": "WAL"}).get_engine("PKMN.db", tmp_path)
+
+    client = fake_types([f"Type {i}" for i in range(1, 8)])
+    call = client.call
+
+    def call_while_writing(endpoint, resource_id=None, **kwargs):
+        # Another stage writes to the database during each API call
+        writer = sqlite3.connect(tmp_path / "PKMN.db", timeout=0)
+        with writer:
+            writer.execute("CREATE TABLE IF NOT EXISTS other_stage (id INTEGER)")
+            writer.execute("INSERT INTO other_stage VALUES (1)")
+        writer.close()
+        return call(endpoint, resource_id=resource_id, **kwargs)
+
+    client.call = call_while_writing
+    imported = TypeImporter(client, ResourceStore(), engine).import_all()
+
+    assert len(imported) == 7
+
+
+def test_each_page_is_committed_at_once(tmp_path, monkeypatch):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+    client = fake_types([f"Type {i}" for i in range(1, 8)])
+    client.iter_pages = partial(client.iter_pages, page_size=3)
+
+    # Types visible to another connection just before each commit
+    visible = []
+    commit = GroupCommit.commit
+
+    def commit_and_record(group):
+        reader = sqlite3.connect(tmp_path / "PKMN.db")
+        visible.append(reader.execute("SELECT count(*) FROM types").fetchone()[0])
+        reader.close()
+        commit(group)
+
+    monkeypatch.setattr(GroupCommit, "commit", commit_and_record)
+    TypeImporter(client, ResourceStore(), engine).import_all()
+
+    assert visible == [0, 3, 6, 7]
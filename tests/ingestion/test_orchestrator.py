@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlmodel import SQLModel
+
+from app.api.ingestion.importers.type_importer import TypeImporter
+from app.api.ingestion.orchestrator import IngestionOrchestrator, Stage
+from app.api.ingestion.resource_store import ResourceStore
+from app.db.engine import Engine
+from tests.ingestion.test_manifest import fake_types
+
+
+def test_independent_stages_run_concurrently_after_their_dependencies():
+    events = []
+    both_started = threading.Barrier(2, timeout=5)
+
+    def record(name, wait=False):
+        def run():
+            if wait:
+                both_started.wait()  # deadlocks unless both stages run at once
+            events.append(name)
+        return run
+
+    stages = [
+        Stage("pokemon", record("pokemon"), depends_on=("moves", "types")),
+        Stage("moves", record("moves", wait=True)),
+        Stage("types", record("types", wait=True)),
+    ]
+    results = IngestionOrchestrator(stages, max_workers=2).run()
+
+    assert all(result.status == "done" for result in results.values())
+    assert events[-1] == "pokemon"
+
+
+def test_failed_stage_skips_its_dependents():
+    def fail():
+        raise RuntimeError("API down")
+
+    stages = [
+        Stage("moves", fail),
+        Stage("games", lambda: time.sleep(0.01)),
+        Stage("machines", lambda: None, depends_on=("moves", "games")),
+    ]
+    orchestrator = IngestionOrchestrator(stages)
+    results = orchestrator.run()
+
+    assert [results[name].status for name in ("moves", "games", "machines")] == ["failed", "done", "skipped"]
+    assert orchestrator.critical_path(results)[0] == ["games", "machines"]
+
+
+def test_cycles_and_unknown_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        IngestionOrchestrator([Stage("a", lambda: None, ("b",)), Stage("b", lambda: None, ("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        IngestionOrchestrator([Stage("a", lambda: None, ("missing",))])
+
+
+def test_importer_failing_on_a_locked_database_fails_its_stage(tmp_path):
+    engine = Engine(pragmas={"busy_timeout": 100}).get_engine("PKMN.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    # Another writer holds the lock for the whole import
+    writer = sqlite3.connect(tmp_path / "PKMN.db", isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+
+    importer = TypeImporter(fake_types(["Normal", "Combat"]), ResourceStore(), engine)
+    stages = [
+        Stage("types", importer.import_all),
+        Stage("type_effectiveness", lambda: None, depends_on=("types",)),
+    ]
+    results = IngestionOrchestrator(stages).run()
+    writer.rollback()
+
+    assert [results[name].status for name in ("types", "type_effectiveness")] == ["failed", "skipped"]
+    assert "locked" in str(results["types"].error)
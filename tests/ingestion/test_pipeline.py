@@ -0,0 +1,134 @@
+import sqlite3
+
+import ujson
+from sqlmodel import Session, SQLModel, func, select
+
+from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.importers.pokemon_importer import PokemonImporter
+from app.api.ingestion.pipeline import Pipeline
+from app.api.ingestion.resource_store import ResourceStore
+from app.api.ingestion.snapshot import SnapshotBackend
+from app.db.engine import Engine
+from app.models.tables.import_checkpoint import ImportCheckpoint
+from app.models.tables.pokemon import Pokemon
+from app.models.tables.pokemon_learnset import PokemonLearnset
+
+TOTAL = 4
+
+
+def test_pipeline_loads_batches_and_holds_the_watermark_before_failed_items():
+    def fetch(item):
+        if item == 7:
+            raise ConnectionError("timeout")
+        return item
+
+    loaded, watermarks = [], []
+
+    def load(batch, watermark):
+        loaded.extend(batch)
+        watermarks.append(watermark)
+
+    pipeline = Pipeline(fetch, lambda item: item if item % 2 else None, load,
+                        fetch_workers=4, transform_workers=2, batch_size=3)
+    metrics = pipeline.run(range(1, 21), start=100)
+
+    assert sorted(loaded) == [1, 3, 5, 9, 11, 13, 15, 17, 19]
+    # Item 7 (position 107) failed: a resumed import starts again from it
+    assert watermarks == sorted(watermarks) and watermarks[-1] == 106
+    assert (metrics["fetch"].errors, metrics["transform"].dropped, metrics["load"].processed) == (1, 10, 9)
+
+
+def write_pokemon_snapshot(root):
+    """Snapshot with TOTAL Pokémon, their species and one learnable move"""
+    base = root / "api" / "v2"
+    listing = [{"name": f"pkmn-{i}", "url": f"/api/v2/pokemon/{i}/"} for i in range(1, TOTAL + 1)]
+    resources = {"pokemon": {"count": TOTAL, "results": listing}, "pokemon-species": {"count": TOTAL, "results": []}}
+    for i in range(1, TOTAL + 1):
+        resources[f"pokemon/{i}"] = {
+            "id": i, "name": f"pkmn-{i}", "species": {"url": f"/api/v2/pokemon-species/{i}/"},
+            "types": [{"slot": 1, "type": {"url": "/api/v2/type/12/"}}],
+            "stats": [{"base_stat": 45, "stat": {"name": "hp"}}],
+            "abilities": [{"ability": {"name": "overgrow", "url": "/api/v2/ability/65/"}, "slot": 1}],
+            "moves": [{"move": {"name": "tackle", "url": "/api/v2/move/33/"}, "version_group_details": [
+                {"level_learned_at": 1, "move_learn_method": {"name": "level-up"}, "version_group": {"name": "red-blue"}},
+            ]}],
+        }
+        resources[f"pokemon-species/{i}"] = {"id": i, "names": [{"language": {"name": "fr"}, "name": f"Pkmn {i}"}]}
+    for path, data in resources.items():
+        (base / path).mkdir(parents=True, exist_ok=True)
+        (base / path / "index.json").write_text(ujson.dumps(data))
+    return root
+
+
+def test_pokemon_importer_pipeline_is_idempotent(tmp_path):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+    client = PokeApiClient(backend=SnapshotBackend(write_pokemon_snapshot(tmp_path / "snapshot")))
+
+    for _ in range(2):
+        PokemonImporter(client, ResourceStore(), engine).import_all(fetch_workers=3, batch_size=3)
+
+    with Session(engine) as session:
+        assert session.exec(select(Pokemon.name_fr).order_by(Pokemon.id)).all() == [f"Pkmn {i}" for i in range(1, TOTAL + 1)]
+        assert session.exec(select(func.count()).select_from(PokemonLearnset)).one() == TOTAL
+
+
+def test_resume_retries_pokemon_that_failed(tmp_path):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+    snapshot = write_pokemon_snapshot(tmp_path / "snapshot")
+    species = snapshot / "api" / "v2" / "pokemon-species" / "2" / "index.json"
+    saved_species = species.read_text()
+    species.unlink()
+
+    client = PokeApiClient(backend=SnapshotBackend(snapshot))
+    PokemonImporter(client, ResourceStore(), engine).import_all(fetch_workers=3, batch_size=3)
+    with Session(engine) as session:
+        assert session.exec(select(Pokemon.id).order_by(Pokemon.id)).all() == [1, 3, 4]
+        assert session.get(ImportCheckpoint, "PokemonImporter").offset == 1
+
+    species.write_text(saved_species)
+    PokemonImporter(client, ResourceStore(), engine).import_all(resume=True, fetch_workers=3, batch_size=3)
+    with Session(engine) as session:
+        assert session.exec(select(Pokemon.id).order_by(Pokemon.id)).all() == [1, 2, 3, 4]
+        assert session.get(ImportCheckpoint, "PokemonImporter") is None
+
+
+def test_a_pokemon_failing_in_a_batch_is_isolated_without_committing_the_batch(tmp_path, monkeypatch):
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TRIGGER reject_pokemon_3 BEFORE INSERT ON pokemons WHEN NEW.id = 3 "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+
+    def committed_pokemon():
+        reader = sqlite3.connect(tmp_path / "PKMN.db")
+        try:
+            return [row[0] for row in reader.execute("SELECT id FROM pokemons ORDER BY id")]
+        finally:
+            reader.close()
+
+    # Pokemon written by each call, and those already committed at that point
+    writes = []
+    write_batch = PokemonImporter._write_batch
+
+    def record_write(self, batch, manifest, session):
+        writes.append(([rows.pokemon.id for rows in batch], committed_pokemon()))
+        write_batch(self, batch, manifest, session)
+
+    monkeypatch.setattr(PokemonImporter, "_write_batch", record_write)
+    client = PokeApiClient(backend=SnapshotBackend(write_pokemon_snapshot(tmp_path / "snapshot")))
+    PokemonImporter(client, ResourceStore(), engine).import_all(fetch_workers=1, transform_workers=1, batch_size=3)
+
+    assert writes == [([1, 2, 3], []), ([1], []), ([2], []), ([3], []), ([4], [1, 2])]
+    assert committed_pokemon() == [1, 2, 4]
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(PokemonLearnset)).one() == 3
+        assert session.get(ImportCheckpoint, "PokemonImporter").offset == 0
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TRIGGER reject_pokemon_3")
+    PokemonImporter(client, ResourceStore(), engine).import_all(resume=True, fetch_workers=1, transform_workers=1)
+    assert committed_pokemon() == [1, 2, 3, 4]
+    with Session(engine) as session:
+        assert session.get(ImportCheckpoint, "PokemonImporter") is None
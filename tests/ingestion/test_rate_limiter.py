@@ -0,0 +1,29 @@
+from unittest.mock import Mock, patch
+
+from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.rate_limiter import RateLimiter, TokenBucket
+from app.models.enums.pokeapi import EndPoint
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert 0.09 < bucket.reserve() <= 0.1
+
+
+def test_retry_after_header_is_honoured():
+    limiter = RateLimiter(backoff_max=30)
+    assert limiter.backoff("https://pokeapi.co/api/v2/pokemon", 0, "2") == 2.0
+    assert limiter.backoff("https://pokeapi.co/api/v2/pokemon", 0, "3600") == 30
+    assert 0 <= limiter.backoff("https://pokeapi.co/api/v2/pokemon", 3) <= 0.5 * 2 ** 3
+
+
+def test_client_retries_on_429():
+    limiter = RateLimiter(rate=1000, burst=10, backoff_base=0.001)
+    client = PokeApiClient(rate_limiter=limiter)
+
+    throttled = Mock(status_code=429, headers={"Retry-After": "0"})
+    ok = Mock(status_code=200, headers={}, text='{"id": 25}')
+    with patch("app.api.ingestion.client.requests.get", side_effect=[throttled, ok]) as get:
+        assert client.call(EndPoint.POKEMON, resource_id="25") == {"id": 25}
+    assert get.call_count == 2
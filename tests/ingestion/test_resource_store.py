@@ -0,0 +1,51 @@
+from unittest.mock import Mock
+
+from sqlmodel import Session, select
+
+from app.api.ingestion.importers.machine_importer import MachineImporter
+from app.api.ingestion.resource_store import ResourceStore
+from app.db.engine import Engine
+from app.models.enums.pokeapi import EndPoint
+from app.models.tables.machine import Machine
+
+
+def test_fetch_deduplicates_calls_and_counts_hits():
+    store = ResourceStore()
+    client = Mock()
+    client.call.return_value = {"id": 1, "name": "bulbasaur"}
+
+    assert store.fetch(client, EndPoint.POKEMON_SPECIES, 1) == {"id": 1, "name": "bulbasaur"}
+    assert store.fetch(client, EndPoint.POKEMON_SPECIES, "1") == {"id": 1, "name": "bulbasaur"}
+    client.call.assert_called_once_with(EndPoint.POKEMON_SPECIES, resource_id="1")
+
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = ResourceStore(max_size=2)
+    store.put(EndPoint.MOVE, 1, {"id": 1})
+    store.put(EndPoint.MOVE, 2, {"id": 2})
+    store.get(EndPoint.MOVE, 1)
+    store.put(EndPoint.MOVE, 3, {"id": 3})
+
+    assert store.get(EndPoint.MOVE, 2) is None
+    assert store.get(EndPoint.MOVE, 1) == {"id": 1}
+    assert store.stats()["evictions"] == 1
+
+
+def test_machine_importer_reads_details_through_the_store(tmp_path):
+
+    machine = {"id": 1, "item": {"name": "tm01"}, "move": {"name": "mega-punch", "url": "/api/v2/move/5/"},
+               "version_group": {"name": "red-blue"}}
+    client = Mock()
+    client.iter_pages.return_value = [{"results": [{"url": "/api/v2/machine/1/"}]}]
+    store = ResourceStore()
+    store.put(EndPoint.MACHINE, 1, machine)
+
+    engine = Engine().get_engine("PKMN.db", tmp_path)
+
+    assert len(MachineImporter(client, store, engine).import_all()) == 1
+    client.call.assert_not_called()
+    with Session(engine) as session:
+        assert session.exec(select(Machine.machine_number, Machine.move_id)).all() == [("TM01", 5)]
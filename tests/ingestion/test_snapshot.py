@@ -0,0 +1,77 @@
+import zipfile
+from unittest.mock import Mock
+
+import pytest
+import ujson
+
+from app.api.ingestion.client import PokeApiClient
+from app.api.ingestion.snapshot import SnapshotBackend, record_snapshot
+from app.models.enums.pokeapi import EndPoint
+
+TOTAL = 5
+
+
+def write_snapshot(root):
+    """Write a tiny api-data style snapshot with TOTAL Pokémon under root/data/api/v2"""
+    base = root / "data" / "api" / "v2" / "pokemon"
+    base.mkdir(parents=True)
+    results = [{"name": f"pkmn-{i}", "url": f"/api/v2/pokemon/{i}/"} for i in range(1, TOTAL + 1)]
+    (base / "index.json").write_text(ujson.dumps({"count": TOTAL, "results": results}))
+    for i in range(1, TOTAL + 1):
+        (base / str(i)).mkdir()
+        (base / str(i) / "index.json").write_text(ujson.dumps({"id": i, "name": f"pkmn-{i}"}))
+    return root
+
+
+def test_pagination_matches_live_api(tmp_path):
+    backend = SnapshotBackend(write_snapshot(tmp_path))
+
+    page = backend.call(EndPoint.POKEMON, limit=2, offset=2)
+    assert page["count"] == TOTAL
+    assert [item["name"] for item in page["results"]] == ["pkmn-3", "pkmn-4"]
+    assert page["next"].endswith("pokemon?offset=4&limit=2")
+    assert page["previous"].endswith("pokemon?offset=0&limit=2")
+    assert backend.call(EndPoint.POKEMON, limit=2, offset=4)["next"] is None
+    assert len(backend.call(EndPoint.POKEMON)["results"]) == TOTAL
+
+
+def test_client_reads_details_from_zip_archive(tmp_path):
+    write_snapshot(tmp_path / "src")
+    archive = tmp_path / "snapshot.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for path in (tmp_path / "src").rglob("index.json"):
+            zf.write(path, path.relative_to(tmp_path / "src"))
+
+    client = PokeApiClient(backend=SnapshotBackend(archive))
+    assert client.call(EndPoint.POKEMON, resource_id="3") == {"id": 3, "name": "pkmn-3"}
+    assert client.call(EndPoint.POKEMON, resource_id="pkmn-4")["id"] == 4
+    assert [item_id for _, item_id, _ in client.get_items_generator(EndPoint.POKEMON, batch_size=2)] == [1, 2, 3, 4, 5]
+    with pytest.raises(FileNotFoundError):
+        client.call(EndPoint.POKEMON, resource_id="99")
+
+
+def test_recorded_snapshot_can_be_served(tmp_path):
+    live = PokeApiClient(backend=SnapshotBackend(write_snapshot(tmp_path / "live")))
+    live.call = Mock(wraps=live.call)
+
+    recorded = record_snapshot(live, tmp_path / "copy", [EndPoint.POKEMON])
+    assert recorded == {"pokemon": TOTAL}
+
+    copy = SnapshotBackend(tmp_path / "copy")
+    assert copy.call(EndPoint.POKEMON, resource_id="5") == {"id": 5, "name": "pkmn-5"}
+
+    calls = live.call.call_count
+    record_snapshot(live, tmp_path / "copy", [EndPoint.POKEMON])
+    assert live.call.call_count == calls + 1  # only the listing is fetched again
+
+
+def test_listing_is_streamed_page_by_page(tmp_path):
+    client = PokeApiClient(backend=SnapshotBackend(write_snapshot(tmp_path)))
+    client.call = Mock(wraps=client.call)
+
+    listing = client.iter_listing(EndPoint.POKEMON, page_size=2)
+    assert next(listing)["name"] == "pkmn-1"
+    assert client.call.call_count == 1  # later pages are not requested yet
+    assert [item["name"] for item in listing] == ["pkmn-2", "pkmn-3", "pkmn-4", "pkmn-5"]
+    assert client.call.call_count == 3
+    assert len(client.get_all_items(EndPoint.POKEMON)) == TOTAL
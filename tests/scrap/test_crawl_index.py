@@ -0,0 +1,57 @@
+import json
+
+from scrapy.http import Request, Response, XmlResponse
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.test import get_crawler
+from twisted.python.failure import Failure
+
+from app.scrap.PKMNdb.PKMNdb.spiders.pokemons import PokemonsSpider
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://db.pokemongohub.net/pokemon/3</loc></url>
+  <url><loc>https://db.pokemongohub.net/pokemon/5</loc></url>
+  <url><loc>https://db.pokemongohub.net/pokemon/9-Wartortle</loc></url>
+  <url><loc>https://db.pokemongohub.net/move/4</loc></url>
+</urlset>"""
+
+
+def ids(requests):
+    return [request.meta.get("pokemon_id") for request in requests]
+
+
+def not_found(spider, pokemon_id):
+    request = spider.id_request(pokemon_id)
+    error = HttpError(Response(request.url, status=404, request=request))
+    return Failure(error), request
+
+
+def test_only_known_and_sitemap_ids_are_crawled_with_a_probe_window(tmp_path):
+    (tmp_path / "pokemon.json").write_text(json.dumps([1, 2, 5]))
+    crawler = get_crawler(PokemonsSpider, {"GO_KNOWN_IDS_DIR": str(tmp_path), "GO_PROBE_WINDOW": 2})
+    spider = PokemonsSpider.from_crawler(crawler)
+
+    *pages, sitemap = spider.start_requests()
+    assert ids(pages) == [1, 2, 5, 6, 7]
+    assert sitemap.url.endswith("/sitemap.xml")
+
+    # Seuls les IDs du sitemap pas encore demandés, et la fenêtre après le nouveau maximum
+    index = XmlResponse(sitemap.url, body=SITEMAP, request=sitemap)
+    assert ids(spider.parse_index(index)) == [3, 9, 10, 11]
+
+    failure, request = not_found(spider, 2)
+    failure.request = request
+    spider.handle_error(failure)
+    spider.page_found(10)
+    spider.closed("finished")
+    assert json.loads((tmp_path / "pokemon.json").read_text()) == [1, 3, 5, 9, 10]
+
+
+def test_without_sitemap_nor_known_ids_every_id_is_probed(tmp_path):
+    crawler = get_crawler(PokemonsSpider, {"GO_KNOWN_IDS_DIR": str(tmp_path)})
+    spider = PokemonsSpider.from_crawler(crawler, max_id=4)
+
+    [sitemap] = spider.start_requests()
+    failure = Failure(ConnectionError("unreachable"))
+    failure.request = sitemap
+    assert ids(spider.index_error(failure)) == [1, 2, 3, 4]
@@ -0,0 +1,63 @@
+import sqlite3
+
+import scrapy
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+from scrapy_splash import SplashRequest
+
+from app.scrap.PKMNdb.PKMNdb import httpcache
+from app.scrap.PKMNdb.PKMNdb.httpcache import SQLiteCacheStorage
+
+BODY = b"<html><body>" + b"<p>Bulbasaur</p>" * 200 + b"</body></html>"
+
+
+class CachedSpider(scrapy.Spider):
+    name = "cached"
+
+
+def open_storage(tmp_path, **settings):
+    crawler = get_crawler(CachedSpider, {
+        "HTTPCACHE_DIR": str(tmp_path),
+        "HTTPCACHE_EXPIRATION_SECS": 0,
+        "REQUEST_FINGERPRINTER_CLASS": "scrapy_splash.SplashRequestFingerprinter",
+        **settings,
+    })
+    spider = CachedSpider.from_crawler(crawler)
+    storage = SQLiteCacheStorage(crawler.settings)
+    storage.open_spider(spider)
+    return storage, spider
+
+
+def test_responses_are_compressed_and_stored_once_per_content(tmp_path):
+    storage, spider = open_storage(tmp_path)
+    for pokemon_id in (1, 2):
+        request = Request(f"https://db.pokemongohub.net/pokemon/{pokemon_id}")
+        storage.store_response(spider, request, HtmlResponse(request.url, body=BODY, headers={"X-Id": str(pokemon_id)}))
+
+    cached = storage.retrieve_response(spider, Request("https://db.pokemongohub.net/pokemon/2"))
+    assert isinstance(cached, HtmlResponse)
+    assert (cached.body, cached.status, cached.headers["X-Id"]) == (BODY, 200, b"2")
+    # La requête Splash de la même URL a sa propre entrée
+    assert storage.retrieve_response(spider, SplashRequest("https://db.pokemongohub.net/pokemon/2")) is None
+    storage.close_spider(spider)
+
+    connection = sqlite3.connect(tmp_path / "httpcache.db")
+    [(bodies, size)] = connection.execute("SELECT COUNT(*), SUM(LENGTH(data)) FROM bodies").fetchall()
+    assert connection.execute("SELECT COUNT(*) FROM responses").fetchone() == (2,)
+    assert bodies == 1 and size < len(BODY) / 10
+
+
+def test_expiration_is_configured_per_spider(tmp_path, monkeypatch):
+    storage, spider = open_storage(tmp_path, GO_HTTPCACHE_EXPIRATION={"cached": 60})
+    request = Request("https://db.pokemongohub.net/move/214")
+    storage.store_response(spider, request, HtmlResponse(request.url, body=BODY))
+    assert storage.retrieve_response(spider, request) is not None
+
+    now = httpcache.time.time()
+    monkeypatch.setattr(httpcache.time, "time", lambda: now + 120)
+    assert storage.retrieve_response(spider, request) is None
+    storage.close_spider(spider)
+
+    # Les entrées expirées et leurs corps sont purgés à la fermeture
+    connection = sqlite3.connect(tmp_path / "httpcache.db")
+    assert connection.execute("SELECT (SELECT COUNT(*) FROM responses) + (SELECT COUNT(*) FROM bodies)").fetchone() == (0,)
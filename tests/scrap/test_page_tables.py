@@ -0,0 +1,55 @@
+import logging
+from pathlib import Path
+
+from scrapy.http import HtmlResponse, Request
+
+from app.scrap.PKMNdb.PKMNdb.commands.parsebench import run
+from app.scrap.PKMNdb.PKMNdb.page_tables import PageTables
+from app.scrap.PKMNdb.PKMNdb.spiders.moves import MovesSpider
+from app.scrap.PKMNdb.PKMNdb.spiders.pokemons import PokemonsSpider
+
+FIXTURES = Path(__file__).parent / "fixtures"
+URL = "https://db.pokemongohub.net/move/214"
+
+
+def page(fixture):
+    return HtmlResponse(URL, body=(FIXTURES / fixture).read_bytes(), encoding="utf-8",
+                        request=Request(URL, meta={"move_id": 214, "splash": {}}))
+
+
+def test_table_walk_matches_the_css_selectors_it_replaces():
+    response = page("move_214_rendered.html")
+    tables = PageTables.from_response(response)
+    raid, pvp = tables.section("Gym and Raid Battles"), tables.section("Trainer Battles")
+
+    assert tables.title == response.css("h1.Card_cardTitle__URr_A::text").get()
+    assert tables.span("Type") == response.css('tr:contains("Type") td span::text').get()
+    for label in ("Power", "Energy", "Animation Duration", "DPS", "DPE"):
+        assert raid.text(label) == response.css('section:contains("Gym and Raid Battles")').css(
+            f'tr:contains("{label}") td::text').get()
+    for label in ("Power", "Duration", "Tags"):
+        assert pvp.text(label) == response.css('section:contains("Trainer Battles")').css(
+            f'tr:contains("{label}") td::text').get()
+    assert pvp.effects().strip() == "Lowers the user's Attack by 1 stage."
+    assert tables.section("Unknown").text("Power") is None
+
+
+def test_rendered_move_page_is_parsed():
+    [move] = MovesSpider().parse_rendered(page("move_214_rendered.html"))
+
+    assert (move["name"], move["type"], move["is_charged"], move["power"], move["energy"]) == \
+        ("Hydro Pump", "Water", True, 130, -100)
+    assert (move["pvp_duration"], move["pvp_dpe"], move["tags"]) == (1, 1.73, ["Nuke", "Coverage"])
+
+
+def test_parsebench_times_every_callback_on_its_fixtures():
+    results = run([PokemonsSpider, MovesSpider], FIXTURES, iterations=2)
+    logging.getLogger("pokemons").setLevel(logging.NOTSET)
+    logging.getLogger("moves").setLevel(logging.NOTSET)
+
+    assert {(callback, fixture) for callback, fixture, _ in results} >= {
+        ("pokemons.parse_pokemon", "pokemon_1_rendered.html"),
+        ("pokemons.parse_rendered", "pokemon_1_rendered.html"),
+        ("moves.parse_move", "move_214_rendered.html"),
+    }
+    assert all(seconds > 0 for _, _, seconds in results)
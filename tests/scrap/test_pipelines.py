@@ -0,0 +1,155 @@
+import logging
+from types import SimpleNamespace
+
+from sqlalchemy import event, insert
+from sqlmodel import SQLModel, select
+
+import app.models.GO_tables.GO_type  # noqa: F401 go_types, referenced by go_moves
+from app.db.engine import engine as db_engine
+from app.models.GO_tables.GO_move import GO_Move
+from app.models.GO_tables.GO_pokemon import GO_Pokemon
+from app.models.GO_tables.GO_pokemon_learnset import GO_PokemonLearnset
+from app.models.GO_tables.GO_pokemon_stats import GO_PokemonStats
+from app.scrap.PKMNdb.PKMNdb.items import MoveItem, PokemonItem
+from app.scrap.PKMNdb.PKMNdb.pipelines import MoveDatabasePipeline, PokemonDatabasePipeline
+
+spider = SimpleNamespace(logger=logging.getLogger("test-spider"))
+
+
+def pokemon(name, number, fast, charged, attack=100):
+    return PokemonItem(name=name, pokedex_number=number, max_cp=1000, attack=attack, defense=100, stamina=100,
+                       fast_moves=fast, charged_moves=[{"name": move, "is_elite": True} for move in charged])
+
+
+def test_pokemon_items_are_written_in_batches_without_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(PokemonDatabasePipeline, "_get_session", lambda self: db_engine.connect("PKMNGO.db", folder=tmp_path))
+    engine = db_engine.get_engine("PKMNGO.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        session.add(GO_Pokemon(id=1, name="Bulbasaur", pokedex_number=1))
+        session.add(GO_PokemonStats(pokemon_id=1, max_cp=900, attack=90, defense=90, stamina=90))
+        session.add(GO_Move(id=1, name="Vine Whip", is_fast=True, is_charged=False))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    pipeline = PokemonDatabasePipeline(flush_size=3, flush_interval=3600)
+    pipeline.open_spider(spider)
+    statements.clear()
+
+    pipeline.process_item(pokemon("Bulbasaur", 1, ["Vine Whip", "Tackle"], ["Sludge Bomb"], attack=118), spider)
+    pipeline.process_item(pokemon("Ivysaur", 2, ["Vine Whip"], ["Sludge Bomb"]), spider)
+    assert statements == []
+    pipeline.process_item(pokemon("Venusaur", 3, ["Vine Whip"], ["Frenzy Plant"]), spider)
+    pipeline.close_spider(spider)
+
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        assert session.exec(select(GO_Pokemon.name).order_by(GO_Pokemon.id)).all() == ["Bulbasaur", "Ivysaur", "Venusaur"]
+        assert session.get(GO_PokemonStats, 1).attack == 118
+        assert sorted(session.exec(select(GO_Move.name)).all()) == ["Frenzy Plant", "Sludge Bomb", "Tackle", "Vine Whip"]
+        learnsets = session.exec(select(GO_PokemonLearnset.pokemon_id, GO_PokemonLearnset.move_name,
+                                        GO_PokemonLearnset.is_elite)).all()
+    assert len(learnsets) == 7 and (1, "Sludge Bomb", True) in learnsets
+    assert (pipeline.processed_pokemon, pipeline.processed_learnsets) == (3, 7)
+
+
+def test_learnset_and_move_writes_are_idempotent_across_pipelines(tmp_path, monkeypatch):
+    connect = lambda self: db_engine.connect("PKMNGO.db", folder=tmp_path)
+    monkeypatch.setattr(PokemonDatabasePipeline, "_get_session", connect)
+    monkeypatch.setattr(MoveDatabasePipeline, "_get_session", connect)
+    engine = db_engine.get_engine("PKMNGO.db", tmp_path)
+    SQLModel.metadata.drop_all(engine)
+    # Base antérieure à l'index unique, contenant déjà un doublon
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX uq_go_pokemon_learnsets_move")
+        connection.execute(insert(GO_Pokemon), [{"id": 1, "name": "Bulbasaur", "pokedex_number": 1}])
+        connection.execute(insert(GO_Move), [{"id": 1, "name": "Tackle", "is_fast": True, "is_charged": False}])
+        connection.execute(insert(GO_PokemonLearnset), [
+            {"pokemon_id": 1, "move_id": 1, "move_name": "Tackle", "is_fast": True, "is_charged": False}
+        ] * 2)
+
+    # Deux spiders ouverts sur la même base, qui écrivent les mêmes Pokémon
+    first, second = PokemonDatabasePipeline(), PokemonDatabasePipeline()
+    first.open_spider(spider)
+    second.open_spider(spider)
+    for pipeline in (first, second):
+        pipeline.process_item(pokemon("Bulbasaur", 1, ["Tackle", "Vine Whip"], ["Sludge Bomb"]), spider)
+        pipeline.close_spider(spider)
+
+    moves = MoveDatabasePipeline()
+    moves.open_spider(spider)
+    moves.process_item(MoveItem(name="Vine Whip", type="Grass", is_fast=True, is_charged=False, power=7), spider)
+    moves.close_spider(spider)
+
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        learnsets = session.exec(select(GO_PokemonLearnset.move_name)).all()
+        moves = session.exec(select(GO_Move.name, GO_Move.type_id, GO_Move.damage).order_by(GO_Move.name)).all()
+    assert sorted(learnsets) == ["Sludge Bomb", "Tackle", "Vine Whip"]
+    assert moves == [("Sludge Bomb", None, None), ("Tackle", None, None), ("Vine Whip", 12, "7")]
+
+
+def test_a_failing_pokemon_item_only_drops_itself(tmp_path, monkeypatch):
+    monkeypatch.setattr(PokemonDatabasePipeline, "_get_session", lambda self: db_engine.connect("PKMNGO.db", folder=tmp_path))
+    engine = db_engine.get_engine("PKMNGO.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TRIGGER reject_missingno BEFORE INSERT ON go_pokemons WHEN NEW.name = 'MissingNo' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+
+    pipeline = PokemonDatabasePipeline(flush_size=3, flush_interval=3600)
+    pipeline.open_spider(spider)
+    pipeline.process_item(pokemon("Bulbasaur", 1, ["Tackle"], ["Sludge Bomb"]), spider)
+    pipeline.process_item(pokemon("MissingNo", 0, ["Glitch"], ["Sludge Bomb"]), spider)
+    pipeline.process_item(pokemon("Ivysaur", 2, ["Vine Whip"], ["Sludge Bomb"]), spider)
+    pipeline.process_item(pokemon("Venusaur", 3, ["Vine Whip"], ["Frenzy Plant"]), spider)
+    pipeline.close_spider(spider)
+
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        assert session.exec(select(GO_Pokemon.name).order_by(GO_Pokemon.id)).all() == ["Bulbasaur", "Ivysaur", "Venusaur"]
+        assert sorted(session.exec(select(GO_Move.name)).all()) == ["Frenzy Plant", "Sludge Bomb", "Tackle", "Vine Whip"]
+        assert len(session.exec(select(GO_PokemonLearnset)).all()) == 6
+    assert "Glitch" not in pipeline.move_ids
+    assert (pipeline.processed_pokemon, pipeline.processed_learnsets) == (3, 6)
+
+
+def test_a_failing_move_item_only_drops_itself(tmp_path, monkeypatch):
+    monkeypatch.setattr(MoveDatabasePipeline, "_get_session", lambda self: db_engine.connect("PKMNGO.db", folder=tmp_path))
+    engine = db_engine.get_engine("PKMNGO.db", tmp_path)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TRIGGER reject_struggle BEFORE INSERT ON go_moves WHEN NEW.name = 'Struggle' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+
+    pipeline = MoveDatabasePipeline(flush_size=3, flush_interval=3600)
+    pipeline.open_spider(spider)
+    for name in ("Tackle", "Struggle", "Vine Whip", "Mud Shot"):
+        pipeline.process_item(MoveItem(name=name, type="Normal", is_fast=True, is_charged=False, power=5), spider)
+    pipeline.close_spider(spider)
+
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        assert sorted(session.exec(select(GO_Move.name)).all()) == ["Mud Shot", "Tackle", "Vine Whip"]
+    assert pipeline.moves_count == 3
+
+
+def test_move_name_variants_are_matched_to_known_moves(tmp_path, monkeypatch):
+    monkeypatch.setattr(PokemonDatabasePipeline, "_get_session", lambda self: db_engine.connect("PKMNGO.db", folder=tmp_path))
+    SQLModel.metadata.create_all(db_engine.get_engine("PKMNGO.db", tmp_path))
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        session.add(GO_Move(id=1, name="Mud-Slap", is_fast=True, is_charged=False))
+
+    pipeline = PokemonDatabasePipeline(flush_size=10, flush_interval=3600)
+    pipeline.open_spider(spider)
+    pipeline.process_item(pokemon("Diglett", 50, ["Mud Slap", "Mud Shot"], ["Mud Bomb"]), spider)
+    pipeline.process_item(pokemon("Dugtrio", 51, ["mud shot"], ["Mud Bomb*"]), spider)
+    pipeline.close_spider(spider)
+
+    with db_engine.connect("PKMNGO.db", folder=tmp_path) as session:
+        assert sorted(session.exec(select(GO_Move.name)).all()) == ["Mud Bomb", "Mud Shot", "Mud-Slap"]
+        learnsets = session.exec(select(GO_PokemonLearnset.pokemon_id, GO_PokemonLearnset.move_id)).all()
+    assert len(learnsets) == 5 and (1, 1) in learnsets
+
+    assert MoveDatabasePipeline.TYPE_NAMES.resolve("grass").id == 12
@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from scrapy.http import HtmlResponse, Request, XmlResponse
+from scrapy.utils.test import get_crawler
+
+from app.scrap.PKMNdb.PKMNdb.httpcache import SQLiteCacheStorage
+from app.scrap.PKMNdb.PKMNdb.spiders.pokemons import PokemonsSpider
+
+PROJECT = Path(__file__).parents[2] / "app" / "scrap" / "PKMNdb"
+FIXTURES = Path(__file__).parent / "fixtures"
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://db.pokemongohub.net/pokemon/1</loc></url>
+  <url><loc>https://db.pokemongohub.net/pokemon/2</loc></url>
+</urlset>"""
+
+
+def test_replay_parses_cached_responses_without_downloading(tmp_path):
+    settings = {"HTTPCACHE_DIR": str(tmp_path), "REQUEST_FINGERPRINTER_CLASS": "scrapy_splash.SplashRequestFingerprinter"}
+    spider = PokemonsSpider.from_crawler(get_crawler(PokemonsSpider, settings))
+    storage = SQLiteCacheStorage(spider.crawler.settings)
+    storage.open_spider(spider)
+    for url, response_class, body in [
+        ("https://db.pokemongohub.net/sitemap.xml", XmlResponse, SITEMAP),
+        ("https://db.pokemongohub.net/pokemon/1", HtmlResponse, (FIXTURES / "pokemon_1.html").read_bytes()),
+    ]:
+        storage.store_response(spider, Request(url), response_class(url, body=body))
+    storage.close_spider(spider)
+
+    # La page 2 et la fenêtre de sondage ne sont pas en cache : ignorées, jamais téléchargées
+    items = tmp_path / "items.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "scrapy", "replay", "pokemons", "-O", str(items),
+         "-s", f"HTTPCACHE_DIR={tmp_path}", "-s", f"GO_KNOWN_IDS_DIR={tmp_path}", "-s", "ITEM_PIPELINES={}"],
+        cwd=PROJECT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    stats = result.stderr.split("Dumping Scrapy stats")[-1]
+    assert "'httpcache/hit': 2" in stats and "httpcache/store" not in stats
+    assert [item["name"] for item in json.loads(items.read_text())] == ["Bulbasaur"]
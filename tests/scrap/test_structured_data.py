@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from scrapy.http import HtmlResponse, Request
+from scrapy_splash import SplashRequest
+
+from app.scrap.PKMNdb.PKMNdb.items import MoveItem, PokemonItem
+from app.scrap.PKMNdb.PKMNdb.spiders.fast_moves import FastMovesSpider
+from app.scrap.PKMNdb.PKMNdb.spiders.pokemons import PokemonsSpider
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def response(spider, fixture, url, callback, meta):
+    request = Request(url, callback=callback, meta=meta)
+    return HtmlResponse(url, body=(FIXTURES / fixture).read_bytes(), encoding="utf-8", request=request)
+
+
+def test_pokemon_page_is_read_from_its_next_data_without_rendering():
+    spider = PokemonsSpider()
+    request = spider.id_request(1)
+    assert type(request) is Request
+
+    page = response(spider, "pokemon_1.html", request.url, spider.parse_pokemon, {"pokemon_id": 1})
+    [pokemon] = list(spider.parse_pokemon(page))
+
+    assert isinstance(pokemon, PokemonItem)
+    assert (pokemon["name"], pokemon["max_cp"], pokemon["attack"], pokemon["defense"], pokemon["stamina"]) == \
+        ("Bulbasaur", 1275, 118, 111, 128)
+    assert [move["name"] for move in pokemon["fast_moves"]] == ["Vine Whip", "Tackle"]
+    assert pokemon["charged_moves"][1] == {"name": "Frenzy Plant", "is_elite": True, "is_fast": False, "is_charged": True}
+
+
+def test_move_page_is_read_from_its_next_data():
+    spider = FastMovesSpider()
+    page = response(spider, "move_214.html", "https://db.pokemongohub.net/move/214", spider.parse_move, {"move_id": 214})
+    [move] = list(spider.parse_move(page))
+
+    assert isinstance(move, MoveItem)
+    assert (move["name"], move["type"], move["is_fast"], move["is_charged"]) == ("Vine Whip", "Grass", True, False)
+    assert (move["power"], move["energy"], move["pvp_duration"]) == (7, 6, 2)
+    assert "pvp_effects" not in move
+
+
+def test_page_without_next_data_falls_back_to_splash_rendering():
+    spider = PokemonsSpider()
+    url = "https://db.pokemongohub.net/pokemon/1"
+    raw = response(spider, "pokemon_1_rendered.html", url, spider.parse_pokemon, {"pokemon_id": 1})
+    [fallback] = list(spider.parse_pokemon(raw))
+
+    assert isinstance(fallback, SplashRequest)
+    assert fallback.meta["pokemon_id"] == 1 and fallback.callback == spider.parse_pokemon
+
+    # La page rendue par Splash est parsée avec les sélecteurs CSS
+    rendered = response(spider, "pokemon_1_rendered.html", url, spider.parse_pokemon, {"pokemon_id": 1, "splash": {}})
+    [pokemon] = list(spider.parse_pokemon(rendered))
+    assert (pokemon["name"], pokemon["attack"], pokemon["buddy_distance"]) == ("Bulbasaur", 118, 3.0)
+    assert pokemon["charged_moves"][1]["is_elite"]